@@ -1,20 +1,26 @@
-import asyncio
 import streamlit as st
 import json
+import os
 import threading
 import time
 import requests
+from contextlib import closing
 from src.config import load_config
 from src.orchestrator import MultiAgentOrchestrator
+from src.runtime import OrchestratorRuntime
+from src.service_client import ServiceClient
+from src.async_database import get_store
+from src.context import ContextManager
+from src.metrics import metrics, agent_summary, stage_summary
+from src.startup import startup
 from src.database import (
     init_db, create_user, verify_user, create_admin_if_not_exists,
-    create_session, get_user_sessions, save_message, get_session_messages,
-    update_session_title, delete_session
+    create_session, session_lists, save_message, get_session_messages_page,
+    get_message_agents, split_details, update_session_title, delete_session
 )
 
-# --- Database & Auth Setup ---
-init_db()
-create_admin_if_not_exists()
+SESSIONS_PAGE_SIZE = 20
+MESSAGES_PAGE_SIZE = 20
 
 # --- Keep Alive Logic ---
 def keep_alive():
@@ -26,10 +32,16 @@ def keep_alive():
         except:
             pass
 
-if "keep_alive_started" not in st.session_state:
-    t = threading.Thread(target=keep_alive, daemon=True)
-    t.start()
-    st.session_state.keep_alive_started = True
+# --- One-time process setup (cached, so reruns and new sessions skip it) ---
+@st.cache_resource
+def init_app():
+    with startup.stage("init_db"):
+        init_db()
+        create_admin_if_not_exists()
+    threading.Thread(target=keep_alive, daemon=True).start()
+    return True
+
+init_app()
 
 # Page Setup
 st.set_page_config(page_title="Multi-Agent Orchestrator", page_icon="🤖", layout="wide")
@@ -91,40 +103,82 @@ if "current_session_id" not in st.session_state:
     st.session_state.current_session_id = None
 if "messages" not in st.session_state:
     st.session_state.messages = []
+if "messages_cursor" not in st.session_state:
+    st.session_state.messages_cursor = None
 
 # Load Config
+CONFIG_PATH = "orchestrator_config.yaml"
+
 @st.cache_resource
 def get_orchestrator():
-    config = load_config("orchestrator_config.yaml")
-    return MultiAgentOrchestrator(config, use_real_agents=False)
+    config = load_config(CONFIG_PATH)
+    if config.metrics.enabled:
+        metrics.start_http_server(config.metrics.port, config.metrics.host)
+    with startup.stage("orchestrator"):
+        orchestrator = MultiAgentOrchestrator(config, use_real_agents=False)
+    # Edits to the YAML apply without a restart (see `reload:` in the config)
+    orchestrator.watch_config(CONFIG_PATH)
+    return orchestrator
+
+# One event loop for the whole server process: HTTP connection pools and per-loop
+# limits live on it and survive across reruns, unlike asyncio.run per message
+@st.cache_resource
+def get_runtime():
+    return OrchestratorRuntime()
 
-orchestrator = get_orchestrator()
+# With ORCHESTRATOR_URL set, orchestration runs in src.service and this app is a thin client
+SERVICE_URL = os.getenv("ORCHESTRATOR_URL")
+
+@st.cache_resource
+def get_service():
+    return ServiceClient(SERVICE_URL, api_token=os.getenv("ORCHESTRATOR_API_TOKEN"))
+
+service = get_service() if SERVICE_URL else None
+orchestrator = None if service else get_orchestrator()
+# Compiled configs are cached by mtime and hash, so this is cheap on every rerun
+config = orchestrator.config if orchestrator else load_config(CONFIG_PATH)
+runtime = get_runtime()
 
 # --- Sidebar Logic ---
-with st.sidebar:
-    st.markdown(f"### 👤 {st.session_state.user['email']}")
-    
-    # New Chat Button
-    if st.button("➕ New Chat", use_container_width=True):
-        st.session_state.current_session_id = None
-        st.session_state.messages = []
-        st.rerun()
-    
-    st.markdown("### 🕒 Recent Chats")
-    sessions = get_user_sessions(st.session_state.user['id'])
-    
+# The chat list comes from the per-user cache in src.database (kept current by
+# create_session, save_turn and delete_session) and reruns on its own as a fragment,
+# so deleting a chat or loading more does not redraw the conversation.
+@st.fragment
+def session_list():
+    user_id = st.session_state.user['id']
+    sessions, sessions_cursor = session_lists.page(user_id, limit=SESSIONS_PAGE_SIZE)
+
     for s in sessions:
         col1, col2 = st.columns([0.8, 0.2])
         if col1.button(s['title'], key=f"session_{s['id']}", use_container_width=True):
             st.session_state.current_session_id = s['id']
-            st.session_state.messages = get_session_messages(s['id'])
+            st.session_state.messages, st.session_state.messages_cursor = get_session_messages_page(s['id'], limit=MESSAGES_PAGE_SIZE)
             st.rerun()
         if col2.button("🗑️", key=f"del_{s['id']}"):
             delete_session(s['id'])
             if st.session_state.current_session_id == s['id']:
                 st.session_state.current_session_id = None
                 st.session_state.messages = []
-            st.rerun()
+                st.session_state.messages_cursor = None
+                st.rerun()
+            st.rerun(scope="fragment")
+
+    if sessions_cursor and st.button("Load more chats", use_container_width=True):
+        session_lists.load_more(user_id, limit=SESSIONS_PAGE_SIZE)
+        st.rerun(scope="fragment")
+
+with st.sidebar:
+    st.markdown(f"### 👤 {st.session_state.user['email']}")
+    
+    # New Chat Button
+    if st.button("➕ New Chat", use_container_width=True):
+        st.session_state.current_session_id = None
+        st.session_state.messages = []
+        st.session_state.messages_cursor = None
+        st.rerun()
+    
+    st.markdown("### 🕒 Recent Chats")
+    session_list()
 
     st.divider()
     
@@ -133,16 +187,40 @@ with st.sidebar:
         st.session_state.user = None
         st.session_state.current_session_id = None
         st.session_state.messages = []
+        st.session_state.messages_cursor = None
         st.rerun()
     st.markdown('</div>', unsafe_allow_html=True)
     
     st.divider()
     with st.expander("⚙️ Configuration"):
-        use_real = st.toggle("Use Real APIs", value=False)
-        if use_real != orchestrator.use_real_agents:
-            orchestrator.use_real_agents = use_real
-            orchestrator.agents = orchestrator._initialize_agents(orchestrator.config.agents)
-            st.toast(f"Mode: {'Real' if use_real else 'Simulated'}")
+        if service:
+            st.caption(f"Orchestration service: {SERVICE_URL} ({'ready' if service.ready() else 'not ready'})")
+        else:
+            use_real = st.toggle("Use Real APIs", value=False)
+            if use_real != orchestrator.use_real_agents:
+                orchestrator.use_real_agents = use_real
+                orchestrator.agents = orchestrator._initialize_agents(orchestrator.config.agents)
+                st.toast(f"Mode: {'Real' if use_real else 'Simulated'}")
+            cache_stats = orchestrator.cache.stats()
+            st.caption(f"Response cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses ({cache_stats['hit_rate']:.0%})")
+
+    if st.session_state.user.get("role") == "admin" and service:
+        with st.expander("📊 Metrics"):
+            st.caption(f"Orchestration metrics are served per worker at {SERVICE_URL}/metrics")
+    elif st.session_state.user.get("role") == "admin":
+        with st.expander("📊 Metrics"):
+            stages = stage_summary()
+            if stages:
+                st.caption("Stage latency")
+                st.dataframe(stages, hide_index=True, use_container_width=True)
+                st.caption("Per-agent calls")
+                st.dataframe(agent_summary(), hide_index=True, use_container_width=True)
+            else:
+                st.caption("No queries processed yet.")
+            st.caption("Startup")
+            st.dataframe(startup.report(), hide_index=True, use_container_width=True)
+            if orchestrator.config.metrics.enabled:
+                st.caption(f"Prometheus: http://{orchestrator.config.metrics.host}:{orchestrator.config.metrics.port}/metrics")
 
 # --- Main Chat Area ---
 st.title("🤖 Multi-Agent Orchestrator")
@@ -150,15 +228,25 @@ st.title("🤖 Multi-Agent Orchestrator")
 if not st.session_state.messages and not st.session_state.current_session_id:
     st.markdown("#### Ready to research! Start a new conversation below.")
 
+# Older messages are fetched a page at a time
+if st.session_state.messages_cursor and st.button("⬆️ Load older messages"):
+    older, st.session_state.messages_cursor = get_session_messages_page(
+        st.session_state.current_session_id, limit=MESSAGES_PAGE_SIZE, before=st.session_state.messages_cursor
+    )
+    st.session_state.messages = older + st.session_state.messages
+    st.rerun()
+
 # Display Messages
 for msg in st.session_state.messages:
     with st.chat_message(msg["role"]):
         st.markdown(msg["content"])
         if "details" in msg:
-            with st.expander("🔍 See Agent Details"):
-                if msg["details"].get("agents"):
-                    tabs = st.tabs([a["name"] for a in msg["details"]["agents"]])
-                    for i, agent_data in enumerate(msg["details"]["agents"]):
+            # Agent answers stay in the database until the user asks for them
+            if st.toggle("🔍 See Agent Details", key=f"details_{msg['id']}"):
+                agents = get_message_agents(msg["id"]) if msg["details"].get("agent_count") else []
+                if agents:
+                    tabs = st.tabs([a["name"] for a in agents])
+                    for i, agent_data in enumerate(agents):
                         with tabs[i]:
                             st.markdown(f"**Answer:** {agent_data['answer']}")
                             st.caption(f"Confidence: {agent_data['confidence']}")
@@ -166,6 +254,9 @@ for msg in st.session_state.messages:
                     st.warning("No details.")
 
 # Input
+fast_mode = False
+if "fast" in config.budgets.profiles:
+    fast_mode = st.toggle("⚡ Fast mode", key="fast_mode", help="Shorter answers with tighter token budgets")
 user_query = st.chat_input("Ask something complex...")
 
 if user_query:
@@ -175,9 +266,10 @@ if user_query:
         title = " ".join(user_query.split()[:5]) + "..."
         st.session_state.current_session_id = create_session(st.session_state.user['id'], title)
     
-    # 2. Save & Show User Message
-    save_message(st.session_state.current_session_id, "user", user_query)
-    st.session_state.messages.append({"role": "user", "content": user_query})
+    # 2. Show User Message (persisted together with the answer, see step 4)
+    user_message = {"role": "user", "content": user_query}
+    st.session_state.messages.append(user_message)
+    session_id = st.session_state.current_session_id
     
     with st.chat_message("user"):
         st.markdown(user_query)
@@ -185,12 +277,40 @@ if user_query:
     # 3. Process
     with st.chat_message("assistant"):
         status = st.status("🚀 Orchestrating...", expanded=True)
+        draft = st.empty()
         try:
             status.write("📡 Broadcasting...")
-            async def run(): return await orchestrator.process_query(user_query)
-            result = asyncio.run(run())
+            result, synthesis_text = None, ""
+            profile = "fast" if fast_mode else None
+            # Follow-ups carry the conversation: recent turns plus a rolling summary of older ones
+            contexts = ContextManager(config.context)
+            context = contexts.load(session_id)
+            history = contexts.history(context)
+            if service:
+                events = service.stream(user_query, profile=profile, history=history)
+            else:
+                events = runtime.stream(orchestrator.process_query_stream(user_query, profile=profile, history=history))
+            # closing(): a rerun mid-answer cancels the orchestration (locally or in the service)
+            with closing(events):
+                for event in events:
+                    if event.type == "agent_answer":
+                        icon = "✅" if event.response.confidence > 0 else "❌"
+                        status.write(f"{icon} {event.response.name} answered")
+                    elif event.type == "critique":
+                        status.write(f"💬 {event.name} critiqued")
+                    elif event.type == "synthesis_token":
+                        if not synthesis_text:
+                            status.write("🧠 Synthesizing...")
+                        synthesis_text += event.token
+                        draft.caption(synthesis_text)
+                    elif event.type == "final":
+                        result = event.result
+            # 4. Save the whole turn, with the context advanced by one step, in one transaction on the writer thread
+            new_context = contexts.add_turn(context, user_query, result["final_answer"]).model_dump() if config.context.enabled else None
+            user_message["id"], message_id = runtime.run(
+                get_store().save_turn(session_id, user_query, result["final_answer"], result, context=new_context))
+            draft.empty()
             
-            status.write("🧠 Synthesizing...")
             status.update(label="✅ Complete!", state="complete", expanded=False)
             
             final_answer = result["final_answer"]
@@ -203,9 +323,8 @@ if user_query:
                         with tabs[i]:
                             st.markdown(a['answer'])
             
-            # 4. Save Assistant Message
-            save_message(st.session_state.current_session_id, "assistant", final_answer, result)
-            st.session_state.messages.append({"role": "assistant", "content": final_answer, "details": result})
+            summary, _ = split_details(result, final_answer)
+            st.session_state.messages.append({"id": message_id, "role": "assistant", "content": final_answer, "details": summary})
             
             # Refresh to update sidebar list if it was a new chat
             if len(st.session_state.messages) == 2:
@@ -214,3 +333,6 @@ if user_query:
         except Exception as e:
             status.update(label="❌ Failed", state="error")
             st.error(str(e))
+            # Keep the question in the history even though the turn failed
+            if "id" not in user_message:
+                user_message["id"] = save_message(session_id, "user", user_query)
@@ -0,0 +1,140 @@
+"""
+Microbenchmark for src/database.py: inserts/sec and reads/sec with the old
+connect-per-call pattern ("before") versus the pooled WAL storage engine ("after").
+
+The rerun benchmark mimics Streamlit, which runs each rerun on a fresh thread: every
+rerun reads the sidebar page and the open chat's latest messages. It compares
+connect-per-call, connections that die with their thread (no idle pool) and the idle
+pool that outlives threads, and counts how many connections each one opened.
+
+    python -m benchmarks.bench_database --messages 2000 --reads 2000 --reruns 500
+"""
+import argparse
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from src import database
+
+def legacy_save_message(session_id, role, content, details=None):
+    conn = sqlite3.connect(database.DB_NAME)
+    c = conn.cursor()
+    details_json = json.dumps(details) if details else None
+    c.execute('INSERT INTO messages (session_id, role, content, details) VALUES (?, ?, ?, ?)',
+              (session_id, role, content, details_json))
+    conn.commit()
+    conn.close()
+
+def legacy_get_session_messages(session_id):
+    conn = sqlite3.connect(database.DB_NAME)
+    c = conn.cursor()
+    c.execute('SELECT role, content, details FROM messages WHERE session_id = ? ORDER BY created_at ASC', (session_id,))
+    messages = [{"role": r[0], "content": r[1]} for r in c.fetchall()]
+    conn.close()
+    return messages
+
+def run(label, save, read, n_messages, n_reads, workdir):
+    database.close_connections()
+    database.DB_NAME = os.path.join(workdir, f"{label}.db")
+    if label == "before":
+        # Recreate the original rollback-journal database without touching the engine pragmas
+        conn = sqlite3.connect(database.DB_NAME)
+        database._create_tables(conn.cursor())
+        conn.commit()
+        conn.close()
+    else:
+        database.init_db()
+    session_id = database.create_session(1, "bench") if label == "after" else 1
+
+    start = time.perf_counter()
+    for i in range(n_messages):
+        save(session_id, "user", f"message {i} " + "lorem ipsum " * 20)
+    insert_seconds = time.perf_counter() - start
+
+    # Reads hit a short session, the common case when a user opens a chat
+    short_session = session_id + 1000
+    for i in range(10):
+        save(short_session, "user", f"short {i}")
+    start = time.perf_counter()
+    for _ in range(n_reads):
+        read(short_session)
+    read_seconds = time.perf_counter() - start
+
+    return {
+        "inserts_per_second": round(n_messages / insert_seconds, 1),
+        "reads_per_second": round(n_reads / read_seconds, 1),
+    }
+
+def legacy_rerun_reads(user_id, session_id):
+    conn = sqlite3.connect(database.DB_NAME)
+    conn.execute('SELECT id, title, created_at FROM sessions WHERE user_id = ? ORDER BY created_at DESC, id DESC LIMIT 21',
+                 (user_id,)).fetchall()
+    conn.close()
+    legacy_get_session_messages(session_id)
+
+def pooled_rerun_reads(user_id, session_id):
+    database.get_user_sessions_page(user_id, limit=20)
+    database.get_session_messages_page(session_id, limit=50)
+
+def run_reruns(label, reads, n_reruns, workdir, max_idle):
+    database.close_connections()
+    database.DB_NAME = os.path.join(workdir, f"reruns-{label}.db")
+    database.init_db()
+    session_id = database.create_session(1, "bench")
+    for i in range(20):
+        database.save_message(session_id, "user", f"message {i}")
+    database.close_connections()
+
+    opened = [0]
+    connect = sqlite3.connect
+    def counting_connect(*args, **kwargs):
+        opened[0] += 1
+        return connect(*args, **kwargs)
+    sqlite3.connect = counting_connect
+    saved_max_idle, database.MAX_IDLE_CONNECTIONS = database.MAX_IDLE_CONNECTIONS, max_idle
+    try:
+        start = time.perf_counter()
+        for _ in range(n_reruns):
+            # One fresh thread per rerun, like Streamlit's ScriptRunner
+            thread = threading.Thread(target=reads, args=(1, session_id))
+            thread.start()
+            thread.join()
+        seconds = time.perf_counter() - start
+    finally:
+        sqlite3.connect = connect
+        database.MAX_IDLE_CONNECTIONS = saved_max_idle
+    database.close_connections()
+    return {"reruns_per_second": round(n_reruns / seconds, 1), "connections_opened": opened[0]}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--reads", type=int, default=2000)
+    parser.add_argument("--reruns", type=int, default=500)
+    args = parser.parse_args()
+
+    original_db = database.DB_NAME
+    with tempfile.TemporaryDirectory() as workdir:
+        results = {
+            "before": run("before", legacy_save_message, legacy_get_session_messages, args.messages, args.reads, workdir),
+            "after": run("after", database.save_message, database.get_session_messages, args.messages, args.reads, workdir),
+        }
+        reruns = {
+            "connect_per_call": run_reruns("legacy", legacy_rerun_reads, args.reruns, workdir, database.MAX_IDLE_CONNECTIONS),
+            "per_thread": run_reruns("per-thread", pooled_rerun_reads, args.reruns, workdir, 0),
+            "pooled": run_reruns("pooled", pooled_rerun_reads, args.reruns, workdir, database.MAX_IDLE_CONNECTIONS),
+        }
+        database.close_connections()
+    database.DB_NAME = original_db
+
+    for key in ("inserts_per_second", "reads_per_second"):
+        speedup = results["after"][key] / results["before"][key]
+        print(f"{key:>20}: before {results['before'][key]:>10}  after {results['after'][key]:>10}  ({speedup:.1f}x)")
+    for label, result in reruns.items():
+        print(f"{'reruns ' + label:>28}: {result['reruns_per_second']:>10}/s  {result['connections_opened']:>5} connections opened")
+    print(json.dumps({**results, "reruns": reruns}))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Throughput benchmark for src/sanitizer.py on large texts: the original two-pass
+re.sub implementation ("legacy", emails + US phones only) versus the single-pass
+engine (all categories), whole-string and chunked streaming.
+
+    python -m benchmarks.bench_sanitizer --megabytes 8 --chunk 64 --pii-rate 0.05
+"""
+import argparse
+import json
+import random
+import re
+import time
+from src.config import SanitizationConfig
+from src.sanitizer import Sanitizer
+
+FILLER = ("The orchestrator broadcasts each query to every specialist agent and merges "
+          "their answers, weighting each by confidence. ")
+PII = ["jane.doe@example.com", "555-123-4567", "37.7749, -122.4194", "123-45-6789", "My name is Alan Turing"]
+
+def legacy_sanitize(text):
+    text = re.sub(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', "[EMAIL REDACTED]", text)
+    return re.sub(r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b', "[PHONE REDACTED]", text)
+
+def make_text(megabytes, pii_rate, seed=7):
+    rng = random.Random(seed)
+    parts, size = [], 0
+    while size < megabytes * 1_000_000:
+        piece = FILLER if rng.random() > pii_rate else f"{rng.choice(PII)}. "
+        parts.append(piece)
+        size += len(piece)
+    return "".join(parts)
+
+def mb_per_second(text, fn):
+    start = time.perf_counter()
+    fn(text)
+    return round(len(text) / 1_000_000 / (time.perf_counter() - start), 2)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--megabytes", type=float, default=8)
+    parser.add_argument("--chunk", type=int, default=64, help="chunk size for the streaming run")
+    parser.add_argument("--pii-rate", type=float, default=0.05, help="fraction of sentences that contain PII")
+    args = parser.parse_args()
+
+    text = make_text(args.megabytes, args.pii_rate)
+    sanitizer = Sanitizer(SanitizationConfig(redact_user_pii=True, pii_rules=""))
+
+    def streamed(t):
+        stream = sanitizer.stream()
+        return "".join(stream.redact_all(t[i:i + args.chunk] for i in range(0, len(t), args.chunk)))
+
+    assert streamed(text) == sanitizer.sanitize(text)
+    results = {
+        "megabytes": args.megabytes,
+        "pii_rate": args.pii_rate,
+        "legacy_two_pass": mb_per_second(text, legacy_sanitize),
+        "single_pass": mb_per_second(text, sanitizer.sanitize),
+        f"streaming_{args.chunk}b_chunks": mb_per_second(text, streamed),
+    }
+    for key, value in results.items():
+        print(f"{key:>24}: {value}{' MB/s' if key not in ('megabytes', 'pii_rate') else ''}")
+    print(json.dumps(results))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""
+Offline stand-in for an OpenAI-compatible chat-completions API, so the RealAgent and
+Combiner network path (HTTP client, SSE streaming, JSON parsing, retries) can be
+load-tested and profiled without network access or API keys.
+
+    python -m benchmarks.fake_llm_server --port 8100 --latency lognormal:-0.5,0.4 \\
+        --rate-limit-rate 0.05 --malformed-rate 0.05 --timeout-rate 0.01
+    LLM_BASE_URL=http://127.0.0.1:8100/v1 OPENROUTER_API_KEY=fake streamlit run app.py
+
+Per request it draws one outcome: 429 with Retry-After, a hang of --hang-seconds
+(the client's timeout fires first), a 200 whose message content is truncated JSON,
+or a normal answer. Answers are shaped like the real ones: agent JSON, one-line
+critiques, and the Combiner's synthesis JSON. stream=true is served as SSE chunks
+(--token-delay apart), with a usage chunk when stream_options.include_usage is set.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Optional
+from benchmarks.load_test import parse_distribution
+
+def _tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+def _content_for(messages) -> str:
+    prompt = messages[-1].get("content", "") if messages else ""
+    if "Chief Editor" in prompt:
+        return json.dumps({
+            "final_answer": "Synthesized answer from the fake server. " * 40,
+            "combined_confidence": 0.82,
+            "disagreement": "None of note.",
+            "recommended_next_steps": "Ask a follow-up question.",
+        })
+    if prompt.startswith("Briefly critique"):
+        return "The answers agree on the essentials but could cite sources."
+    return json.dumps({
+        "answer": "A plausible answer from the fake server. " * 12,
+        "rationale": "Canned response.",
+        "confidence": 0.8,
+        "sources": ["fake-server"],
+    })
+
+class FakeLLMServer:
+    """Threaded fake endpoint; use start()/stop() in-process or run the module as a script."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8100,
+                 latency: Optional[Callable[[], float]] = None, token_delay: float = 0.01,
+                 rate_limit_rate: float = 0.0, malformed_rate: float = 0.0,
+                 timeout_rate: float = 0.0, hang_seconds: float = 120.0, seed: int = 7):
+        self.latency = latency or (lambda: 0.0)
+        self.token_delay = token_delay
+        self.rate_limit_rate = rate_limit_rate
+        self.malformed_rate = malformed_rate
+        self.timeout_rate = timeout_rate
+        self.hang_seconds = hang_seconds
+        self.rng = random.Random(seed)
+        self.outcomes: Counter = Counter()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def _draw(self) -> str:
+        with self._lock:
+            roll = self.rng.random()
+            if roll < self.rate_limit_rate:
+                outcome = "rate_limited"
+            elif roll < self.rate_limit_rate + self.timeout_rate:
+                outcome = "timeout"
+            elif roll < self.rate_limit_rate + self.timeout_rate + self.malformed_rate:
+                outcome = "malformed"
+            else:
+                outcome = "ok"
+            self.outcomes[outcome] += 1
+            return outcome
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the real APIs
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _write_chunk(self, data: bytes):
+                self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+
+            def do_GET(self):
+                if self.path.rstrip("/").endswith("/models"):
+                    self._send_json(200, {"object": "list", "data": [{"id": "fake", "object": "model"}]})
+                else:
+                    self._send_json(404, {"error": {"message": "Not found"}})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    request = json.loads(self.rfile.read(length) or b"{}")
+                except json.JSONDecodeError:
+                    self._send_json(400, {"error": {"message": "Invalid JSON body"}})
+                    return
+                if not self.path.endswith("/chat/completions"):
+                    self._send_json(404, {"error": {"message": "Not found"}})
+                    return
+
+                outcome = server._draw()
+                try:
+                    if outcome == "rate_limited":
+                        self._send_json(429, {"error": {"message": "Rate limit exceeded", "type": "rate_limit_error", "code": 429}},
+                                        {"Retry-After": "1"})
+                        return
+                    if outcome == "timeout":
+                        server._stop.wait(server.hang_seconds)
+                    else:
+                        time.sleep(server.latency())
+                    content = _content_for(request.get("messages", []))
+                    if outcome == "malformed":
+                        content = content[: len(content) // 2]
+                    finish_reason = "stop"
+                    if request.get("max_tokens") and _tokens(content) > request["max_tokens"]:
+                        # Cut off at the budget, like a real API
+                        content, finish_reason = content[: request["max_tokens"] * 4], "length"
+                    if request.get("stream"):
+                        self._stream(request, content, finish_reason)
+                    else:
+                        self._complete(request, content, finish_reason)
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client gave up (timeout or cancellation)
+                    pass
+
+            def _usage(self, request, content) -> Dict[str, int]:
+                prompt = sum(_tokens(m.get("content", "")) for m in request.get("messages", []))
+                completion = _tokens(content)
+                return {"prompt_tokens": prompt, "completion_tokens": completion, "total_tokens": prompt + completion}
+
+            def _complete(self, request, content: str, finish_reason: str = "stop"):
+                self._send_json(200, {
+                    "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": request.get("model", "fake"),
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": finish_reason}],
+                    "usage": self._usage(request, content),
+                })
+
+            def _stream(self, request, content: str, finish_reason: str = "stop"):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                base = {"id": f"chatcmpl-{uuid.uuid4().hex[:12]}", "object": "chat.completion.chunk",
+                        "created": int(time.time()), "model": request.get("model", "fake")}
+
+                def event(payload):
+                    self._write_chunk(f"data: {json.dumps({**base, **payload})}\n\n".encode("utf-8"))
+
+                words = content.split(" ")
+                for i in range(0, len(words), 4):
+                    piece = " ".join(words[i:i + 4]) + (" " if i + 4 < len(words) else "")
+                    event({"choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]})
+                    time.sleep(server.token_delay)
+                event({"choices": [{"index": 0, "delta": {}, "finish_reason": finish_reason}]})
+                if (request.get("stream_options") or {}).get("include_usage"):
+                    event({"choices": [], "usage": self._usage(request, content)})
+                self._write_chunk(b"data: [DONE]\n\n")
+                self._write_chunk(b"")
+
+        return Handler
+
+    def start(self) -> "FakeLLMServer":
+        threading.Thread(target=self.httpd.serve_forever, daemon=True, name="fake-llm").start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency", default="const:0.3", help="time to first byte (see benchmarks.load_test)")
+    parser.add_argument("--token-delay", type=float, default=0.01, help="seconds between streamed chunks")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="share of requests answered with 429")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="share of answers with truncated JSON content")
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="share of requests that hang")
+    parser.add_argument("--hang-seconds", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    server = FakeLLMServer(args.host, args.port, parse_distribution(args.latency, rng, 1.0), args.token_delay,
+                           args.rate_limit_rate, args.malformed_rate, args.timeout_rate, args.hang_seconds, args.seed)
+    print(f"Fake OpenAI-compatible API at {server.base_url} (Ctrl+C to stop)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"Outcomes: {dict(server.outcomes)}")
+        server.stop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""
+Load test for MultiAgentOrchestrator.process_query: Poisson arrivals served by at
+most N concurrent users, SimulatedAgents with a configurable latency distribution
+and failure rate. Reports throughput, p50/p95/p99 per stage and peak memory, and
+writes the result as JSON so runs can be compared.
+
+    python -m benchmarks.load_test --users 20 --requests 200 --rate 10 \\
+        --latency lognormal:-0.3,0.5 --failure-rate 0.05 --output load.json
+    python -m benchmarks.load_test --compare load.json --max-regression 0.2
+
+Latency distributions (seconds per agent call): const:X, uniform:LO,HI, exp:MEAN,
+lognormal:MU,SIGMA. --time-scale multiplies every simulated delay (0.1 = 10x faster).
+
+--base-url switches to RealAgents and the LLM Combiner against an OpenAI-compatible
+endpoint, normally benchmarks/fake_llm_server.py; --fake-server starts one in-process
+(it then shares the GIL with the orchestrator, so prefer a separate process for profiling).
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import resource
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from typing import Callable, Dict, List
+from src.config import load_config
+from src.orchestrator import MultiAgentOrchestrator
+from src.agents.simulated import SimulatedAgent
+from src.metrics import STAGE_SECONDS, AGENT_SECONDS, AGENT_ERRORS, AGENT_TIMEOUTS, QUORUM_CUTOFFS
+
+QUERIES = [
+    "How do vaccines train the immune system?",
+    "Compare TCP and UDP for multiplayer games.",
+    "Why do leaves change colour in autumn?",
+    "Explain how CRISPR-Cas9 edits a gene.",
+    "What are the trade-offs of microservices versus a monolith?",
+]
+
+def parse_distribution(spec: str, rng: random.Random, scale: float) -> Callable[[], float]:
+    kind, _, raw = spec.partition(":")
+    params = [float(p) for p in raw.split(",") if p]
+    if kind == "const":
+        return lambda: params[0] * scale
+    if kind == "uniform":
+        return lambda: rng.uniform(params[0], params[1]) * scale
+    if kind == "exp":
+        return lambda: rng.expovariate(1.0 / params[0]) * scale
+    if kind == "lognormal":
+        return lambda: rng.lognormvariate(params[0], params[1]) * scale
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {}
+    ordered = sorted(values)
+
+    def pick(q):
+        return round(ordered[min(len(ordered) - 1, math.ceil(q * len(ordered)) - 1)], 4)
+
+    return {"count": len(ordered), "mean": round(sum(ordered) / len(ordered), 4),
+            "p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99), "max": round(ordered[-1], 4)}
+
+class SampleTap:
+    """Records raw observations of a metrics histogram (its buckets are too coarse for p99)."""
+
+    def __init__(self, histogram, *labels: str):
+        self.histogram = histogram
+        self.labels = labels
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self._observe = histogram.observe
+
+    def __enter__(self):
+        def observe(value, **labels):
+            self.samples["/".join(labels[name] for name in self.labels)].append(value)
+            self._observe(value, **labels)
+        self.histogram.observe = observe
+        return self
+
+    def __exit__(self, *exc):
+        del self.histogram.observe
+
+async def drive(orchestrator: MultiAgentOrchestrator, args, rng: random.Random) -> Dict[str, object]:
+    users = asyncio.Semaphore(args.users)
+    end_to_end: List[float] = []
+    queue_wait: List[float] = []
+    errors: List[str] = []
+    agent_errors = sum(AGENT_ERRORS.values.values())
+    agent_timeouts = sum(AGENT_TIMEOUTS.values.values())
+    quorum_cutoffs = sum(QUORUM_CUTOFFS.values.values())
+
+    async def one_request(i: int):
+        arrived = time.perf_counter()
+        async with users:
+            started = time.perf_counter()
+            queue_wait.append(started - arrived)
+            query = f"{QUERIES[i % len(QUERIES)]} (request {i})"
+            try:
+                await orchestrator.process_query(query)
+            except Exception as e:
+                errors.append(f"{type(e).__name__}: {e}")
+            end_to_end.append(time.perf_counter() - arrived)
+
+    tasks = []
+    start = time.perf_counter()
+    for i in range(args.requests):
+        tasks.append(asyncio.create_task(one_request(i)))
+        # Poisson process: exponential gaps between arrivals
+        await asyncio.sleep(rng.expovariate(args.rate))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_rps": round(len(end_to_end) / elapsed, 3),
+        "errors": len(errors),
+        "error_samples": errors[:5],
+        "agent_errors": int(sum(AGENT_ERRORS.values.values()) - agent_errors),
+        "agent_timeouts": int(sum(AGENT_TIMEOUTS.values.values()) - agent_timeouts),
+        "quorum_cutoffs": int(sum(QUORUM_CUTOFFS.values.values()) - quorum_cutoffs),
+        "end_to_end": percentiles(end_to_end),
+        "queue_wait": percentiles(queue_wait),
+    }
+
+def run(args) -> Dict[str, object]:
+    rng = random.Random(args.seed)
+    random.seed(args.seed)
+    config = load_config(args.config)
+    config.cache.enabled = args.cache
+    config.routing.enabled = args.routing
+    config.metrics.enabled = False
+
+    fake_server = None
+    if args.fake_server:
+        from benchmarks.fake_llm_server import FakeLLMServer
+        fake_server = FakeLLMServer(port=0, latency=parse_distribution(args.latency, rng, args.time_scale),
+                                    token_delay=0.002 * args.time_scale, seed=args.seed).start()
+        args.base_url = fake_server.base_url
+
+    if args.base_url:
+        config.http.base_url = args.base_url
+        os.environ.setdefault("OPENROUTER_API_KEY", "fake-key")
+        orchestrator = MultiAgentOrchestrator(config, use_real_agents=True)
+    else:
+        orchestrator = MultiAgentOrchestrator(config, use_real_agents=False)
+        latency = parse_distribution(args.latency, rng, args.time_scale)
+        critique_latency = parse_distribution(args.critique_latency, rng, args.time_scale)
+        orchestrator.agents = [
+            SimulatedAgent(a.name, a.vendor, a.template, latency=latency,
+                           critique_latency=critique_latency, failure_rate=args.failure_rate)
+            for a in config.agents
+        ]
+
+    tracemalloc.start()
+    with SampleTap(STAGE_SECONDS, "stage") as stages, SampleTap(AGENT_SECONDS, "agent", "kind") as agents:
+        summary = asyncio.run(drive(orchestrator, args, rng))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    if fake_server is not None:
+        fake_server.stop()
+
+    return {
+        "params": {k: v for k, v in vars(args).items() if k not in ("output", "compare", "max_regression")},
+        "environment": {"python": platform.python_version(), "platform": platform.platform()},
+        **summary,
+        "stages": {name: percentiles(values) for name, values in sorted(stages.samples.items())},
+        "agents": {name: percentiles(values) for name, values in sorted(agents.samples.items())},
+        "peak_traced_memory_mb": round(peak / 1_000_000, 2),
+        # ru_maxrss is KiB on Linux, bytes on macOS
+        "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1_000_000 if sys.platform == "darwin" else 1_000), 2),
+    }
+
+def compare(current: Dict[str, object], baseline: Dict[str, object], max_regression: float) -> List[str]:
+    """Returns the metrics that got worse than the baseline by more than `max_regression` (a fraction)."""
+    regressions = []
+    rows = [("throughput_rps", baseline["throughput_rps"], current["throughput_rps"], False),
+            ("peak_traced_memory_mb", baseline["peak_traced_memory_mb"], current["peak_traced_memory_mb"], True)]
+    for stage in ["end_to_end"] + sorted(current["stages"]):
+        old = baseline["end_to_end"] if stage == "end_to_end" else baseline["stages"].get(stage, {})
+        new = current["end_to_end"] if stage == "end_to_end" else current["stages"][stage]
+        for q in ("p50", "p95", "p99"):
+            if q in old and q in new:
+                rows.append((f"{stage}.{q}", old[q], new[q], True))
+
+    print(f"\n{'metric':>28} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, old, new, lower_is_better in rows:
+        change = (new - old) / old if old else 0.0
+        worse = change > max_regression if lower_is_better else change < -max_regression
+        print(f"{name:>28} {old:>10} {new:>10} {change:>+8.1%}{'  REGRESSION' if worse else ''}")
+        if worse:
+            regressions.append(name)
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--config", default="orchestrator_config.yaml")
+    parser.add_argument("--users", type=int, default=10, help="maximum concurrent in-flight queries")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--rate", type=float, default=5.0, help="mean arrivals per second (Poisson)")
+    parser.add_argument("--latency", default="uniform:0.5,1.5", help="agent answer latency distribution")
+    parser.add_argument("--critique-latency", default="const:0.2", help="agent critique latency distribution")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="share of agent answers that fail")
+    parser.add_argument("--time-scale", type=float, default=1.0, help="multiplier applied to every simulated delay")
+    parser.add_argument("--cache", action="store_true", help="keep the response cache on (off by default)")
+    parser.add_argument("--routing", action="store_true", help="keep adaptive routing on (off by default)")
+    parser.add_argument("--base-url", help="OpenAI-compatible endpoint for RealAgents (e.g. the fake server)")
+    parser.add_argument("--fake-server", action="store_true", help="start benchmarks.fake_llm_server in-process")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="write the JSON result here")
+    parser.add_argument("--compare", help="baseline JSON from an earlier run")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="allowed slowdown before --compare fails")
+    args = parser.parse_args()
+
+    result = run(args)
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(result, baseline, args.max_regression)
+        if regressions:
+            print(f"\nRegressions beyond {args.max_regression:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
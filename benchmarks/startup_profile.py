@@ -0,0 +1,147 @@
+"""
+Cold-start profile: import time of the entry modules and the one-time init stages,
+each measured in fresh interpreters (the best of --repeat runs), so it reflects what a
+container pays when it wakes up.
+
+    python -m benchmarks.startup_profile --output startup.json
+    python -m benchmarks.startup_profile --compare startup.json --max-regression 0.25
+
+Imports come from `python -X importtime` (cumulative time of the module, interpreter
+start excluded). Stages come from src.startup: config load, building the orchestrator
+in simulated and real mode, the first API client (where the vendor SDKs are imported
+now) and the app's database init, cold (creates the admin, bcrypt) and warm.
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+MODULES = ["src.config", "src.orchestrator", "src.service", "src.batch", "openai", "google.generativeai", "httpx"]
+
+STAGES_SCRIPT = r"""
+import json, os, sys
+from src.startup import startup
+with startup.stage("import src.config"):
+    from src.config import load_config
+with startup.stage("load_config"):
+    config = load_config(sys.argv[1])
+with startup.stage("import src.orchestrator"):
+    from src.orchestrator import MultiAgentOrchestrator
+with startup.stage("orchestrator (simulated)"):
+    MultiAgentOrchestrator(config)
+loaded_openai = "openai" in sys.modules
+with startup.stage("orchestrator (real)"):
+    orchestrator = MultiAgentOrchestrator(config, use_real_agents=True)
+with startup.stage("first API client"):
+    orchestrator.agents[0].client
+from src import database
+database.DB_NAME = os.path.join(sys.argv[2], "users.db")
+with startup.stage("init_db (cold)"):
+    database.init_db()
+    database.create_admin_if_not_exists()
+with startup.stage("init_db (warm)"):
+    database.init_db()
+    database.create_admin_if_not_exists()
+print("STAGES " + json.dumps({"stages": startup.report(), "simulated_loaded_openai": loaded_openai}))
+"""
+
+_IMPORTTIME = re.compile(r"import time:\s+\d+\s+\|\s+(\d+)\s+\|\s*(\S+)\s*$")
+
+def _env() -> Dict[str, str]:
+    # A fake key makes RealAgents build API clients; nothing is sent over the network
+    return {**os.environ, "OPENROUTER_API_KEY": "fake-key"}
+
+def interpreter_seconds(repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+        best = min(best, time.perf_counter() - start)
+    return round(best, 4)
+
+def import_seconds(module: str, repeat: int) -> Optional[float]:
+    """Best cumulative import time of `module` in a fresh interpreter; None if it is not installed."""
+    best = None
+    for _ in range(repeat):
+        proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                              capture_output=True, text=True, env=_env())
+        if proc.returncode != 0:
+            return None
+        for line in proc.stderr.splitlines():
+            match = _IMPORTTIME.match(line)
+            if match and match.group(2) == module:
+                seconds = int(match.group(1)) / 1_000_000
+                best = seconds if best is None else min(best, seconds)
+    return round(best, 4) if best is not None else None
+
+def stage_seconds(config: str, repeat: int) -> Dict[str, object]:
+    best: Dict[str, float] = {}
+    simulated_loaded_openai = False
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as workdir:
+            proc = subprocess.run([sys.executable, "-c", STAGES_SCRIPT, config, workdir],
+                                  capture_output=True, text=True, env=_env(), check=True)
+        line = next(l for l in proc.stdout.splitlines() if l.startswith("STAGES "))
+        result = json.loads(line[len("STAGES "):])
+        simulated_loaded_openai |= result["simulated_loaded_openai"]
+        for row in result["stages"]:
+            best[row["stage"]] = min(best.get(row["stage"], float("inf")), row["seconds"])
+    return {"stages": best, "simulated_loaded_openai": simulated_loaded_openai}
+
+def run(args) -> Dict[str, object]:
+    return {
+        "environment": {"python": platform.python_version(), "platform": platform.platform()},
+        "interpreter_seconds": interpreter_seconds(args.repeat),
+        "imports": {m: import_seconds(m, args.repeat) for m in MODULES},
+        **stage_seconds(args.config, args.repeat),
+    }
+
+def compare(current: Dict[str, object], baseline: Dict[str, object], max_regression: float) -> List[str]:
+    """Imports and stages that got slower than the baseline by more than `max_regression` (a fraction)."""
+    rows = [(f"import {k}", baseline["imports"].get(k), v) for k, v in current["imports"].items()]
+    rows += [(k, baseline["stages"].get(k), v) for k, v in current["stages"].items()]
+    regressions = []
+    print(f"\n{'measurement':>34} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, old, new in rows:
+        if old is None or new is None:
+            continue
+        change = (new - old) / old if old else 0.0
+        worse = change > max_regression
+        print(f"{name:>34} {old:>10} {new:>10} {change:>+8.1%}{'  REGRESSION' if worse else ''}")
+        if worse:
+            regressions.append(name)
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--config", default="orchestrator_config.yaml")
+    parser.add_argument("--repeat", type=int, default=3, help="fresh interpreters per measurement (best is kept)")
+    parser.add_argument("--output", help="write the JSON result here")
+    parser.add_argument("--compare", help="baseline JSON from an earlier run")
+    parser.add_argument("--max-regression", type=float, default=0.25, help="allowed slowdown before --compare fails")
+    args = parser.parse_args()
+
+    result = run(args)
+    print(json.dumps(result, indent=2))
+    if result["simulated_loaded_openai"]:
+        print("\nWarning: building a simulated orchestrator imported the openai SDK")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(result, baseline, args.max_regression)
+        if regressions:
+            print(f"\nRegressions beyond {args.max_regression:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
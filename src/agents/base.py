@@ -1,6 +1,15 @@
 from abc import ABC, abstractmethod
 from typing import List, Optional, Dict, Any
 from pydantic import BaseModel
+from src.config import PhaseBudget
+
+CRITIQUE_FAILED = "Critique failed."
+
+def length_instruction(budget: Optional[PhaseBudget]) -> str:
+    """Prompt suffix asking the model to fit its reply into the budget's max_tokens."""
+    if budget is None or budget.word_limit is None:
+        return ""
+    return f"\n\nKeep your entire reply under about {budget.word_limit} words; this limit overrides any minimum length above."
 
 class AgentResponse(BaseModel):
     name: str
@@ -8,6 +17,8 @@ class AgentResponse(BaseModel):
     rationale: str
     confidence: float
     sources: List[str]
+    # False when the reply hit max_tokens or was not the requested JSON: still used, never cached
+    complete: bool = True
 
 class BaseAgent(ABC):
     def __init__(self, name: str, vendor: str, template: str):
@@ -15,15 +26,23 @@ class BaseAgent(ABC):
         self.vendor = vendor
         self.template = template
 
+    @property
+    def model_id(self) -> str:
+        """Identifier of the model behind this agent (part of the response cache key)."""
+        return self.vendor
+
     @abstractmethod
-    async def query(self, user_query: str, history: Optional[List[Dict[str, str]]] = None) -> AgentResponse:
+    async def query(self, user_query: str, history: Optional[List[Dict[str, str]]] = None, budget: Optional[PhaseBudget] = None) -> AgentResponse:
         """
         Broadcasts the user query to the agent and returns a structured response.
+        `history` is the conversation so far as chat messages (an optional "system"
+        summary of older turns, then recent user/assistant turns), see src.context.
+        `budget` caps generation (max_tokens, temperature) for this call.
         """
         pass
 
     @abstractmethod
-    async def critique(self, other_responses: List[Dict[str, Any]]) -> str:
+    async def critique(self, other_responses: List[Dict[str, Any]], budget: Optional[PhaseBudget] = None) -> str:
         """
         Asks the agent to critique other agents' answers.
         Returns a short string or JSON snippet.
@@ -1,19 +1,21 @@
 import os
 import json
-import asyncio
 from typing import List, Optional, Dict, Any
-from src.agents.base import BaseAgent, AgentResponse
-
-# Import SDKs
-try:
-    from openai import AsyncOpenAI
-except ImportError:
-    print("Warning: openai SDK not installed.")
-
-try:
-    import google.generativeai as genai
-except ImportError:
-    print("Warning: google-generativeai SDK not installed.")
+from src.agents.base import BaseAgent, AgentResponse, CRITIQUE_FAILED, length_instruction
+from src.config import PhaseBudget
+from src.clients import registry, OPENROUTER_BASE_URL
+from src.resilience import resilience
+from src.json_stream import parse_tolerant
+from src.metrics import record_openai_usage, record_gemini_usage
+from src.startup import load_sdk
+
+def gemini_truncated(response) -> bool:
+    """True when a google-generativeai reply stopped at max_output_tokens."""
+    try:
+        reason = response.candidates[0].finish_reason
+    except (AttributeError, IndexError):
+        return False
+    return getattr(reason, "name", reason) in ("MAX_TOKENS", 2)
 
 class RealAgent(BaseAgent):
     """
@@ -24,36 +26,42 @@ class RealAgent(BaseAgent):
 
     def __init__(self, name: str, vendor: str, template: str):
         super().__init__(name, vendor, template)
-        self.client = None
+        self.base_url = registry.base_url
         self.is_native_google = False
+        self._google_configured = False
         
-        if vendor == "Google":
+        # With a custom endpoint (e.g. the offline fake server) Gemini goes through it as well
+        if vendor == "Google" and self.base_url == OPENROUTER_BASE_URL:
             self.api_key = os.getenv("GOOGLE_API_KEY")
             if self.api_key and not self.api_key.startswith("sk-or-v1"):
                 self.is_native_google = True
-                self._setup_google_client()
             else:
                 # Fallback to OpenRouter if the key looks like an OpenRouter key
                 self.api_key = os.getenv("GOOGLE_OPENROUTER_KEY") or os.getenv("OPENROUTER_API_KEY")
-                self._setup_openrouter_client()
         else:
             self.api_key = os.getenv("OPENROUTER_API_KEY")
-            self._setup_openrouter_client()
 
-    def _setup_google_client(self):
-        try:
-            genai.configure(api_key=self.api_key)
+    def _google_model(self, model_name: str):
+        """Imports and configures the Gemini SDK on first use, then returns the cached model."""
+        if not self._google_configured:
+            genai = load_sdk("google.generativeai")
+            if genai is None:
+                raise RuntimeError("google-generativeai SDK not installed")
             # We don't store a persistent client object for genai, we use the module + model instantiation
-            pass
-        except Exception as e:
-            print(f"Failed to setup Google Client: {e}")
+            genai.configure(api_key=self.api_key)
+            self._google_configured = True
+        return registry.get_genai_model(model_name)
 
-    def _setup_openrouter_client(self):
-        if self.api_key:
-            self.client = AsyncOpenAI(
-                api_key=self.api_key,
-                base_url="https://openrouter.ai/api/v1"
-            )
+    @property
+    def client(self):
+        """Shared OpenRouter client from the process-wide registry (None without a key)."""
+        if self.is_native_google or not self.api_key:
+            return None
+        return registry.get_openai_client(self.api_key, self.base_url)
+
+    @property
+    def model_id(self) -> str:
+        return "gemini-1.5-flash" if self.is_native_google else self._get_openrouter_model()
 
     def _get_openrouter_model(self) -> str:
         """Maps the agent vendor/name to a specific OpenRouter model ID."""
@@ -66,33 +74,46 @@ class RealAgent(BaseAgent):
         elif "Character" in self.name: return "meta-llama/llama-3-70b-instruct"
         return "openai/gpt-3.5-turbo"
 
-    async def query(self, user_query: str, history: Optional[List[Dict[str, str]]] = None) -> AgentResponse:
+    def _generation_config(self, budget: Optional[PhaseBudget]) -> Dict[str, Any]:
+        """A phase budget in google-generativeai's terms."""
+        sampling = (budget or PhaseBudget()).completion_kwargs()
+        config = {"temperature": sampling["temperature"]} if "temperature" in sampling else {}
+        if "max_tokens" in sampling:
+            config["max_output_tokens"] = sampling["max_tokens"]
+        return config
+
+    async def query(self, user_query: str, history: Optional[List[Dict[str, str]]] = None, budget: Optional[PhaseBudget] = None) -> AgentResponse:
         
         # --- PATH 1: Native Google Gemini ---
         if self.is_native_google:
-            return await self._query_google_native(user_query)
+            return await self._query_google_native(user_query, budget, history)
             
         # --- PATH 2: OpenRouter ---
         if self.client:
-            return await self._query_openrouter(user_query)
+            return await self._query_openrouter(user_query, budget, history)
 
         # --- Fallback ---
         return await self._simulate_response(user_query, missing_key=True)
 
-    async def _query_google_native(self, user_query: str) -> AgentResponse:
+    async def _query_google_native(self, user_query: str, budget: Optional[PhaseBudget] = None, history: Optional[List[Dict[str, str]]] = None) -> AgentResponse:
         try:
-            # Create model instance (Flash is safer availability-wise than Pro for some keys)
-            model = genai.GenerativeModel("gemini-1.5-flash") 
+            # Cached model instance (Flash is safer availability-wise than Pro for some keys)
+            model = self._google_model("gemini-1.5-flash")
             
             # Combine template + query because Gemini handles system prompts differently or via config
             # But simple concatenation works well for this use case
-            full_prompt = f"System: {self.template}\n\nUser: {user_query}\n\nRespond in strict JSON."
+            conversation = "".join(f"{m['role'].capitalize()}: {m['content']}\n\n" for m in history or [])
+            full_prompt = f"System: {self.template}{length_instruction(budget)}\n\n{conversation}User: {user_query}\n\nRespond in strict JSON."
+            generation_config = self._generation_config(budget)
             
-            # Run in thread executor because google SDK is sync
-            response = await asyncio.to_thread(model.generate_content, full_prompt)
+            # The google SDK is sync: run it on the vendor's own thread pool. No hedging: threads cannot be cancelled.
+            response = await resilience.call(self.vendor, lambda: registry.run_sync(
+                self.vendor, lambda: model.generate_content(full_prompt, generation_config=generation_config)
+            ), hedge=False)
+            record_gemini_usage(self.name, response)
             raw_content = response.text
             
-            return self._parse_json_response(raw_content)
+            return self._parse_json_response(raw_content, truncated=gemini_truncated(response))
 
         except Exception as e:
             print(f"Error calling Native Google API: {e}")
@@ -104,20 +125,22 @@ class RealAgent(BaseAgent):
                 sources=[]
             )
 
-    async def _query_openrouter(self, user_query: str) -> AgentResponse:
+    async def _query_openrouter(self, user_query: str, budget: Optional[PhaseBudget] = None, history: Optional[List[Dict[str, str]]] = None) -> AgentResponse:
         try:
             model_id = self._get_openrouter_model()
-            response = await self.client.chat.completions.create(
+            response = await resilience.call(self.vendor, lambda: self.client.chat.completions.create(
                 model=model_id,
                 messages=[
-                    {"role": "system", "content": self.template},
+                    {"role": "system", "content": self.template + length_instruction(budget)},
+                    *(history or []),
                     {"role": "user", "content": user_query}
                 ],
-                temperature=0.7,
-                extra_headers={"HTTP-Referer": "http://localhost:8501", "X-Title": "Multi-Agent Orchestrator"}
-            )
+                extra_headers={"HTTP-Referer": "http://localhost:8501", "X-Title": "Multi-Agent Orchestrator"},
+                **(budget or PhaseBudget()).completion_kwargs(default_temperature=0.7)
+            ))
+            record_openai_usage(self.name, response)
             raw_content = response.choices[0].message.content
-            return self._parse_json_response(raw_content)
+            return self._parse_json_response(raw_content, truncated=response.choices[0].finish_reason == "length")
 
         except Exception as e:
             print(f"Error calling OpenRouter for {self.name}: {e}")
@@ -129,49 +152,80 @@ class RealAgent(BaseAgent):
                 sources=[]
             )
 
-    def _parse_json_response(self, raw_content: str) -> AgentResponse:
-        try:
-            clean_json = raw_content.replace("```json", "").replace("```", "").strip()
-            data = json.loads(clean_json)
-            
-            # Normalize keys
-            if "response" in data and "answer" not in data: data["answer"] = data["response"]
-            if "reasoning" in data and "rationale" not in data: data["rationale"] = data["reasoning"]
-            if "confidence" not in data: data["confidence"] = 0.5
-            if "sources" not in data: data["sources"] = []
-            
-            return AgentResponse(**data, name=self.name)
-        except (json.JSONDecodeError, Exception) as e:
+    def _parse_json_response(self, raw_content: Optional[str], truncated: bool = False) -> AgentResponse:
+        if not (raw_content or "").strip():
+            # Content filter, or max_tokens spent before any text: no answer to use
+            return AgentResponse(
+                name=self.name,
+                answer="Error: empty completion",
+                rationale="API Call Failed",
+                confidence=0.0,
+                sources=[]
+            )
+
+        # Recovers fields from fenced, truncated or slightly broken JSON as well.
+        # The agent call itself is not streamed, so this parses the finished completion
+        data = parse_tolerant(raw_content or "") or {}
+        
+        # Normalize keys
+        if "response" in data and "answer" not in data: data["answer"] = data["response"]
+        if "reasoning" in data and "rationale" not in data: data["rationale"] = data["reasoning"]
+        
+        if not isinstance(data.get("answer"), str) or not data["answer"].strip():
             return AgentResponse(
                 name=self.name,
                 answer=raw_content,
                 rationale="Model returned plain text.",
-                confidence=0.7,
-                sources=["Raw Output"]
+                # Unknown, same as a JSON answer without a confidence field
+                confidence=0.5,
+                sources=["Raw Output"],
+                complete=False
             )
+        
+        try:
+            confidence = min(max(float(data.get("confidence", 0.5)), 0.0), 1.0)
+        except (TypeError, ValueError):
+            confidence = 0.5
+        sources = data.get("sources") or []
+        return AgentResponse(
+            name=self.name,
+            answer=data["answer"],
+            rationale=str(data.get("rationale") or ""),
+            confidence=confidence,
+            sources=[str(s) for s in sources] if isinstance(sources, list) else [str(sources)],
+            complete=not truncated
+        )
 
-    async def critique(self, other_responses: List[Dict[str, Any]]) -> str:
+    async def critique(self, other_responses: List[Dict[str, Any]], budget: Optional[PhaseBudget] = None) -> str:
         # Simple critique logic
         prompt = f"Briefly critique these answers (1 sentence max): {json.dumps(other_responses)}"
         
         if self.is_native_google:
             try:
-                model = genai.GenerativeModel("gemini-1.5-pro")
-                resp = await asyncio.to_thread(model.generate_content, prompt)
+                model = self._google_model("gemini-1.5-pro")
+                generation_config = self._generation_config(budget)
+                resp = await resilience.call(self.vendor, lambda: registry.run_sync(
+                    self.vendor, lambda: model.generate_content(prompt, generation_config=generation_config)
+                ), hedge=False)
+                record_gemini_usage(self.name, resp)
                 return resp.text
-            except:
-                return "Critique failed."
+            except Exception as e:
+                print(f"Critique by {self.name} failed: {e}")
+                return CRITIQUE_FAILED
         
         if self.client:
             try:
                 model_id = self._get_openrouter_model()
-                resp = await self.client.chat.completions.create(
+                resp = await resilience.call(self.vendor, lambda: self.client.chat.completions.create(
                     model=model_id,
-                    messages=[{"role": "user", "content": prompt}]
-                )
+                    messages=[{"role": "user", "content": prompt}],
+                    **(budget or PhaseBudget()).completion_kwargs()
+                ))
+                record_openai_usage(self.name, resp)
                 return resp.choices[0].message.content
-            except:
-                return "Critique failed."
+            except Exception as e:
+                print(f"Critique by {self.name} failed: {e}")
+                return CRITIQUE_FAILED
                 
         return "Simulated Critique: Looks good."
 
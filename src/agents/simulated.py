@@ -1,18 +1,44 @@
 import asyncio
 import json
 import random
-from typing import List, Optional, Dict, Any
+from typing import Callable, List, Optional, Dict, Any
 from src.agents.base import BaseAgent, AgentResponse
+from src.config import PhaseBudget
 
 class SimulatedAgent(BaseAgent):
     """
     A simulated agent that returns mock data based on its persona.
     Useful for testing the orchestration flow without incurring API costs.
+    `latency` and `critique_latency` return a delay in seconds per call (defaults mimic
+    a real API); `failure_rate` is the share of answers that come back failed, the way
+    RealAgent reports API errors.
     """
 
-    async def query(self, user_query: str, history: Optional[List[Dict[str, str]]] = None) -> AgentResponse:
+    def __init__(self, name: str, vendor: str, template: str,
+                 latency: Optional[Callable[[], float]] = None,
+                 critique_latency: Optional[Callable[[], float]] = None,
+                 failure_rate: float = 0.0):
+        super().__init__(name, vendor, template)
+        self.latency = latency or (lambda: random.uniform(0.5, 1.5))
+        self.critique_latency = critique_latency or (lambda: 0.2)
+        self.failure_rate = failure_rate
+
+    @property
+    def model_id(self) -> str:
+        return "simulated"
+
+    async def query(self, user_query: str, history: Optional[List[Dict[str, str]]] = None, budget: Optional[PhaseBudget] = None) -> AgentResponse:
         # Simulate network latency
-        await asyncio.sleep(random.uniform(0.5, 1.5))
+        await asyncio.sleep(self.latency())
+
+        if self.failure_rate and random.random() < self.failure_rate:
+            return AgentResponse(
+                name=self.name,
+                answer="Error: simulated API failure",
+                rationale="API Call Failed",
+                confidence=0.0,
+                sources=[]
+            )
 
         # Mock logic to generate a "persona-based" answer
         # In a real scenario, this would call the LLM API with self.template + user_query
@@ -51,7 +77,7 @@ class SimulatedAgent(BaseAgent):
             sources=sources
         )
 
-    async def critique(self, other_responses: List[Dict[str, Any]]) -> str:
-        await asyncio.sleep(0.2)
+    async def critique(self, other_responses: List[Dict[str, Any]], budget: Optional[PhaseBudget] = None) -> str:
+        await asyncio.sleep(self.critique_latency())
         return f"{self.name} thinks the other answers are generally okay, but could be more specific."
 
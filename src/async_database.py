@@ -0,0 +1,140 @@
+import asyncio
+import concurrent.futures
+import queue
+import threading
+import weakref
+from typing import Any, Callable, Optional
+from src import database
+
+class AsyncStore:
+    """
+    Async facade over src.database for code running on an event loop.
+    Writes are executed in submission order on one dedicated writer thread. At most
+    `max_pending` writes per event loop are queued for the writer; further callers wait
+    (FIFO, without blocking the loop) until one finishes, so a burst neither reorders
+    writes nor grows the queue without bound. Reads go to the default executor; WAL lets
+    them run alongside the writer.
+    """
+
+    def __init__(self, max_pending: int = 256):
+        self.max_pending = max_pending
+        self._queue: "queue.Queue" = queue.Queue()
+        # asyncio semaphores belong to one loop, so each loop gets its own
+        self._rooms: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._writer, name="db-writer", daemon=True)
+        self._thread.start()
+
+    def _writer(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                database.close_connections()
+                return
+            fn, args, future = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args))
+            except BaseException as e:
+                future.set_exception(e)
+
+    def _submit(self, job):
+        """Queues a (fn, args, future) job for the writer; pending() counts it until it is done."""
+        with self._lock:
+            self._pending += 1
+        job[2].add_done_callback(self._done)
+        self._queue.put(job)
+
+    def _done(self, future: concurrent.futures.Future):
+        with self._lock:
+            self._pending -= 1
+
+    def _room(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            room = self._rooms.get(loop)
+            if room is None:
+                room = self._rooms[loop] = asyncio.Semaphore(self.max_pending)
+        return room
+
+    async def _write(self, fn: Callable, *args) -> Any:
+        loop = asyncio.get_running_loop()
+        room = self._room()
+        # Waiters are served in arrival order, and nothing awaits between acquiring and
+        # queueing, so writes commit in the order they were submitted
+        await room.acquire()
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        future.add_done_callback(lambda f: self._release(loop, room))
+        self._submit((fn, args, future))
+        return await asyncio.wrap_future(future)
+
+    @staticmethod
+    def _release(loop: asyncio.AbstractEventLoop, room: asyncio.Semaphore):
+        try:
+            loop.call_soon_threadsafe(room.release)
+        except RuntimeError:
+            pass  # the caller's loop is gone; nobody is left waiting on this room
+
+    async def _read(self, fn: Callable, *args) -> Any:
+        return await asyncio.to_thread(fn, *args)
+
+    def pending(self) -> int:
+        """Writes queued for or running on the writer thread."""
+        with self._lock:
+            return self._pending
+
+    def close(self, timeout: Optional[float] = 5.0):
+        """Finishes queued writes and stops the writer thread."""
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    # --- Writes ---
+    async def create_session(self, user_id, title="New Chat"):
+        return await self._write(database.create_session, user_id, title)
+
+    async def save_message(self, session_id, role, content, details=None):
+        return await self._write(database.save_message, session_id, role, content, details)
+
+    async def save_turn(self, session_id, user_content, assistant_content, details=None, title=None, context=None):
+        return await self._write(database.save_turn, session_id, user_content, assistant_content, details, title, context)
+
+    async def save_session_context(self, session_id, context):
+        return await self._write(database.save_session_context, session_id, context)
+
+    async def update_session_title(self, session_id, new_title):
+        return await self._write(database.update_session_title, session_id, new_title)
+
+    async def delete_session(self, session_id):
+        return await self._write(database.delete_session, session_id)
+
+    # --- Reads ---
+    async def get_user_sessions(self, user_id):
+        return await self._read(database.get_user_sessions, user_id)
+
+    async def get_user_sessions_page(self, user_id, limit=20, before=None):
+        return await self._read(database.get_user_sessions_page, user_id, limit, before)
+
+    async def get_session_messages(self, session_id):
+        return await self._read(database.get_session_messages, session_id)
+
+    async def get_session_messages_page(self, session_id, limit=50, before=None):
+        return await self._read(database.get_session_messages_page, session_id, limit, before)
+
+    async def get_message_agents(self, message_id):
+        return await self._read(database.get_message_agents, message_id)
+
+    async def get_session_context(self, session_id):
+        return await self._read(database.get_session_context, session_id)
+
+_store: Optional[AsyncStore] = None
+_store_lock = threading.Lock()
+
+def get_store() -> AsyncStore:
+    """Process-wide AsyncStore, started on first use."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = AsyncStore()
+        return _store
@@ -0,0 +1,120 @@
+"""
+Batch runner for offline evaluation sets: every query goes through
+MultiAgentOrchestrator.process_many, and each result is appended to an NDJSON
+file the moment it finishes. Rerunning with the same output file resumes: ids
+that already have an "ok" record are skipped, failed ones are retried.
+
+    python -m src.batch questions.jsonl --output results.ndjson --concurrency 8
+    python -m src.batch questions.txt --output results.ndjson --real --profile fast
+
+Input is JSONL ({"id": ..., "query": ...}; "id" defaults to the line number) or
+plain text with one query per line. Per-vendor concurrency and request rates come
+from the `http` section of the config (vendor_limits, vendor_rate_limits).
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional, Set
+from src.config import load_config
+from src.orchestrator import MultiAgentOrchestrator
+
+def load_queries(path: str) -> List[Dict[str, str]]:
+    """Reads {"id", "query"} items from a JSONL file or a plain one-query-per-line file."""
+    items = []
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("{"):
+                record = json.loads(line)
+                query = record.get("query") or record.get("question")
+                if not query:
+                    raise ValueError(f"{path}:{line_no}: no 'query' field")
+                items.append({"id": str(record.get("id", line_no)), "query": query})
+            else:
+                items.append({"id": str(line_no), "query": line})
+    ids = [item["id"] for item in items]
+    if len(set(ids)) != len(ids):
+        raise ValueError(f"{path}: duplicate ids, results could not be resumed")
+    return items
+
+def completed_ids(output_path: str) -> Set[str]:
+    """Ids with an "ok" record in an earlier run's output; a line torn by a crash is ignored."""
+    done: Set[str] = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if record.get("status") == "ok":
+                done.add(str(record["id"]))
+    return done
+
+def _open_for_append(output_path: str):
+    torn = False
+    if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
+        with open(output_path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            torn = f.read(1) != b"\n"
+    f = open(output_path, "a", encoding="utf-8")
+    if torn:
+        # A crash mid-write leaves a partial last line; start the next record on a fresh one
+        f.write("\n")
+    return f
+
+async def run_batch(orchestrator: MultiAgentOrchestrator, items: List[Dict[str, str]], output_path: str,
+                    concurrency: Optional[int] = None, profile: Optional[str] = None, resume: bool = True) -> Dict[str, Any]:
+    """Processes `items` and appends one NDJSON record per query; returns a run summary."""
+    if not resume and os.path.exists(output_path):
+        os.remove(output_path)
+    skip = completed_ids(output_path) if resume else set()
+    todo = [item for item in items if item["id"] not in skip]
+    print(f"Batch: {len(todo)} to run, {len(items) - len(todo)} already done")
+
+    ok = failed = 0
+    start = time.perf_counter()
+    with _open_for_append(output_path) as out:
+        async for index, result in orchestrator.process_many([item["query"] for item in todo], concurrency, profile):
+            item = todo[index]
+            if isinstance(result, Exception):
+                record = {**item, "status": "error", "error": f"{type(result).__name__}: {result}"}
+                failed += 1
+            else:
+                record = {**item, "status": "ok", "result": result}
+                ok += 1
+            out.write(json.dumps(record, default=str) + "\n")
+            out.flush()
+            finished = ok + failed
+            if finished % 10 == 0 or finished == len(todo):
+                elapsed = time.perf_counter() - start
+                print(f"Batch: {finished}/{len(todo)} done ({failed} failed, {finished / elapsed:.2f} queries/s)")
+
+    elapsed = time.perf_counter() - start
+    return {"ran": ok + failed, "ok": ok, "failed": failed, "skipped": len(items) - len(todo),
+            "elapsed_seconds": round(elapsed, 3)}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="JSONL or one-query-per-line text file")
+    parser.add_argument("--output", "-o", required=True, help="NDJSON results file (appended to, for resuming)")
+    parser.add_argument("--config", default="orchestrator_config.yaml")
+    parser.add_argument("--concurrency", type=int, help="queries in flight (default: 2x the per-vendor limit)")
+    parser.add_argument("--profile", help="budgets profile, e.g. fast")
+    parser.add_argument("--real", action="store_true", help="use RealAgents (default: simulated)")
+    parser.add_argument("--no-resume", action="store_true", help="discard earlier results and start over")
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    orchestrator = MultiAgentOrchestrator(config, use_real_agents=args.real)
+    summary = asyncio.run(run_batch(orchestrator, load_queries(args.input), args.output,
+                                    args.concurrency, args.profile, resume=not args.no_resume))
+    print(json.dumps(summary, indent=2))
+
+if __name__ == "__main__":
+    main()
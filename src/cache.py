@@ -0,0 +1,189 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from src.config import CacheConfig
+from src import database
+
+CACHE_DB_NAME = "response_cache.db"
+# Service workers share the disk tier; a writer waits this long for the lock, then the
+# lookup or store is skipped (a cache miss) instead of failing the request.
+# The wait happens on a worker thread (see aget/aset), never on the event loop.
+DISK_BUSY_TIMEOUT_SECONDS = 0.5
+
+_MISSING = object()
+
+def normalize_query(text: str) -> str:
+    """Case- and whitespace-insensitive form of a (sanitized) query."""
+    return " ".join(text.lower().split())
+
+def make_key(kind: str, name: str, template: str, model_id: str, payload: Any) -> str:
+    """
+    Builds a cache key from the caller's identity (name + hash of template and model id)
+    and a hash of the request payload.
+    """
+    identity = hashlib.sha256(f"{template}\x00{model_id}".encode("utf-8")).hexdigest()[:16]
+    if isinstance(payload, str):
+        payload = normalize_query(payload)
+    digest = hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    return f"{kind}:{name}:{identity}:{digest}"
+
+class ResponseCache:
+    """
+    Two-tier TTL cache for agent answers, critiques and syntheses.
+    Tier 1 is an in-memory LRU; tier 2 is a small sqlite file stored next to users.db.
+    Values must be JSON-serializable. Disk-tier errors (e.g. the file locked by another
+    worker) are counted in `disk_errors` and only ever cost a cache miss.
+    Async code uses `aget`/`aset`, which run the sqlite tier on a worker thread.
+    """
+
+    def __init__(self, config: CacheConfig, path: Optional[str] = None):
+        self.config = config
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Separate from _lock so memory lookups never wait behind a slow disk call
+        self._disk_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.disk_errors = 0
+        self._conn = None
+        if config.enabled and config.disk:
+            self.path = path or os.path.join(os.path.dirname(os.path.abspath(database.DB_NAME)), CACHE_DB_NAME)
+            try:
+                self._conn = self._open(self.path)
+            except sqlite3.Error as e:
+                print(f"Warning: response cache disk tier disabled ({e})")
+                self._conn = None
+
+    def _open(self, path: str) -> sqlite3.Connection:
+        conn = sqlite3.connect(path, timeout=DISK_BUSY_TIMEOUT_SECONDS, check_same_thread=False)
+        # WAL: workers reading the cache do not block the one writing to it
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS response_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        ''')
+        with conn:
+            conn.execute('DELETE FROM response_cache WHERE expires_at < ?', (time.time(),))
+        return conn
+
+    def _disk_error(self, action: str, error: Exception):
+        self.disk_errors += 1
+        print(f"xx Response cache disk {action} failed: {error}")
+
+    def enabled_for(self, name: str) -> bool:
+        return self.config.enabled and name not in self.config.bypass_agents
+
+    def get(self, key: str) -> Optional[Any]:
+        """Blocking lookup, memory tier then disk tier."""
+        value = self._get_memory(key)
+        if value is _MISSING and self._conn is not None:
+            value = self._get_disk(key)
+        return self._count(value)
+
+    async def aget(self, key: str) -> Optional[Any]:
+        """Like `get`, with the disk tier read on a worker thread."""
+        value = self._get_memory(key)
+        if value is _MISSING and self._conn is not None:
+            value = await asyncio.to_thread(self._get_disk, key)
+        return self._count(value)
+
+    def set(self, key: str, value: Any):
+        expires_at = time.time() + self.config.ttl_seconds
+        with self._lock:
+            self._remember(key, expires_at, value)
+        if self._conn is not None:
+            self._set_disk(key, value, expires_at)
+
+    async def aset(self, key: str, value: Any):
+        """Like `set`, with the disk tier written on a worker thread."""
+        expires_at = time.time() + self.config.ttl_seconds
+        with self._lock:
+            self._remember(key, expires_at, value)
+        if self._conn is not None:
+            await asyncio.to_thread(self._set_disk, key, value, expires_at)
+
+    def _get_memory(self, key: str) -> Any:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return _MISSING
+            expires_at, value = entry
+            if expires_at > time.time():
+                self._memory.move_to_end(key)
+                return value
+            del self._memory[key]
+            return _MISSING
+
+    def _get_disk(self, key: str) -> Any:
+        now = time.time()
+        with self._disk_lock:
+            try:
+                row = self._conn.execute('SELECT value, expires_at FROM response_cache WHERE key = ?', (key,)).fetchone()
+                if row and row[1] > now:
+                    value = json.loads(row[0])
+                    with self._lock:
+                        self._remember(key, row[1], value)
+                        self.disk_hits += 1
+                    return value
+                if row:
+                    with self._conn:
+                        self._conn.execute('DELETE FROM response_cache WHERE key = ?', (key,))
+            except sqlite3.Error as e:
+                self._disk_error("read", e)
+        return _MISSING
+
+    def _set_disk(self, key: str, value: Any, expires_at: float):
+        with self._disk_lock:
+            try:
+                with self._conn:
+                    self._conn.execute('INSERT OR REPLACE INTO response_cache (key, value, expires_at) VALUES (?, ?, ?)',
+                                       (key, json.dumps(value), expires_at))
+            except sqlite3.Error as e:
+                self._disk_error("write", e)
+
+    def _count(self, value: Any) -> Optional[Any]:
+        with self._lock:
+            if value is _MISSING:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return value
+
+    def _remember(self, key: str, expires_at: float, value: Any):
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.config.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+        if self._conn is not None:
+            with self._disk_lock:
+                try:
+                    with self._conn:
+                        self._conn.execute('DELETE FROM response_cache')
+                except sqlite3.Error as e:
+                    self._disk_error("clear", e)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "disk_errors": self.disk_errors,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "memory_entries": len(self._memory),
+        }
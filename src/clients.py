@@ -0,0 +1,248 @@
+import asyncio
+import os
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict, Optional, Tuple
+from src.config import HttpConfig
+from src.metrics import metrics
+from src.startup import load_sdk
+
+# Vendor SDKs (openai, httpx, google.generativeai) are imported on first use via load_sdk:
+# importing openai alone costs ~0.5s, paid for nothing in simulated mode
+
+OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+
+# `http` settings baked into pools and clients when they are created; a reload cannot
+# change them for pools that already exist
+POOL_SETTINGS = ("max_connections", "max_keepalive_connections", "keepalive_expiry_seconds",
+                 "request_timeout_seconds", "sync_sdk_workers")
+# Caps and pacing, rebuilt on running loops when they change
+LIMIT_SETTINGS = ("max_in_flight", "max_in_flight_per_vendor", "vendor_limits", "vendor_rate_limits")
+
+SYNC_QUEUED = metrics.gauge(
+    "orchestrator_sync_sdk_queued", "Blocking SDK calls waiting for a thread, per vendor pool.", ("vendor",))
+SYNC_ACTIVE = metrics.gauge(
+    "orchestrator_sync_sdk_active", "Blocking SDK calls running on a pool thread, per vendor pool.", ("vendor",))
+
+class _SyncPool:
+    """Bounded thread pool for one vendor's blocking SDK, with queue-depth accounting."""
+
+    def __init__(self, vendor: str, workers: int):
+        self.vendor = vendor
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"sdk-{vendor}")
+        self.queued = 0
+        self.active = 0
+        self._lock = threading.Lock()
+
+    def _update(self, queued: int = 0, active: int = 0):
+        with self._lock:
+            self.queued += queued
+            self.active += active
+            SYNC_QUEUED.set(self.queued, vendor=self.vendor)
+            SYNC_ACTIVE.set(self.active, vendor=self.vendor)
+
+    async def run(self, fn: Callable[..., Any], *args) -> Any:
+        def task():
+            self._update(queued=-1, active=1)
+            try:
+                return fn(*args)
+            finally:
+                self._update(active=-1)
+
+        self._update(queued=1)
+        future = self.executor.submit(task)
+        # Cancelled before a thread picked it up: it never ran, so undo the queue entry here
+        future.add_done_callback(lambda f: f.cancelled() and self._update(queued=-1))
+        return await asyncio.wrap_future(future)
+
+class _RateLimiter:
+    """Spaces calls `1 / rate` seconds apart; each caller reserves the next free start time."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate
+        self.next_at = 0.0
+
+    async def wait(self):
+        now = asyncio.get_running_loop().time()
+        start = max(now, self.next_at)
+        self.next_at = start + self.interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+class _LoopState:
+    """Clients and limiters bound to one event loop (async HTTP pools cannot cross loops)."""
+
+    def __init__(self, config: HttpConfig):
+        self.http_clients: Dict[str, "httpx.AsyncClient"] = {}
+        self.clients: Dict[Tuple[str, str], "AsyncOpenAI"] = {}
+        self.reset_limits(config)
+
+    def reset_limits(self, config: HttpConfig):
+        """New caps and pacing; calls already holding a slot release it on the old semaphores."""
+        self.global_limit = asyncio.Semaphore(config.max_in_flight)
+        self.vendor_limits: Dict[str, asyncio.Semaphore] = {}
+        self.vendor_rates: Dict[str, Optional[_RateLimiter]] = {}
+
+class ClientRegistry:
+    """
+    Process-wide registry of OpenAI-compatible clients.
+    - One pooled keep-alive HTTP client per base URL, shared by every agent and the Combiner.
+    - One API client per (base URL, API key), reused across orchestrator rebuilds.
+    - Semaphores capping in-flight requests per vendor and overall, plus optional
+      per-vendor request pacing.
+    """
+
+    def __init__(self, config: Optional[HttpConfig] = None):
+        self.config = config or HttpConfig()
+        self._states: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState]" = weakref.WeakKeyDictionary()
+        self._detached = None
+        # Thread pools and SDK model objects are not tied to an event loop
+        self._sync_pools: Dict[str, _SyncPool] = {}
+        self._genai_models: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def configure(self, config: HttpConfig):
+        """
+        Applies new settings. In-flight caps and pacing change on running loops as well;
+        connection-pool settings (POOL_SETTINGS) only reach pools created afterwards.
+        """
+        changed = [name for name in POOL_SETTINGS if getattr(config, name) != getattr(self.config, name)]
+        if changed and (self._states or self._sync_pools):
+            print(f"Warning: http.{', http.'.join(changed)} only applies to new connection pools; restart to apply it everywhere")
+        limits_changed = any(getattr(config, name) != getattr(self.config, name) for name in LIMIT_SETTINGS)
+        with self._lock:
+            self.config = config
+            states = list(self._states.values()) + ([self._detached] if self._detached is not None else [])
+        if limits_changed:
+            for state in states:
+                state.reset_limits(config)
+
+    @property
+    def base_url(self) -> str:
+        """Endpoint for OpenAI-compatible calls: $LLM_BASE_URL, then `http.base_url`, then OpenRouter."""
+        return os.getenv("LLM_BASE_URL") or self.config.base_url or OPENROUTER_BASE_URL
+
+    def _state(self) -> _LoopState:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Outside of a loop (e.g. a truthiness check at construction time)
+            if self._detached is None:
+                self._detached = _LoopState(self.config)
+            return self._detached
+        state = self._states.get(loop)
+        if state is None:
+            with self._lock:
+                state = self._states[loop] = _LoopState(self.config)
+        return state
+
+    def _http_client(self, state: _LoopState, base_url: str):
+        httpx = load_sdk("httpx")
+        if httpx is None:
+            return None
+        http_client = state.http_clients.get(base_url)
+        if http_client is None:
+            http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.config.max_connections,
+                    max_keepalive_connections=self.config.max_keepalive_connections,
+                    keepalive_expiry=self.config.keepalive_expiry_seconds,
+                ),
+                timeout=httpx.Timeout(self.config.request_timeout_seconds, connect=10.0),
+            )
+            state.http_clients[base_url] = http_client
+        return http_client
+
+    def get_openai_client(self, api_key: str, base_url: str = OPENROUTER_BASE_URL) -> "AsyncOpenAI":
+        state = self._state()
+        client = state.clients.get((base_url, api_key))
+        if client is None:
+            http_client = self._http_client(state, base_url)
+            kwargs = {"http_client": http_client} if http_client is not None else {}
+            # Retries are handled by src.resilience (jittered backoff, circuit breakers)
+            client = load_sdk("openai").AsyncOpenAI(api_key=api_key, base_url=base_url, timeout=self.config.request_timeout_seconds,
+                                 max_retries=0, **kwargs)
+            state.clients[(base_url, api_key)] = client
+        return client
+
+    def get_genai_model(self, model_name: str) -> "genai.GenerativeModel":
+        """One GenerativeModel per model name (the API key is set globally by genai.configure)."""
+        model = self._genai_models.get(model_name)
+        if model is None:
+            with self._lock:
+                model = self._genai_models.get(model_name)
+                if model is None:
+                    model = self._genai_models[model_name] = load_sdk("google.generativeai").GenerativeModel(model_name)
+        return model
+
+    async def run_sync(self, vendor: str, fn: Callable[..., Any], *args) -> Any:
+        """Runs a blocking SDK call on the vendor's dedicated pool instead of the default executor."""
+        pool = self._sync_pools.get(vendor)
+        if pool is None:
+            with self._lock:
+                pool = self._sync_pools.get(vendor)
+                if pool is None:
+                    pool = self._sync_pools[vendor] = _SyncPool(vendor, self.config.sync_sdk_workers)
+        return await pool.run(fn, *args)
+
+    def _vendor_limit(self, state: _LoopState, vendor: str) -> asyncio.Semaphore:
+        limit = state.vendor_limits.get(vendor)
+        if limit is None:
+            size = self.config.vendor_limits.get(vendor, self.config.max_in_flight_per_vendor)
+            limit = state.vendor_limits[vendor] = asyncio.Semaphore(size)
+        return limit
+
+    def _vendor_rate(self, state: _LoopState, vendor: str) -> Optional[_RateLimiter]:
+        if vendor not in state.vendor_rates:
+            rate = self.config.vendor_rate_limits.get(vendor)
+            state.vendor_rates[vendor] = _RateLimiter(rate) if rate else None
+        return state.vendor_rates[vendor]
+
+    @asynccontextmanager
+    async def slot(self, vendor: str):
+        """
+        Holds one per-vendor and one global in-flight slot for the duration of a call,
+        after waiting out the vendor's request rate (`vendor_rate_limits`), if it has one.
+        Waiters queue FIFO, so concurrent queries share each vendor fairly.
+        """
+        state = self._state()
+        # Vendor first, so calls queued behind a saturated vendor do not hold global slots
+        async with self._vendor_limit(state, vendor):
+            rate = self._vendor_rate(state, vendor)
+            if rate is not None:
+                await rate.wait()
+            async with state.global_limit:
+                yield
+
+    @asynccontextmanager
+    async def try_slot(self, vendor: str):
+        """
+        Like `slot`, but never waits: yields False, holding nothing, when the vendor or the
+        global cap is reached, others are already queued, or the vendor's rate would delay
+        the call. Used for optional extra requests such as hedges.
+        """
+        state = self._state()
+        vendor_limit = self._vendor_limit(state, vendor)
+        rate = self._vendor_rate(state, vendor)
+        if vendor_limit.locked() or state.global_limit.locked() or (
+                rate is not None and rate.next_at > asyncio.get_running_loop().time()):
+            yield False
+            return
+        # Neither acquire nor rate.wait() suspends here, so nobody can take the slots in between
+        async with vendor_limit:
+            if rate is not None:
+                await rate.wait()
+            async with state.global_limit:
+                yield True
+
+    async def aclose(self):
+        """Closes the pooled HTTP clients owned by the running loop."""
+        state = self._state()
+        for http_client in state.http_clients.values():
+            await http_client.aclose()
+        state.http_clients.clear()
+        state.clients.clear()
+
+registry = ClientRegistry()
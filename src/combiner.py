@@ -1,28 +1,32 @@
-import json
 import os
 import asyncio
-from typing import List, Dict, Any
+import time
+from typing import List, Dict, Any, AsyncIterator, Optional
 from src.agents.base import AgentResponse
-from src.config import OrchestratorSettings
-
-# Import SDKs for the Combiner (using OpenRouter/OpenAI for synthesis)
-try:
-    from openai import AsyncOpenAI
-except ImportError:
-    pass
+from src.events import OrchestrationEvent, SynthesisTokenEvent, FinalResultEvent
+from src.config import OrchestratorSettings, PhaseBudget
+from src.cache import ResponseCache, make_key, normalize_query
+from src.clients import registry
+from src.resilience import resilience
+from src.json_stream import StreamingJSONParser, parse_tolerant
+from src.metrics import AGENT_SECONDS, AGENT_ERRORS, record_openai_usage
 
 class Combiner:
-    def __init__(self, settings: OrchestratorSettings):
+    def __init__(self, settings: OrchestratorSettings, cache: Optional[ResponseCache] = None):
         self.settings = settings
+        self.cache = cache
+        self.model = "openai/gpt-4o-mini" # Use a smart model for synthesis
         self.api_key = os.getenv("OPENROUTER_API_KEY")
-        self.client = None
-        if self.api_key:
-            self.client = AsyncOpenAI(
-                api_key=self.api_key,
-                base_url="https://openrouter.ai/api/v1"
-            )
-
-    async def synthesize(self, user_query: str, responses: List[AgentResponse], critiques: List[str]) -> Dict[str, Any]:
+        self.base_url = registry.base_url
+
+    @property
+    def client(self):
+        """Shared synthesis client from the process-wide registry (None without a key)."""
+        if not self.api_key:
+            return None
+        return registry.get_openai_client(self.api_key, self.base_url)
+
+    async def synthesize(self, user_query: str, responses: List[AgentResponse], critiques: List[str], budget: Optional[PhaseBudget] = None) -> Dict[str, Any]:
         """
         Uses an LLM to aggregate all agent responses into a final, comprehensive answer.
         """
@@ -30,23 +34,145 @@ class Combiner:
         valid_responses = [r for r in responses if r.confidence > 0]
         
         if not valid_responses:
-            return {
-                "final_answer": "All agents failed to respond.",
-                "combined_confidence": 0.0,
-                "disagreement": "N/A",
-                "recommended_next_steps": "Check system health.",
-                "agents": []
-            }
-
-        # 2. Prepare Context for the Synthesizer
+            return self._empty_result()
+
+        # 2-3. Prepare context and prompt for the Synthesizer
+        budget = budget or PhaseBudget(temperature=0.5)
+        synthesis_prompt = self._build_prompt(user_query, valid_responses, critiques, budget)
+
+        # 4. Call LLM for Synthesis
+        if self.client:
+            cache_key = self._cache_key(user_query, responses, critiques, budget)
+            cached = await self.cache.aget(cache_key) if cache_key else None
+            if cached is not None:
+                return cached
+            try:
+                async with registry.slot("Combiner"):
+                    start = time.perf_counter()
+                    response = await resilience.call("Combiner", lambda: self.client.chat.completions.create(
+                        model=self.model,
+                        messages=[{"role": "user", "content": synthesis_prompt}],
+                        **budget.completion_kwargs(default_temperature=0.5)
+                    ))
+                AGENT_SECONDS.observe(time.perf_counter() - start, agent="Combiner", kind="synthesis")
+                record_openai_usage("Combiner", response)
+                raw_content = response.choices[0].message.content
+                result = self._parse_result(raw_content, responses)
+                # A synthesis cut off at max_tokens is served once, not replayed until the TTL
+                if cache_key and response.choices[0].finish_reason != "length":
+                    await self.cache.aset(cache_key, result)
+                return result
+                
+            except Exception as e:
+                print(f"Combiner LLM Failed: {e}")
+                AGENT_ERRORS.inc(agent="Combiner", kind="synthesis")
+                # Fallback to heuristic if LLM fails
+                return self._heuristic_fallback(valid_responses)
+        else:
+             return self._heuristic_fallback(valid_responses)
+
+    async def synthesize_stream(self, user_query: str, responses: List[AgentResponse], critiques: List[str], budget: Optional[PhaseBudget] = None) -> AsyncIterator[OrchestrationEvent]:
+        """
+        Streaming variant of `synthesize`: yields SynthesisTokenEvents carrying the text of
+        `final_answer` as it is decoded from the streamed JSON, and always finishes with a
+        FinalResultEvent.
+        """
+        valid_responses = [r for r in responses if r.confidence > 0]
+
+        if not valid_responses:
+            yield FinalResultEvent(result=self._empty_result())
+            return
+
+        if not self.client:
+            yield FinalResultEvent(result=self._heuristic_fallback(valid_responses))
+            return
+
+        budget = budget or PhaseBudget(temperature=0.5)
+        cache_key = self._cache_key(user_query, responses, critiques, budget)
+        cached = await self.cache.aget(cache_key) if cache_key else None
+        if cached is not None:
+            yield FinalResultEvent(result=cached)
+            return
+
+        synthesis_prompt = self._build_prompt(user_query, valid_responses, critiques, budget)
+        chunks = []
+        parser = StreamingJSONParser()
+        shown = 0
+        finish_reason = None
+        try:
+            async with registry.slot("Combiner"):
+                start = time.perf_counter()
+                # Retries cover opening the stream; a stream that breaks midway falls back below
+                stream = await resilience.call("Combiner", lambda: self.client.chat.completions.create(
+                    model=self.model,
+                    messages=[{"role": "user", "content": synthesis_prompt}],
+                    stream=True,
+                    # Usage arrives on a final chunk with no choices
+                    stream_options={"include_usage": True},
+                    **budget.completion_kwargs(default_temperature=0.5)
+                ), hedge=False)
+                async for chunk in stream:
+                    record_openai_usage("Combiner", chunk)
+                    if not chunk.choices:
+                        continue
+                    finish_reason = chunk.choices[0].finish_reason or finish_reason
+                    token = chunk.choices[0].delta.content
+                    if token:
+                        chunks.append(token)
+                        if "final_answer" in parser.feed(token):
+                            answer = parser.values["final_answer"]
+                            if isinstance(answer, str) and len(answer) > shown:
+                                yield SynthesisTokenEvent(token=answer[shown:])
+                                shown = len(answer)
+            AGENT_SECONDS.observe(time.perf_counter() - start, agent="Combiner", kind="synthesis")
+            result = self._parse_result("".join(chunks), responses)
+            if cache_key and finish_reason != "length":
+                await self.cache.aset(cache_key, result)
+        except Exception as e:
+            print(f"Combiner LLM Failed: {e}")
+            AGENT_ERRORS.inc(agent="Combiner", kind="synthesis")
+            result = self._heuristic_fallback(valid_responses)
+
+        yield FinalResultEvent(result=result)
+
+    def _cache_key(self, user_query: str, responses: List[AgentResponse], critiques: List[str], budget: PhaseBudget) -> Optional[str]:
+        """Key for a successful LLM synthesis; heuristic fallbacks and truncated syntheses are never cached."""
+        if not self.cache or not self.cache.enabled_for("Combiner"):
+            return None
+        payload = {
+            "query": normalize_query(user_query),
+            "responses": [r.model_dump() for r in responses],
+            "critiques": critiques,
+            "budget": budget.model_dump(),
+        }
+        return make_key("synthesis", "Combiner", self.settings.combiner_rules, self.model, payload)
+
+    def fallback_result(self, responses: List[AgentResponse]) -> Dict[str, Any]:
+        """Best result available without calling the synthesis LLM (used when the time budget runs out)."""
+        valid_responses = [r for r in responses if r.confidence > 0]
+        if not valid_responses:
+            return self._empty_result()
+        return self._heuristic_fallback(valid_responses)
+
+    def _empty_result(self) -> Dict[str, Any]:
+        return {
+            "final_answer": "All agents failed to respond.",
+            "combined_confidence": 0.0,
+            "disagreement": "N/A",
+            "recommended_next_steps": "Check system health.",
+            "agents": []
+        }
+
+    def _build_prompt(self, user_query: str, valid_responses: List[AgentResponse], critiques: List[str], budget: Optional[PhaseBudget] = None) -> str:
         agents_text = ""
         for r in valid_responses:
             agents_text += f"\n--- Agent: {r.name} (Confidence: {r.confidence}) ---\n{r.answer}\nRationale: {r.rationale}\n"
         
         critiques_text = "\n".join(critiques)
+        words = budget.word_limit if budget else None
+        length_rule = f"at most about {words} words" if words else "minimum 400 words"
 
-        # 3. Construct Prompt for Synthesis
-        synthesis_prompt = f"""
+        return f"""
         You are the Chief Editor of an AI expert panel.
         
         User Query: "{user_query}"
@@ -58,7 +184,7 @@ class Combiner:
         {critiques_text}
         
         Your Task:
-        1. Synthesize a single, highly detailed, and comprehensive Final Answer (minimum 400 words).
+        1. Synthesize a single, highly detailed, and comprehensive Final Answer ({length_rule}).
         2. Merge the best insights from all agents.
         3. Resolve minor disagreements; note major ones.
         4. Maintain a professional, user-facing tone.
@@ -72,28 +198,19 @@ class Combiner:
         }}
         """
 
-        # 4. Call LLM for Synthesis
-        if self.client:
-            try:
-                response = await self.client.chat.completions.create(
-                    model="openai/gpt-4o-mini", # Use a smart model for synthesis
-                    messages=[{"role": "user", "content": synthesis_prompt}],
-                    temperature=0.5
-                )
-                raw_content = response.choices[0].message.content
-                clean_json = raw_content.replace("```json", "").replace("```", "").strip()
-                result = json.loads(clean_json)
-                
-                # Attach individual agent details for the UI
-                result["agents"] = [r.model_dump() for r in responses]
-                return result
-                
-            except Exception as e:
-                print(f"Combiner LLM Failed: {e}")
-                # Fallback to heuristic if LLM fails
-                return self._heuristic_fallback(valid_responses)
-        else:
-             return self._heuristic_fallback(valid_responses)
+    def _parse_result(self, raw_content: str, responses: List[AgentResponse]) -> Dict[str, Any]:
+        result = parse_tolerant(raw_content or "")
+        if not result or not isinstance(result.get("final_answer"), str):
+            raise ValueError("Synthesis output has no final_answer")
+        # Fields lost to a truncated completion get neutral values
+        confidences = [r.confidence for r in responses if r.confidence > 0]
+        result.setdefault("combined_confidence", sum(confidences) / len(confidences) if confidences else 0.0)
+        result.setdefault("disagreement", "N/A")
+        result.setdefault("recommended_next_steps", "")
+        
+        # Attach individual agent details for the UI
+        result["agents"] = [r.model_dump() for r in responses]
+        return result
 
     def _heuristic_fallback(self, valid_responses: List[AgentResponse]) -> Dict[str, Any]:
         # Sort by confidence
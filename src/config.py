@@ -1,5 +1,8 @@
+import hashlib
+import os
+import threading
 import yaml
-from typing import List, Dict, Optional, Any
+from typing import Callable, List, Dict, Optional, Any, Tuple
 from pydantic import BaseModel, Field
 
 class OrchestratorSettings(BaseModel):
@@ -16,18 +19,157 @@ class AgentConfig(BaseModel):
     name: str
     vendor: str
     template: str
+    # Relative cost of one call, used by the router's cost budget
+    cost: float = 1.0
 
 class DiscussionConfig(BaseModel):
     rules: str
+    # Total input tokens of answer digests shown to each critic
+    digest_token_budget: int = 1200
 
 class TimeoutsConfig(BaseModel):
     initial_answer_seconds: int
     discussion_answer_seconds: int
     total_orchestration_seconds: int
+    # Return from the broadcast as soon as this many agents have answered.
+    # None waits for every agent (still bounded by initial_answer_seconds).
+    broadcast_quorum: Optional[int] = None
 
 class SanitizationConfig(BaseModel):
     redact_user_pii: bool
     pii_rules: str
+    categories: List[str] = Field(default_factory=lambda: ["email", "gps", "id_number", "phone", "name"])
+    audit_log_size: int = 1000
+    # Also scrub the streamed synthesis before it reaches the UI
+    redact_agent_output: bool = False
+
+class CacheConfig(BaseModel):
+    enabled: bool = True
+    ttl_seconds: int = 3600
+    max_memory_entries: int = 512
+    disk: bool = True
+    # Agent names (or "Combiner") that always skip the cache
+    bypass_agents: List[str] = Field(default_factory=list)
+
+class HttpConfig(BaseModel):
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry_seconds: float = 30.0
+    request_timeout_seconds: float = 60.0
+    # OpenAI-compatible endpoint for every agent and the Combiner (None = OpenRouter).
+    # The LLM_BASE_URL environment variable takes precedence, e.g. a local fake server.
+    base_url: Optional[str] = None
+    # In-flight request caps (agent calls + synthesis)
+    max_in_flight: int = 32
+    max_in_flight_per_vendor: int = 4
+    vendor_limits: Dict[str, int] = Field(default_factory=dict)
+    # Requests per second per vendor (calls are spaced evenly); vendors not listed are unpaced
+    vendor_rate_limits: Dict[str, float] = Field(default_factory=dict)
+    # Threads per vendor for blocking SDKs (native Gemini), kept apart from the default executor
+    sync_sdk_workers: int = 8
+
+class ResilienceConfig(BaseModel):
+    max_retries: int = 2
+    backoff_base_seconds: float = 0.5
+    backoff_max_seconds: float = 8.0
+    # Duplicate an attempt once it outlives this latency percentile of the vendor's
+    # recent successful calls (None disables hedging)
+    hedge_percentile: Optional[float] = 0.95
+    hedge_min_samples: int = 20
+    latency_window: int = 100
+    # Consecutive failed calls that open a vendor's circuit, and how long it stays open
+    breaker_failure_threshold: int = 5
+    breaker_reset_seconds: float = 30.0
+
+class RoutingConfig(BaseModel):
+    enabled: bool = False
+    min_agents: int = 3
+    max_agents: int = 8
+    latency_budget_seconds: float = 20.0
+    cost_budget: float = 8.0
+    exploration_rate: float = 0.1
+    window: int = 50
+    # Agents with fewer samples than this are never excluded for latency
+    min_samples: int = 5
+    # Share of an answer's content words that must reappear in the synthesis to count as "survived"
+    survival_overlap: float = 0.3
+
+class MetricsConfig(BaseModel):
+    enabled: bool = True
+    # Prometheus text format at http://host:port/metrics; keep it on loopback unless scraped remotely
+    host: str = "127.0.0.1"
+    port: int = 9464
+
+class ServiceConfig(BaseModel):
+    # `python -m src.service`; every worker process runs its own orchestrator
+    host: str = "127.0.0.1"
+    port: int = 8080
+    workers: int = 1
+    max_body_bytes: int = 65536
+    max_query_chars: int = 8000
+    # SSE comment sent while no event is due, so proxies keep the stream open
+    sse_keepalive_seconds: float = 15.0
+
+class ReloadConfig(BaseModel):
+    # Watch the YAML file and apply edits to running orchestrators (app and service)
+    enabled: bool = True
+    poll_seconds: float = 2.0
+
+class ContextConfig(BaseModel):
+    # Conversation context sent to agents with each follow-up (see src.context)
+    enabled: bool = True
+    # Recent turns are sent verbatim while they fit in this many tokens...
+    window_tokens: int = 1200
+    # ...older ones are folded into a rolling summary capped at this size
+    summary_tokens: int = 300
+    # Share of the summary budget one folded turn may take before it is merged
+    turn_summary_tokens: int = 80
+
+class PhaseBudget(BaseModel):
+    max_tokens: Optional[int] = None
+    temperature: Optional[float] = None
+
+    @property
+    def word_limit(self) -> Optional[int]:
+        """Words to ask for so the JSON reply fits in max_tokens (~0.75 words/token, minus overhead)."""
+        return int(self.max_tokens * 0.6) if self.max_tokens else None
+
+    def completion_kwargs(self, default_temperature: Optional[float] = None) -> Dict[str, Any]:
+        """chat.completions arguments; without max_tokens generation stays unbounded."""
+        kwargs: Dict[str, Any] = {}
+        temperature = self.temperature if self.temperature is not None else default_temperature
+        if temperature is not None:
+            kwargs["temperature"] = temperature
+        if self.max_tokens:
+            kwargs["max_tokens"] = self.max_tokens
+        return kwargs
+
+    def merged(self, override: Optional["PhaseBudget"]) -> "PhaseBudget":
+        if override is None:
+            return self
+        return PhaseBudget(
+            max_tokens=override.max_tokens if override.max_tokens is not None else self.max_tokens,
+            temperature=override.temperature if override.temperature is not None else self.temperature,
+        )
+
+class BudgetProfile(BaseModel):
+    answer: PhaseBudget = Field(default_factory=lambda: PhaseBudget(temperature=0.7))
+    critique: PhaseBudget = Field(default_factory=PhaseBudget)
+    synthesis: PhaseBudget = Field(default_factory=lambda: PhaseBudget(temperature=0.5))
+    # Per-agent overrides of the answer phase
+    agents: Dict[str, PhaseBudget] = Field(default_factory=dict)
+
+    def for_answer(self, agent_name: str) -> PhaseBudget:
+        return self.answer.merged(self.agents.get(agent_name))
+
+class BudgetsConfig(BaseModel):
+    default_profile: str = "default"
+    # The built-in default leaves generation unbounded, as before budgets existed
+    profiles: Dict[str, BudgetProfile] = Field(default_factory=lambda: {"default": BudgetProfile()})
+
+    def profile(self, name: Optional[str] = None) -> BudgetProfile:
+        """The named profile, falling back to the default one for unknown or missing names."""
+        return self.profiles.get(name or self.default_profile) or self.profiles.get(self.default_profile) or BudgetProfile()
 
 class ExampleConfig(BaseModel):
     user_query: str
@@ -42,11 +184,90 @@ class AppConfig(BaseModel):
     sanitization: SanitizationConfig
     implementation_tips: str
     example: ExampleConfig
+    cache: CacheConfig = Field(default_factory=CacheConfig)
+    http: HttpConfig = Field(default_factory=HttpConfig)
+    routing: RoutingConfig = Field(default_factory=RoutingConfig)
+    resilience: ResilienceConfig = Field(default_factory=ResilienceConfig)
+    budgets: BudgetsConfig = Field(default_factory=BudgetsConfig)
+    metrics: MetricsConfig = Field(default_factory=MetricsConfig)
+    service: ServiceConfig = Field(default_factory=ServiceConfig)
+    reload: ReloadConfig = Field(default_factory=ReloadConfig)
+    context: ContextConfig = Field(default_factory=ContextConfig)
+
+# Compiled configs by absolute path: (mtime_ns, size, sha256 of the bytes, validated AppConfig)
+_compiled: Dict[str, Tuple[int, int, str, AppConfig]] = {}
+_compiled_lock = threading.Lock()
 
 def load_config(config_path: str = "orchestrator_config.yaml") -> AppConfig:
-    """Loads and validates the YAML configuration."""
-    with open(config_path, "r") as f:
-        raw_config = yaml.safe_load(f)
-    
-    return AppConfig(**raw_config)
+    """
+    Loads and validates the YAML configuration. The validated config is cached by file
+    mtime and content hash, so repeated calls skip YAML parsing and validation (a touched
+    but unchanged file is only re-hashed). Each call returns its own copy: callers may
+    modify it freely.
+    """
+    return _load_compiled(config_path)[1].model_copy(deep=True)
+
+def config_digest(config_path: str = "orchestrator_config.yaml") -> str:
+    """sha256 of the config file's current contents."""
+    return _load_compiled(config_path)[0]
+
+def _load_compiled(config_path: str) -> Tuple[str, AppConfig]:
+    key = os.path.abspath(config_path)
+    stat = os.stat(key)
+    with _compiled_lock:
+        entry = _compiled.get(key)
+        if entry and entry[:2] == (stat.st_mtime_ns, stat.st_size):
+            return entry[2], entry[3]
+        with open(key, "rb") as f:
+            data = f.read()
+        digest = hashlib.sha256(data).hexdigest()
+        if entry and entry[2] == digest:
+            config = entry[3]
+        else:
+            config = AppConfig(**yaml.safe_load(data))
+        _compiled[key] = (stat.st_mtime_ns, stat.st_size, digest, config)
+        return digest, config
+
+class ConfigWatcher:
+    """
+    Polls a config file from a daemon thread and calls `on_change(config)` with the newly
+    validated config whenever its contents change. A file that fails to parse or validate
+    is reported and skipped; the previous config stays in effect.
+    """
+
+    def __init__(self, config_path: str, on_change: Callable[[AppConfig], None], poll_seconds: float = 2.0):
+        self.config_path = config_path
+        self.on_change = on_change
+        self.poll_seconds = poll_seconds
+        self.digest = config_digest(config_path)
+        self._last_error = ""
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="config-watcher", daemon=True)
+
+    def start(self) -> "ConfigWatcher":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def check(self) -> bool:
+        """Applies the file if it changed since the last check; True when a new config was applied."""
+        try:
+            digest = config_digest(self.config_path)
+            if digest == self.digest:
+                return False
+            config = load_config(self.config_path)
+        except Exception as e:
+            if str(e) != self._last_error:
+                print(f"xx Config reload skipped, {self.config_path} is invalid: {e}")
+                self._last_error = str(e)
+            return False
+        self.digest, self._last_error = digest, ""
+        self.on_change(config)
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.poll_seconds):
+            self.check()
 
@@ -0,0 +1,97 @@
+from typing import Dict, List, Optional
+from pydantic import BaseModel, Field
+from src.config import ContextConfig
+from src.digest import estimate_tokens, key_sentences
+from src import database
+
+# Per-message overhead (role, separators) in the token estimate of the window
+MESSAGE_OVERHEAD_TOKENS = 4
+# Messages replayed to seed a session that predates stored context
+SEED_MESSAGES = 40
+
+class SessionContext(BaseModel):
+    """What agents see of a conversation besides the new question."""
+    summary: str = ""
+    # Recent messages sent verbatim, oldest first: {"role": "user"|"assistant", "content": ...}
+    window: List[Dict[str, str]] = Field(default_factory=list)
+    turns: int = 0
+
+def message_tokens(message: Dict[str, str]) -> int:
+    return estimate_tokens(message["content"]) + MESSAGE_OVERHEAD_TOKENS
+
+class ContextManager:
+    """
+    Keeps each session's agent context bounded: recent turns verbatim within
+    `window_tokens`, older turns folded into a rolling summary of at most
+    `summary_tokens`. A turn updates the summary by one step (previous summary plus
+    the turns that just left the window), never by re-reading the whole thread, so the
+    cost of a follow-up does not grow with the length of the conversation.
+    """
+
+    def __init__(self, config: ContextConfig):
+        self.config = config
+
+    def history(self, context: Optional[SessionContext]) -> Optional[List[Dict[str, str]]]:
+        """The context as chat messages for `BaseAgent.query`; None when there is nothing to send."""
+        if not self.config.enabled or context is None or (not context.summary and not context.window):
+            return None
+        messages = []
+        if context.summary:
+            messages.append({"role": "system", "content": f"Summary of the earlier conversation: {context.summary}"})
+        return messages + [dict(m) for m in context.window]
+
+    def add_turn(self, context: Optional[SessionContext], user_content: str, assistant_content: str) -> SessionContext:
+        """Returns the context after one more turn; turns pushed out of the window are summarized."""
+        context = context or SessionContext()
+        window = context.window + [{"role": "user", "content": user_content},
+                                   {"role": "assistant", "content": assistant_content}]
+        used = sum(message_tokens(m) for m in window)
+        evicted: List[Dict[str, str]] = []
+        # Always keep the newest turn, even when it alone is over the budget
+        while len(window) > 2 and used > self.config.window_tokens:
+            turn, window = window[:2], window[2:]
+            used -= sum(message_tokens(m) for m in turn)
+            evicted += turn
+        summary = self.fold(context.summary, evicted) if evicted else context.summary
+        return SessionContext(summary=summary, window=window, turns=context.turns + 1)
+
+    def fold(self, summary: str, messages: List[Dict[str, str]]) -> str:
+        """
+        One summary step: a condensed sentence or two per evicted message, appended to the
+        previous summary, which is itself condensed to make room. Recent turns keep more detail.
+        """
+        lines = []
+        for message in messages:
+            label = "User asked" if message["role"] == "user" else "Answer"
+            line = key_sentences(" ".join(message["content"].split()), self.config.turn_summary_tokens)
+            lines.append(f"{label}: {line}" + ("" if line.endswith((".", "!", "?")) else "."))
+        added = " ".join(lines)
+        room = self.config.summary_tokens - estimate_tokens(added) - 1
+        if room <= 0 or not summary:
+            return key_sentences(added, self.config.summary_tokens)
+        return f"{key_sentences(summary, room)} {added}"
+
+    def seed(self, messages: List[Dict[str, str]]) -> SessionContext:
+        """Builds a context from stored messages (oldest first), pairing each question with its answer."""
+        context = SessionContext()
+        pending_user = None
+        for message in messages:
+            if message["role"] == "user":
+                pending_user = message["content"]
+            elif message["role"] == "assistant" and pending_user is not None:
+                context = self.add_turn(context, pending_user, message["content"])
+                pending_user = None
+        return context
+
+    def load(self, session_id: Optional[int]) -> Optional[SessionContext]:
+        """
+        The stored context of a session. Sessions from before contexts were stored are
+        seeded once from their latest messages (earlier turns are not summarized).
+        """
+        if not self.config.enabled or session_id is None:
+            return None
+        stored = database.get_session_context(session_id)
+        if stored is not None:
+            return SessionContext(**stored)
+        messages, _ = database.get_session_messages_page(session_id, limit=SEED_MESSAGES)
+        return self.seed(messages) if messages else None
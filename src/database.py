@@ -1,15 +1,162 @@
 import sqlite3
+import threading
+import weakref
 import bcrypt
 import json
+from collections import OrderedDict
+from contextlib import contextmanager
 from datetime import datetime
 
 DB_NAME = "users.db"
 
+# --- Storage Engine ---
+# Long-lived connections, tuned once when they are opened. A thread keeps the
+# connection it took for as long as it runs, and hands it back to a process-wide idle
+# pool when it exits. Streamlit runs every rerun on a fresh thread, so reruns reuse
+# pooled connections instead of reconnecting and re-running the PRAGMAs each time.
+# sqlite3 keeps a per-connection cache of prepared statements, so reuse also means
+# each SQL string below is compiled only once per connection.
+_local = threading.local()
+_idle = {}  # DB file -> idle connections left by finished threads
+_idle_lock = threading.Lock()
+MAX_IDLE_CONNECTIONS = 8  # per DB file; more than that are closed when their thread exits
+
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",      # readers no longer block the writer
+    "PRAGMA synchronous=NORMAL",    # fsync at checkpoints instead of every commit (safe with WAL)
+    "PRAGMA cache_size=-16000",     # ~16 MB page cache
+    "PRAGMA temp_store=MEMORY",
+)
+
+class _Lease:
+    """The connections one thread holds; they go back to the idle pool when the thread's locals are dropped."""
+
+    def __init__(self):
+        self.connections = {}
+        weakref.finalize(self, _return_idle, self.connections)
+
+def _return_idle(connections):
+    with _idle_lock:
+        for db_name, conn in connections.items():
+            idle = _idle.setdefault(db_name, [])
+            if len(idle) < MAX_IDLE_CONNECTIONS:
+                idle.append(conn)
+            else:
+                conn.close()
+    connections.clear()
+
+def _open(db_name):
+    with _idle_lock:
+        idle = _idle.get(db_name)
+        conn = idle.pop() if idle else None
+    if conn is not None:
+        if conn.in_transaction:
+            conn.rollback()
+        return conn
+    # check_same_thread=False: a pooled connection moves to another thread, but only
+    # ever after its previous thread has exited, so it is never shared concurrently
+    conn = sqlite3.connect(db_name, timeout=30, cached_statements=256, check_same_thread=False)
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+def get_connection():
+    """Returns this thread's connection to DB_NAME, taking an idle one or opening a new one on first use."""
+    lease = getattr(_local, "lease", None)
+    if lease is None:
+        lease = _local.lease = _Lease()
+    conn = lease.connections.get(DB_NAME)
+    if conn is None:
+        conn = lease.connections[DB_NAME] = _open(DB_NAME)
+    return conn
+
+@contextmanager
+def transaction():
+    """Yields a cursor; commits on success and rolls back on error."""
+    conn = get_connection()
+    with conn:
+        yield conn.cursor()
+
+def close_connections():
+    """Closes the calling thread's connections and the idle pool (e.g. before deleting the DB file)."""
+    lease = getattr(_local, "lease", None)
+    if lease is not None:
+        for conn in lease.connections.values():
+            conn.close()
+        lease.connections.clear()
+    with _idle_lock:
+        for idle in _idle.values():
+            for conn in idle:
+                conn.close()
+        _idle.clear()
+
+def _move_agent_details(c):
+    """Moves the per-agent answers embedded in messages.details into agent_answers."""
+    rows = c.execute("SELECT id, details FROM messages WHERE details LIKE '%\"agents\"%'").fetchall()
+    for message_id, details_json in rows:
+        details = json.loads(details_json)
+        agents = details.pop("agents", None) or []
+        _insert_agent_answers(c, message_id, agents)
+        details["agent_count"] = len(agents)
+        c.execute('UPDATE messages SET details = ? WHERE id = ?', (json.dumps(details), message_id))
+
+# Schema migrations, applied in order on top of the base tables and tracked in PRAGMA user_version.
+# A step is either a SQL string or a function taking the cursor (for data migrations).
+MIGRATIONS = [
+    # 1: composite indexes for per-user session lists and per-session threads
+    [
+        'CREATE INDEX IF NOT EXISTS idx_sessions_user_created ON sessions(user_id, created_at)',
+        'CREATE INDEX IF NOT EXISTS idx_messages_session_created ON messages(session_id, created_at)',
+    ],
+    # 2: one row per agent per assistant turn instead of a JSON blob in messages.details
+    [
+        '''
+        CREATE TABLE IF NOT EXISTS agent_answers (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            message_id INTEGER NOT NULL,
+            position INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            answer TEXT NOT NULL,
+            rationale TEXT,
+            confidence REAL,
+            sources TEXT,  -- JSON array
+            FOREIGN KEY(message_id) REFERENCES messages(id)
+        )
+        ''',
+        'CREATE INDEX IF NOT EXISTS idx_agent_answers_message ON agent_answers(message_id, position)',
+        _move_agent_details,
+    ],
+    # 3: per-session conversation context for agents (rolling summary + recent window, see src.context)
+    [
+        '''
+        CREATE TABLE IF NOT EXISTS session_context (
+            session_id INTEGER PRIMARY KEY,
+            summary TEXT NOT NULL DEFAULT '',
+            window TEXT NOT NULL DEFAULT '[]',  -- JSON array of {"role", "content"}, oldest first
+            turns INTEGER NOT NULL DEFAULT 0,   -- turns seen, summarized or in the window
+            FOREIGN KEY(session_id) REFERENCES sessions(id)
+        )
+        ''',
+    ],
+]
+
 def init_db():
     """Initialize the SQLite database with users, sessions, and messages tables."""
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    
+    with transaction() as c:
+        _create_tables(c)
+        _migrate(c)
+
+def _migrate(c):
+    version = c.execute('PRAGMA user_version').fetchone()[0]
+    for number, statements in enumerate(MIGRATIONS[version:], start=version + 1):
+        for statement in statements:
+            if callable(statement):
+                statement(c)
+            else:
+                c.execute(statement)
+        c.execute(f'PRAGMA user_version = {number}')
+
+def _create_tables(c):
     # Users Table
     c.execute('''
         CREATE TABLE IF NOT EXISTS users (
@@ -43,37 +190,33 @@ def init_db():
             FOREIGN KEY(session_id) REFERENCES sessions(id)
         )
     ''')
-    
-    conn.commit()
-    conn.close()
 
 # --- User Auth ---
 def create_user(email, password, role="user"):
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
     salt = bcrypt.gensalt()
     hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
     try:
-        c.execute('INSERT INTO users (email, password_hash, role) VALUES (?, ?, ?)', (email, hashed, role))
-        conn.commit()
+        with transaction() as c:
+            c.execute('INSERT INTO users (email, password_hash, role) VALUES (?, ?, ?)', (email, hashed, role))
         success = True
     except sqlite3.IntegrityError:
         success = False
-    finally:
-        conn.close()
     return success
 
 def verify_user(email, password):
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
+    c = get_connection().cursor()
     c.execute('SELECT id, email, password_hash, role FROM users WHERE email = ?', (email,))
     user = c.fetchone()
-    conn.close()
     if user and bcrypt.checkpw(password.encode('utf-8'), user[2]):
         return {"id": user[0], "email": user[1], "role": user[3]}
     return None
 
 def create_admin_if_not_exists():
+    # Look before hashing: bcrypt costs ~0.2s, and the admin almost always exists
+    c = get_connection().cursor()
+    c.execute('SELECT 1 FROM users WHERE email = ?', ("admin@example.com",))
+    if c.fetchone():
+        return
     if create_user("admin@example.com", "admin_secret_123", role="admin"):
         print("Created Admin User")
 
@@ -81,58 +224,269 @@ def create_admin_if_not_exists():
 
 def create_session(user_id, title="New Chat"):
     """Creates a new chat session and returns its ID."""
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute('INSERT INTO sessions (user_id, title) VALUES (?, ?)', (user_id, title))
-    session_id = c.lastrowid
-    conn.commit()
-    conn.close()
+    with transaction() as c:
+        c.execute('INSERT INTO sessions (user_id, title) VALUES (?, ?)', (user_id, title))
+        session_id = c.lastrowid
+        created_at = c.execute('SELECT created_at FROM sessions WHERE id = ?', (session_id,)).fetchone()[0]
+    session_lists.created(user_id, {"id": session_id, "title": title, "created_at": created_at})
     return session_id
 
 def get_user_sessions(user_id):
     """Returns all sessions for a user, newest first."""
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
+    c = get_connection().cursor()
     c.execute('SELECT id, title, created_at FROM sessions WHERE user_id = ? ORDER BY created_at DESC', (user_id,))
     sessions = [{"id": r[0], "title": r[1], "created_at": r[2]} for r in c.fetchall()]
-    conn.close()
     return sessions
 
+def get_user_sessions_page(user_id, limit=20, before=None):
+    """
+    Keyset-paginated sessions for a user, newest first.
+    `before` is the cursor returned with the previous page. Returns (sessions, next_cursor);
+    next_cursor is None on the last page.
+    """
+    c = get_connection().cursor()
+    if before is None:
+        c.execute('SELECT id, title, created_at FROM sessions WHERE user_id = ? '
+                  'ORDER BY created_at DESC, id DESC LIMIT ?', (user_id, limit + 1))
+    else:
+        created_at, session_id = before
+        c.execute('SELECT id, title, created_at FROM sessions WHERE user_id = ? '
+                  'AND (created_at < ? OR (created_at = ? AND id < ?)) '
+                  'ORDER BY created_at DESC, id DESC LIMIT ?', (user_id, created_at, created_at, session_id, limit + 1))
+    rows = c.fetchall()
+    sessions = [{"id": r[0], "title": r[1], "created_at": r[2]} for r in rows[:limit]]
+    next_cursor = (sessions[-1]["created_at"], sessions[-1]["id"]) if len(rows) > limit else None
+    return sessions, next_cursor
+
 def update_session_title(session_id, new_title):
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute('UPDATE sessions SET title = ? WHERE id = ?', (new_title, session_id))
-    conn.commit()
-    conn.close()
+    with transaction() as c:
+        c.execute('UPDATE sessions SET title = ? WHERE id = ?', (new_title, session_id))
+    session_lists.renamed(session_id, new_title)
+
+def _insert_agent_answers(c, message_id, agents):
+    c.executemany(
+        'INSERT INTO agent_answers (message_id, position, name, answer, rationale, confidence, sources) '
+        'VALUES (?, ?, ?, ?, ?, ?, ?)',
+        [(message_id, i, a["name"], a["answer"], a.get("rationale"), a.get("confidence"), json.dumps(a.get("sources", [])))
+         for i, a in enumerate(agents)]
+    )
+
+def split_details(details, content=None):
+    """
+    Splits an orchestration result into the small summary kept on the message and the agent rows.
+    `final_answer` is dropped from the summary when it is already the message content.
+    """
+    if not details:
+        return None, []
+    summary = {k: v for k, v in details.items() if k != "agents"}
+    if content is not None and summary.get("final_answer") == content:
+        del summary["final_answer"]
+    agents = details.get("agents") or []
+    summary["agent_count"] = len(agents)
+    return summary, agents
 
 def save_message(session_id, role, content, details=None):
-    """Saves a message to the database."""
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    details_json = json.dumps(details) if details else None
+    """
+    Saves a message to the database and returns its ID.
+    Per-agent answers in `details["agents"]` go to agent_answers; only the summary stays inline.
+    """
+    with transaction() as c:
+        return _save_message(c, session_id, role, content, details)
+
+def _save_message(c, session_id, role, content, details=None):
+    summary, agents = split_details(details, content)
+    details_json = json.dumps(summary) if summary else None
     c.execute('INSERT INTO messages (session_id, role, content, details) VALUES (?, ?, ?, ?)', 
               (session_id, role, content, details_json))
-    conn.commit()
-    conn.close()
+    message_id = c.lastrowid
+    if agents:
+        _insert_agent_answers(c, message_id, agents)
+    return message_id
+
+def save_turn(session_id, user_content, assistant_content, details=None, title=None, context=None):
+    """
+    Saves a full chat turn (user message, assistant message, optional title update and
+    optional updated conversation context) in a single transaction.
+    Returns (user_message_id, assistant_message_id).
+    """
+    with transaction() as c:
+        user_message_id = _save_message(c, session_id, "user", user_content)
+        assistant_message_id = _save_message(c, session_id, "assistant", assistant_content, details)
+        if title is not None:
+            c.execute('UPDATE sessions SET title = ? WHERE id = ?', (title, session_id))
+        if context is not None:
+            _save_session_context(c, session_id, context)
+    if title is not None:
+        session_lists.renamed(session_id, title)
+    return user_message_id, assistant_message_id
+
+def _save_session_context(c, session_id, context):
+    c.execute('INSERT OR REPLACE INTO session_context (session_id, summary, window, turns) VALUES (?, ?, ?, ?)',
+              (session_id, context["summary"], json.dumps(context["window"]), context["turns"]))
+
+def save_session_context(session_id, context):
+    """Stores a session's conversation context ({"summary", "window", "turns"})."""
+    with transaction() as c:
+        _save_session_context(c, session_id, context)
+
+def get_session_context(session_id):
+    """Returns the session's stored conversation context, or None if it has none yet."""
+    row = get_connection().execute(
+        'SELECT summary, window, turns FROM session_context WHERE session_id = ?', (session_id,)).fetchone()
+    if row is None:
+        return None
+    return {"summary": row[0], "window": json.loads(row[1]), "turns": row[2]}
+
+def get_message_agents(message_id):
+    """Returns the per-agent answers for one assistant message, in original order."""
+    c = get_connection().cursor()
+    c.execute('SELECT name, answer, rationale, confidence, sources FROM agent_answers '
+              'WHERE message_id = ? ORDER BY position', (message_id,))
+    return [{"name": r[0], "answer": r[1], "rationale": r[2], "confidence": r[3], "sources": json.loads(r[4] or "[]")}
+            for r in c.fetchall()]
 
 def get_session_messages(session_id):
-    """Returns full history for a session."""
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute('SELECT role, content, details FROM messages WHERE session_id = ? ORDER BY created_at ASC', (session_id,))
+    """Returns full history for a session (agent answers are fetched separately via get_message_agents)."""
+    c = get_connection().cursor()
+    c.execute('SELECT id, role, content, details FROM messages WHERE session_id = ? ORDER BY created_at ASC', (session_id,))
     messages = []
     for r in c.fetchall():
-        msg = {"role": r[0], "content": r[1]}
-        if r[2]:
-            msg["details"] = json.loads(r[2])
+        msg = {"id": r[0], "role": r[1], "content": r[2]}
+        if r[3]:
+            msg["details"] = json.loads(r[3])
         messages.append(msg)
-    conn.close()
     return messages
 
+def get_session_messages_page(session_id, limit=50, before=None):
+    """
+    Keyset-paginated history for a session: the newest `limit` messages older than `before`,
+    returned oldest first. Returns (messages, next_cursor); next_cursor is None once the
+    start of the thread is reached.
+    """
+    c = get_connection().cursor()
+    if before is None:
+        c.execute('SELECT id, role, content, details, created_at FROM messages WHERE session_id = ? '
+                  'ORDER BY created_at DESC, id DESC LIMIT ?', (session_id, limit + 1))
+    else:
+        created_at, message_id = before
+        c.execute('SELECT id, role, content, details, created_at FROM messages WHERE session_id = ? '
+                  'AND (created_at < ? OR (created_at = ? AND id < ?)) '
+                  'ORDER BY created_at DESC, id DESC LIMIT ?', (session_id, created_at, created_at, message_id, limit + 1))
+    rows = c.fetchall()
+    page = rows[:limit]
+    next_cursor = (page[-1][4], page[-1][0]) if len(rows) > limit else None
+    messages = []
+    for r in reversed(page):
+        msg = {"id": r[0], "role": r[1], "content": r[2]}
+        if r[3]:
+            msg["details"] = json.loads(r[3])
+        messages.append(msg)
+    return messages, next_cursor
+
 def delete_session(session_id):
-    conn = sqlite3.connect(DB_NAME)
-    c = conn.cursor()
-    c.execute('DELETE FROM messages WHERE session_id = ?', (session_id,))
-    c.execute('DELETE FROM sessions WHERE id = ?', (session_id,))
-    conn.commit()
-    conn.close()
+    with transaction() as c:
+        c.execute('DELETE FROM agent_answers WHERE message_id IN (SELECT id FROM messages WHERE session_id = ?)', (session_id,))
+        c.execute('DELETE FROM messages WHERE session_id = ?', (session_id,))
+        c.execute('DELETE FROM session_context WHERE session_id = ?', (session_id,))
+        c.execute('DELETE FROM sessions WHERE id = ?', (session_id,))
+    session_lists.deleted(session_id)
+
+class SessionListCache:
+    """
+    Per-user cache of the sidebar's session list (the newest pages loaded so far), shared
+    by every Streamlit session of the process. create_session, update_session_title,
+    save_turn and delete_session write through to it, so reruns read the list from
+    memory instead of sqlite. Entries are keyed by database file as well as user.
+    """
+
+    def __init__(self, max_users: int = 1024):
+        self.max_users = max_users
+        self._lists: "OrderedDict[tuple, dict]" = OrderedDict()
+        self._owners = {}  # (db, session_id) -> user_id, for sessions in a cached list
+        self._version = 0  # bumped by every write, so a load that raced one is not kept
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def page(self, user_id, limit=20):
+        """Returns (sessions, next_cursor) for the pages loaded so far, loading the first one if needed."""
+        key = (DB_NAME, user_id)
+        with self._lock:
+            entry = self._lists.get(key)
+            if entry is not None:
+                self._lists.move_to_end(key)
+                self.hits += 1
+                return list(entry["sessions"]), entry["cursor"]
+            self.misses += 1
+            version = self._version
+        sessions, cursor = get_user_sessions_page(user_id, limit)
+        with self._lock:
+            if self._version == version:
+                self._store(key, sessions, cursor)
+        return list(sessions), cursor
+
+    def load_more(self, user_id, limit=20):
+        """Appends the next page to the user's cached list; returns (sessions, next_cursor)."""
+        sessions, cursor = self.page(user_id, limit)
+        if cursor is None:
+            return sessions, None
+        more, cursor = get_user_sessions_page(user_id, limit, before=cursor)
+        key = (DB_NAME, user_id)
+        with self._lock:
+            entry = self._lists.get(key)
+            if entry is not None:
+                shown = {s["id"] for s in entry["sessions"]}
+                more = [s for s in more if s["id"] not in shown]
+                self._store(key, entry["sessions"] + more, cursor)
+                return list(self._lists[key]["sessions"]), cursor
+        return sessions + more, cursor
+
+    def _store(self, key, sessions, cursor):
+        self._lists[key] = {"sessions": sessions, "cursor": cursor}
+        self._lists.move_to_end(key)
+        for s in sessions:
+            self._owners[(key[0], s["id"])] = key[1]
+        while len(self._lists) > self.max_users:
+            (db, _), evicted = self._lists.popitem(last=False)
+            for s in evicted["sessions"]:
+                self._owners.pop((db, s["id"]), None)
+
+    def created(self, user_id, session):
+        with self._lock:
+            self._version += 1
+            key = (DB_NAME, user_id)
+            entry = self._lists.get(key)
+            if entry is not None:
+                # Newest first, like get_user_sessions_page
+                entry["sessions"] = [session] + entry["sessions"]
+                self._owners[(DB_NAME, session["id"])] = user_id
+
+    def renamed(self, session_id, title):
+        with self._lock:
+            self._version += 1
+            entry = self._entry_for(session_id)
+            if entry is not None:
+                entry["sessions"] = [{**s, "title": title} if s["id"] == session_id else s for s in entry["sessions"]]
+
+    def deleted(self, session_id):
+        with self._lock:
+            self._version += 1
+            entry = self._entry_for(session_id)
+            if entry is not None:
+                entry["sessions"] = [s for s in entry["sessions"] if s["id"] != session_id]
+            self._owners.pop((DB_NAME, session_id), None)
+
+    def _entry_for(self, session_id):
+        user_id = self._owners.get((DB_NAME, session_id))
+        return self._lists.get((DB_NAME, user_id)) if user_id is not None else None
+
+    def invalidate(self, user_id=None):
+        """Drops one user's list (or all of them); the next page() reloads from sqlite."""
+        with self._lock:
+            self._version += 1
+            keys = [k for k in self._lists if user_id is None or k == (DB_NAME, user_id)]
+            for key in keys:
+                for s in self._lists.pop(key)["sessions"]:
+                    self._owners.pop((key[0], s["id"]), None)
+
+session_lists = SessionListCache()
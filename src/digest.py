@@ -0,0 +1,78 @@
+import re
+from collections import Counter
+from typing import Any, Dict, List
+from src.agents.base import AgentResponse
+
+# Rough token estimate (~4 characters per token for English); avoids a tokenizer dependency.
+CHARS_PER_TOKEN = 4
+MIN_TOKENS_PER_DIGEST = 40
+# Keys, quoting and punctuation around each digest once serialized to JSON
+DIGEST_OVERHEAD_TOKENS = 16
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+_WORD = re.compile(r"[a-zA-Z]{4,}")
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    cut = text.rfind(" ", 0, max_chars)
+    return text[:cut if cut > 0 else max_chars].rstrip() + "..."
+
+def key_sentences(text: str, max_tokens: int) -> str:
+    """
+    Extractive summary within `max_tokens`: the opening sentence plus the sentences
+    with the most frequent content words, kept in their original order.
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    sentences = [s for s in _SENTENCE_SPLIT.split(text.strip()) if s]
+    if len(sentences) <= 1:
+        return truncate_to_tokens(text, max_tokens)
+
+    frequencies = Counter(w.lower() for w in _WORD.findall(text))
+    def score(sentence: str) -> float:
+        words = [w.lower() for w in _WORD.findall(sentence)]
+        return sum(frequencies[w] for w in words) / (len(words) or 1)
+
+    ranked = [0] + sorted(range(1, len(sentences)), key=lambda i: score(sentences[i]), reverse=True)
+    chosen, used = [], 0
+    for i in ranked:
+        cost = estimate_tokens(sentences[i]) + 1
+        if used + cost > max_tokens:
+            if not chosen:
+                return truncate_to_tokens(sentences[i], max_tokens)
+            continue
+        chosen.append(i)
+        used += cost
+    return " ".join(sentences[i] for i in sorted(chosen))
+
+def build_digests(responses: List[AgentResponse], token_budget: int) -> List[Dict[str, Any]]:
+    """
+    Builds one bounded digest per valid response (summary, rationale, confidence) so the
+    whole set fits in `token_budget`. Built once per turn and shared by every critic.
+    When the budget cannot give every response MIN_TOKENS_PER_DIGEST, only the most
+    confident ones that fit are digested (in their original order).
+    """
+    valid = [r for r in responses if r.confidence > 0]
+    if not valid:
+        return []
+    fits = max(1, token_budget // (MIN_TOKENS_PER_DIGEST + DIGEST_OVERHEAD_TOKENS))
+    if len(valid) > fits:
+        keep = set(sorted(range(len(valid)), key=lambda i: valid[i].confidence, reverse=True)[:fits])
+        valid = [r for i, r in enumerate(valid) if i in keep]
+    per_digest = max(1, token_budget // len(valid) - DIGEST_OVERHEAD_TOKENS)
+    rationale_tokens = per_digest // 4
+    digests = []
+    for r in valid:
+        rationale = truncate_to_tokens(r.rationale, rationale_tokens)
+        digests.append({
+            "name": r.name,
+            "summary": key_sentences(r.answer, per_digest - estimate_tokens(rationale)),
+            "rationale": rationale,
+            "confidence": r.confidence,
+        })
+    return digests
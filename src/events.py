@@ -0,0 +1,26 @@
+from typing import Any, Dict, Literal, Union
+from pydantic import BaseModel
+from src.agents.base import AgentResponse
+
+class AgentAnsweredEvent(BaseModel):
+    """An agent finished the broadcast phase (emitted in completion order)."""
+    type: Literal["agent_answer"] = "agent_answer"
+    response: AgentResponse
+
+class CritiqueEvent(BaseModel):
+    """An agent returned its cross-critique."""
+    type: Literal["critique"] = "critique"
+    name: str
+    critique: str
+
+class SynthesisTokenEvent(BaseModel):
+    """A chunk of text streamed from the synthesis model."""
+    type: Literal["synthesis_token"] = "synthesis_token"
+    token: str
+
+class FinalResultEvent(BaseModel):
+    """The complete orchestration result, same shape as `process_query` returns."""
+    type: Literal["final"] = "final"
+    result: Dict[str, Any]
+
+OrchestrationEvent = Union[AgentAnsweredEvent, CritiqueEvent, SynthesisTokenEvent, FinalResultEvent]
@@ -0,0 +1,222 @@
+import json
+import re
+from typing import Any, Dict, Optional, Set
+
+_FENCE = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$", re.IGNORECASE)
+_SCALARS = {"true": True, "false": False, "null": None}
+
+# Parser states
+_BEFORE, _KEY, _BARE_KEY, _COLON, _VALUE, _STRING, _SCALAR, _NESTED, _AFTER, _DONE = range(10)
+
+def _scalar(raw: str) -> Any:
+    raw = raw.strip()
+    if raw in _SCALARS:
+        return _SCALARS[raw]
+    try:
+        return int(raw)
+    except ValueError:
+        pass
+    try:
+        return float(raw)
+    except ValueError:
+        return raw
+
+class StreamingJSONParser:
+    """
+    Incremental, tolerant parser for the one-level JSON objects the models are asked for.
+    Feed it chunks as they stream in; `values` holds every top-level field seen so far,
+    including the partial text of a string that is still arriving.
+
+    Tolerates prose or code fences around the object, unquoted keys, single-quoted
+    strings, raw newlines inside strings, trailing commas and a missing closing brace.
+    Nested arrays/objects are kept raw until they close, then decoded with json.loads.
+
+    Only the Combiner's synthesis is streamed through it. Agent calls are not streamed:
+    RealAgent runs parse_tolerant on the finished completion, so nothing acts on
+    partial agent answers yet.
+    """
+
+    def __init__(self):
+        self.values: Dict[str, Any] = {}
+        self.complete: Set[str] = set()
+        self._state = _BEFORE
+        self._key = ""
+        self._buf = []
+        self._quote = '"'
+        self._escape = ""      # pending escape sequence, possibly split across chunks
+        self._high = ""        # decoded high surrogate waiting for its low half
+        self._depth = 0
+        self._nested_quote = ""
+        self._nested_escape = False
+
+    @property
+    def done(self) -> bool:
+        return self._state == _DONE
+
+    def feed(self, chunk: str) -> Set[str]:
+        """Consumes a chunk and returns the keys whose values changed."""
+        updated: Set[str] = set()
+        for ch in chunk:
+            state = self._state
+            if state == _STRING:
+                if self._string_char(ch):
+                    updated.add(self._key)
+                continue
+            if state == _BEFORE:
+                if ch == "{":
+                    self._state = _KEY
+            elif state == _KEY:
+                if ch in "\"'":
+                    self._quote, self._buf, self._state = ch, [], _STRING
+                    self._key = None  # a string that is a key, not a value
+                elif ch == "}":
+                    self._state = _DONE
+                elif ch.isalnum() or ch == "_":
+                    self._buf, self._state = [ch], _BARE_KEY
+            elif state == _BARE_KEY:
+                if ch == ":":
+                    self._key, self._state = "".join(self._buf).strip(), _VALUE
+                else:
+                    self._buf.append(ch)
+            elif state == _COLON:
+                if ch == ":":
+                    self._state = _VALUE
+            elif state == _VALUE:
+                if ch in "\"'":
+                    self._quote, self._buf, self._state = ch, [], _STRING
+                    self.values[self._key] = ""
+                    updated.add(self._key)
+                elif ch in "[{":
+                    self._buf, self._depth, self._nested_quote, self._state = [ch], 1, "", _NESTED
+                    self._nested_escape = False
+                elif ch == "}":
+                    self._state = _DONE
+                elif not ch.isspace():
+                    self._buf, self._state = [ch], _SCALAR
+            elif state == _SCALAR:
+                if ch in ",}\n":
+                    self._finish(_scalar("".join(self._buf)), updated)
+                    self._state = _DONE if ch == "}" else _KEY
+                else:
+                    self._buf.append(ch)
+            elif state == _NESTED:
+                self._nested_char(ch, updated)
+            elif state == _AFTER:
+                if ch == ",":
+                    self._state = _KEY
+                elif ch == "}":
+                    self._state = _DONE
+                elif ch in "\"'":
+                    # Missing comma between fields
+                    self._quote, self._buf, self._state = ch, [], _STRING
+                    self._key = None
+            elif state == _DONE:
+                break
+        if self._state == _STRING and self._key is not None:
+            # Partial text is materialized once per chunk, not per character
+            self.values[self._key] = "".join(self._buf)
+        return updated
+
+    def _string_char(self, ch: str) -> bool:
+        """Handles one character inside a quoted string; True when a value's text grew."""
+        if self._escape:
+            self._escape += ch
+            if self._escape[1] == "u" and len(self._escape) < 6:
+                return False
+            try:
+                decoded = json.loads(f'"{self._escape}"')
+            except json.JSONDecodeError:
+                decoded = self._escape[1:]
+            self._escape = ""
+            return self._append_decoded(decoded)
+        if ch == "\\":
+            self._escape = ch
+            return False
+        if self._high:
+            self._append_decoded("")
+        if ch == self._quote:
+            text = "".join(self._buf)
+            if self._key is None:
+                self._key, self._state = text, _COLON
+                return False
+            self.values[self._key] = text
+            self.complete.add(self._key)
+            self._state = _AFTER
+            return True
+        return self._append(ch)
+
+    def _append_decoded(self, decoded: str) -> bool:
+        """
+        Appends an escape's text. Characters outside the BMP arrive as two \\u escapes
+        (a surrogate pair); they are joined here, since lone surrogates cannot be encoded
+        (sqlite refuses them). A half without its partner becomes U+FFFD.
+        """
+        if self._high:
+            high, self._high = self._high, ""
+            if "\udc00" <= decoded <= "\udfff":
+                return self._append(chr(0x10000 + ((ord(high) - 0xD800) << 10) + ord(decoded) - 0xDC00))
+            self._append("\ufffd")
+        if "\ud800" <= decoded <= "\udbff":
+            self._high = decoded
+            return False
+        if "\udc00" <= decoded <= "\udfff":
+            decoded = "\ufffd"
+        return self._append(decoded) if decoded else self._key is not None
+
+    def _append(self, text: str) -> bool:
+        self._buf.append(text)
+        return self._key is not None
+
+    def _nested_char(self, ch: str, updated: Set[str]):
+        self._buf.append(ch)
+        if self._nested_quote:
+            if self._nested_escape:
+                self._nested_escape = False
+            elif ch == "\\":
+                self._nested_escape = True
+            elif ch == self._nested_quote:
+                self._nested_quote = ""
+            return
+        if ch in "\"'":
+            self._nested_quote = ch
+        elif ch in "[{":
+            self._depth += 1
+        elif ch in "]}":
+            self._depth -= 1
+            if self._depth == 0:
+                raw = "".join(self._buf)
+                try:
+                    value = json.loads(raw)
+                except json.JSONDecodeError:
+                    value = raw
+                self._finish(value, updated)
+                self._state = _AFTER
+
+    def _finish(self, value: Any, updated: Set[str]):
+        self.values[self._key] = value
+        self.complete.add(self._key)
+        updated.add(self._key)
+
+    def close(self) -> Dict[str, Any]:
+        """Ends the stream: a trailing bare scalar (no closing brace) is kept as well."""
+        if self._state == _SCALAR and self._buf:
+            self._finish(_scalar("".join(self._buf)), set())
+            self._state = _AFTER
+        return self.values
+
+def parse_tolerant(text: str) -> Optional[Dict[str, Any]]:
+    """
+    Strict json.loads on the fence-stripped text first, then the tolerant parser.
+    Returns None when no field can be recovered (e.g. the model answered in prose).
+    """
+    stripped = _FENCE.sub("", text.strip())
+    try:
+        data = json.loads(stripped)
+        if isinstance(data, dict):
+            return data
+    except json.JSONDecodeError:
+        pass
+    parser = StreamingJSONParser()
+    parser.feed(text)
+    values = parser.close()
+    return values or None
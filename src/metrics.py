@@ -0,0 +1,262 @@
+import math
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+# Seconds; spans cache hits (ms) up to the slowest LLM calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 1.5, 2.0, 3.0, 5.0, 7.5, 10.0, 15.0, 20.0, 30.0, 60.0)
+
+LabelValues = Tuple[str, ...]
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...], lock: threading.Lock):
+        self.name = name
+        self.help = help_text
+        self.labels = labels
+        self._lock = lock
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labels)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"] + self._samples()
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self.values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labels, k)} {_format_value(v)}" for k, v in sorted(self.values.items())]
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self.values[self._key(labels)] = value
+
+class _HistogramSeries:
+    def __init__(self, size: int):
+        self.counts = [0] * size
+        self.count = 0
+        self.sum = 0.0
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, *args, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(*args)
+        self.buckets = tuple(buckets) + (math.inf,)
+        self.series: Dict[LabelValues, _HistogramSeries] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = _HistogramSeries(len(self.buckets))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series.counts[i] += 1
+                    break
+            series.count += 1
+            series.sum += value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def quantile(self, q: float, **labels) -> Optional[float]:
+        """Estimates a quantile by linear interpolation inside the bucket, like PromQL's histogram_quantile."""
+        series = self.series.get(self._key(labels))
+        if series is None or series.count == 0:
+            return None
+        rank = q * series.count
+        seen = 0
+        lower = 0.0
+        for bound, count in zip(self.buckets, series.counts):
+            if count and seen + count >= rank:
+                if bound == math.inf:
+                    return lower
+                return lower + (bound - lower) * (rank - seen) / count
+            seen += count
+            lower = bound if bound != math.inf else lower
+        return lower
+
+    def _samples(self) -> List[str]:
+        lines = []
+        for key, series in sorted(self.series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, series.counts):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {_format_value(series.sum)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {series.count}")
+        return lines
+
+class MetricsRegistry:
+    """In-process metrics, rendered in the Prometheus text exposition format."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, _Metric] = {}
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, help_text: str, labels: Tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labels, self._lock))
+
+    def gauge(self, name: str, help_text: str, labels: Tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(name, help_text, labels, self._lock))
+
+    def histogram(self, name: str, help_text: str, labels: Tuple[str, ...] = (), buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, labels, self._lock, buckets=buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            lines = [line for metric in self._metrics.values() for line in metric.render()]
+        return "\n".join(lines) + "\n"
+
+    def start_http_server(self, port: int, host: str = "127.0.0.1") -> bool:
+        """Serves GET /metrics from a daemon thread. Safe to call more than once."""
+        if self._server is not None:
+            return True
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        try:
+            self._server = ThreadingHTTPServer((host, port), Handler)
+        except OSError as e:
+            # Typically another process (or Streamlit worker) already owns the port
+            print(f"Metrics endpoint not started on {host}:{port}: {e}")
+            return False
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True, name="metrics-http").start()
+        print(f"Metrics available at http://{host}:{port}/metrics")
+        return True
+
+    def stop_http_server(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+metrics = MetricsRegistry()
+
+STAGE_SECONDS = metrics.histogram(
+    "orchestrator_stage_seconds", "Wall time of each orchestration stage.", ("stage",))
+AGENT_SECONDS = metrics.histogram(
+    "orchestrator_agent_call_seconds", "Latency of live agent and Combiner calls (cache hits excluded).", ("agent", "kind"))
+AGENT_ERRORS = metrics.counter(
+    "orchestrator_agent_errors_total", "Agent and Combiner calls that failed or returned no usable answer.", ("agent", "kind"))
+AGENT_TIMEOUTS = metrics.counter(
+    "orchestrator_agent_timeouts_total", "Calls cut off by a phase or orchestration deadline.", ("agent", "stage"))
+QUORUM_CUTOFFS = metrics.counter(
+    "orchestrator_agent_quorum_cutoffs_total", "Agent calls cancelled because the broadcast quorum had already answered.", ("agent",))
+TOKENS = metrics.counter(
+    "orchestrator_tokens_total", "Prompt and completion tokens reported by the providers.", ("agent", "type"))
+
+def record_usage(agent: str, prompt_tokens: Optional[int], completion_tokens: Optional[int]):
+    """Adds provider-reported token usage; providers that omit it are skipped."""
+    if prompt_tokens:
+        TOKENS.inc(prompt_tokens, agent=agent, type="prompt")
+    if completion_tokens:
+        TOKENS.inc(completion_tokens, agent=agent, type="completion")
+
+def record_openai_usage(agent: str, response) -> None:
+    usage = getattr(response, "usage", None)
+    if usage is not None:
+        record_usage(agent, getattr(usage, "prompt_tokens", None), getattr(usage, "completion_tokens", None))
+
+def record_gemini_usage(agent: str, response) -> None:
+    usage = getattr(response, "usage_metadata", None)
+    if usage is not None:
+        record_usage(agent, getattr(usage, "prompt_token_count", None), getattr(usage, "candidates_token_count", None))
+
+def agent_summary() -> List[Dict[str, object]]:
+    """Per-agent rows for the admin panel (latency of the agent's main call: answer, or synthesis for the Combiner)."""
+    latencies, errors = list(AGENT_SECONDS.series.items()), list(AGENT_ERRORS.values.items())
+    timeouts, tokens = list(AGENT_TIMEOUTS.values.items()), list(TOKENS.values.items())
+    cutoffs = list(QUORUM_CUTOFFS.values.items())
+    names = sorted({k[0] for k, _ in latencies + errors + timeouts + cutoffs + tokens})
+    rows = []
+    for name in names:
+        kind = "synthesis" if name == "Combiner" else "query"
+        rows.append({
+            "agent": name,
+            "calls": sum(s.count for k, s in latencies if k[0] == name),
+            "p50 (s)": AGENT_SECONDS.quantile(0.5, agent=name, kind=kind),
+            "p95 (s)": AGENT_SECONDS.quantile(0.95, agent=name, kind=kind),
+            "errors": int(sum(v for k, v in errors if k[0] == name)),
+            "timeouts": int(sum(v for k, v in timeouts if k[0] == name)),
+            "quorum cut-offs": int(sum(v for k, v in cutoffs if k[0] == name)),
+            "prompt tokens": int(sum(v for k, v in tokens if k == (name, "prompt"))),
+            "completion tokens": int(sum(v for k, v in tokens if k == (name, "completion"))),
+        })
+    return rows
+
+def stage_summary() -> List[Dict[str, object]]:
+    rows = []
+    for (stage,), series in sorted(list(STAGE_SECONDS.series.items())):
+        rows.append({
+            "stage": stage,
+            "runs": series.count,
+            "mean (s)": series.sum / series.count,
+            "p50 (s)": STAGE_SECONDS.quantile(0.5, stage=stage),
+            "p95 (s)": STAGE_SECONDS.quantile(0.95, stage=stage),
+        })
+    return rows
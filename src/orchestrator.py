@@ -1,29 +1,55 @@
 import asyncio
+import copy
 import os
-from typing import List, Dict, Any
+import threading
+import time
+from typing import List, Dict, Any, Optional, AsyncIterator, Sequence, Tuple
 from dotenv import load_dotenv
-from src.config import AppConfig, AgentConfig
-from src.agents.base import BaseAgent, AgentResponse
+from src.config import AppConfig, AgentConfig, BudgetProfile, PhaseBudget, ConfigWatcher
+from src.agents.base import BaseAgent, AgentResponse, CRITIQUE_FAILED
 from src.agents.simulated import SimulatedAgent
-from src.agents.real import RealAgent
 from src.combiner import Combiner
+from src.events import OrchestrationEvent, AgentAnsweredEvent, CritiqueEvent, SynthesisTokenEvent, FinalResultEvent
 from src.sanitizer import Sanitizer
+from src.digest import build_digests
+from src.cache import ResponseCache, make_key, normalize_query
+from src.clients import registry
+from src.resilience import resilience, deadline as call_deadline
+from src.router import AgentRouter
+from src.metrics import STAGE_SECONDS, AGENT_SECONDS, AGENT_ERRORS, AGENT_TIMEOUTS, QUORUM_CUTOFFS
 
 load_dotenv()
 
+# Answer of an agent cancelled because enough others had already answered
+QUORUM_CUTOFF_ANSWER = "[Cut off: quorum reached]"
+
 class MultiAgentOrchestrator:
     def __init__(self, config: AppConfig, use_real_agents: bool = False):
         self.config = config
         self.use_real_agents = use_real_agents
+        registry.configure(config.http)
+        resilience.configure(config.resilience)
         self.agents: List[BaseAgent] = self._initialize_agents(config.agents)
-        self.combiner = Combiner(config.orchestrator)
+        self.cache = ResponseCache(config.cache)
+        self.combiner = Combiner(config.orchestrator, cache=self.cache)
         self.sanitizer = Sanitizer(config.sanitization)
+        self.router = AgentRouter(config.routing, config.agents)
+        self.config_version = 1
+        self._swap_lock = threading.Lock()
+        self._watcher: Optional[ConfigWatcher] = None
         print(f"Initialized {self.config.orchestrator.name} (Mode: {'REAL' if use_real_agents else 'SIMULATED'})")
 
-    def _initialize_agents(self, agent_configs: List[AgentConfig]) -> List[BaseAgent]:
+    def _initialize_agents(self, agent_configs: List[AgentConfig], reuse: Optional[List[BaseAgent]] = None) -> List[BaseAgent]:
+        """Builds the agents; with `reuse`, unchanged agents (same name, vendor and template) are kept."""
+        previous = {(a.name, a.vendor, a.template): a for a in reuse or []}
         agents = []
         for agent_cfg in agent_configs:
-            if self.use_real_agents:
+            kept = previous.get((agent_cfg.name, agent_cfg.vendor, agent_cfg.template))
+            if kept is not None:
+                agents.append(kept)
+            elif self.use_real_agents:
+                # Imported here so simulated mode never loads the vendor-facing code
+                from src.agents.real import RealAgent
                 agents.append(RealAgent(
                     name=agent_cfg.name,
                     vendor=agent_cfg.vendor,
@@ -37,65 +63,431 @@ class MultiAgentOrchestrator:
                 ))
         return agents
 
-    async def broadcast_query(self, user_query: str) -> List[AgentResponse]:
-        timeout_seconds = self.config.timeouts.initial_answer_seconds
-        tasks = [agent.query(user_query) for agent in self.agents]
-        
-        print(f"Broadcasting to {len(self.agents)} agents...")
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        valid_responses = []
-        for i, result in enumerate(results):
-            agent_name = self.agents[i].name
-            if isinstance(result, Exception):
-                print(f"xx Agent {agent_name} failed: {result}")
-                valid_responses.append(AgentResponse(
-                    name=agent_name,
-                    answer="[Timeout/Error]",
-                    rationale="Agent failed.",
-                    confidence=0.0,
-                    sources=[]
-                ))
-            else:
-                valid_responses.append(result)
-        return valid_responses
-
-    async def run_critique_round(self, responses: List[AgentResponse]) -> List[str]:
-        responses_data = [r.model_dump() for r in responses if r.confidence > 0]
-        tasks = []
-        for agent in self.agents:
-            tasks.append(agent.critique(responses_data))
-            
+    def reload(self, config: AppConfig):
+        """
+        Swaps in a new config while running. Requests already in flight finish on the
+        config, agents and Combiner they started with (see `_pinned`). Warm state is kept:
+        pooled clients, cache entries, router statistics, breakers and the audit log.
+        """
+        # First, so agents built below already see the new endpoint
+        base_url = registry.base_url
+        registry.configure(config.http)
+        # Agents and the Combiner keep the endpoint they were built with
+        moved = registry.base_url != base_url
+        agents = self._initialize_agents(config.agents, reuse=None if moved else self.agents)
+        combiner = self.combiner
+        if moved or config.orchestrator != self.config.orchestrator:
+            combiner = Combiner(config.orchestrator, cache=self.cache)
+        sanitizer = self.sanitizer
+        if config.sanitization != self.config.sanitization:
+            sanitizer = Sanitizer(config.sanitization)
+            sanitizer.audit_log.extend(self.sanitizer.audit_log)
+
+        resilience.configure(config.resilience)
+        self.cache.config = config.cache
+        self.router.configure(config.routing, config.agents)
+        with self._swap_lock:
+            self.config, self.agents, self.combiner, self.sanitizer = config, agents, combiner, sanitizer
+            self.config_version += 1
+        print(f"Reloaded configuration (version {self.config_version}, {len(agents)} agents)")
+
+    def watch_config(self, config_path: str) -> Optional[ConfigWatcher]:
+        """Starts a file watcher that reloads this orchestrator when `config_path` changes (`reload.enabled`)."""
+        if self._watcher is None and self.config.reload.enabled:
+            self._watcher = ConfigWatcher(config_path, self.reload, self.config.reload.poll_seconds).start()
+        return self._watcher
+
+    def stop_watching_config(self):
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+
+    def _pinned(self) -> "MultiAgentOrchestrator":
+        """A shallow copy that keeps the current config, agents and Combiner for one request."""
+        with self._swap_lock:
+            return copy.copy(self)
+
+    def _phase_deadline(self, phase_seconds: int, deadline: Optional[float]) -> float:
+        """Returns the loop time at which a phase must end, capped by the overall deadline."""
+        phase_deadline = asyncio.get_running_loop().time() + phase_seconds
+        if deadline is not None:
+            phase_deadline = min(phase_deadline, deadline)
+        return phase_deadline
+
+    def _failed_response(self, agent_name: str, answer: str = "[Timeout/Error]") -> AgentResponse:
+        return AgentResponse(
+            name=agent_name,
+            answer=answer,
+            rationale="Agent failed.",
+            confidence=0.0,
+            sources=[]
+        )
+
+    async def _query_agent(self, agent: BaseAgent, user_query: str, budget: Optional[PhaseBudget] = None, history: Optional[List[Dict[str, str]]] = None) -> AgentResponse:
+        """
+        Cache-aware, rate-limited wrapper around `agent.query`. Cache misses take a
+        per-vendor in-flight slot; failed, truncated and unparsable answers are never
+        cached. The budget and the conversation history are part of the key: a fast-mode
+        answer is not reused for a full one, nor an answer given in one conversation for a
+        follow-up in another.
+        """
+        if not self.cache.enabled_for(agent.name):
+            return await self._call_agent(agent, user_query, budget, history)
+
+        payload = {"query": normalize_query(user_query), "budget": budget.model_dump() if budget else None}
+        if history:
+            payload["history"] = history
+        key = make_key("query", agent.name, agent.template, agent.model_id, payload)
+        cached = await self.cache.aget(key)
+        if cached is not None:
+            return AgentResponse(**cached)
+
+        response = await self._call_agent(agent, user_query, budget, history)
+        if response.confidence > 0 and response.complete:
+            await self.cache.aset(key, response.model_dump())
+        return response
+
+    async def _call_agent(self, agent: BaseAgent, user_query: str, budget: Optional[PhaseBudget] = None, history: Optional[List[Dict[str, str]]] = None) -> AgentResponse:
+        """Live `agent.query` call; its latency and outcome feed the router's statistics and metrics."""
+        async with registry.slot(agent.vendor):
+            start = time.perf_counter()
+            try:
+                response = await agent.query(user_query, history=history, budget=budget)
+            except asyncio.CancelledError:
+                self.router.record_cancelled(agent.name, time.perf_counter() - start)
+                raise
+            except Exception:
+                elapsed = time.perf_counter() - start
+                self.router.record_failure(agent.name, elapsed)
+                AGENT_SECONDS.observe(elapsed, agent=agent.name, kind="query")
+                AGENT_ERRORS.inc(agent=agent.name, kind="query")
+                raise
+        elapsed = time.perf_counter() - start
+        self.router.record_answer(agent.name, elapsed, response)
+        AGENT_SECONDS.observe(elapsed, agent=agent.name, kind="query")
+        if response.confidence <= 0:
+            AGENT_ERRORS.inc(agent=agent.name, kind="query")
+        return response
+
+    async def _critique_agent(self, agent: BaseAgent, responses_data: List[Dict[str, Any]], budget: Optional[PhaseBudget] = None) -> str:
+        """Cache-aware wrapper around `agent.critique`."""
+        if not self.cache.enabled_for(agent.name):
+            return await self._call_critic(agent, responses_data, budget)
+
+        payload = {"responses": responses_data, "budget": budget.model_dump() if budget else None}
+        key = make_key("critique", agent.name, agent.template, agent.model_id, payload)
+        cached = await self.cache.aget(key)
+        if cached is not None:
+            return cached
+
+        critique = await self._call_critic(agent, responses_data, budget)
+        if critique != CRITIQUE_FAILED:
+            await self.cache.aset(key, critique)
+        return critique
+
+    async def _call_critic(self, agent: BaseAgent, responses_data: List[Dict[str, Any]], budget: Optional[PhaseBudget] = None) -> str:
+        async with registry.slot(agent.vendor):
+            start = time.perf_counter()
+            try:
+                critique = await agent.critique(responses_data, budget=budget)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                AGENT_ERRORS.inc(agent=agent.name, kind="critique")
+                raise
+            finally:
+                AGENT_SECONDS.observe(time.perf_counter() - start, agent=agent.name, kind="critique")
+        if critique == CRITIQUE_FAILED:
+            AGENT_ERRORS.inc(agent=agent.name, kind="critique")
+        return critique
+
+    async def _iter_broadcast(self, user_query: str, deadline: Optional[float] = None, agents: Optional[List[BaseAgent]] = None, budgets: Optional[BudgetProfile] = None,
+                              history: Optional[List[Dict[str, str]]] = None) -> AsyncIterator[AgentResponse]:
+        """
+        Yields agent responses in completion order until `broadcast_quorum` agents have answered
+        or the phase deadline expires, whichever comes first. Late agents are cancelled and
+        yielded last with confidence 0.0, like failed ones; only those cut off by the deadline
+        count as timeouts, not those the quorum made unnecessary. Every agent gets the same
+        `history` (the conversation context, see src.context).
+        """
+        agents = self.agents if agents is None else agents
+        budgets = budgets or self.config.budgets.profile()
+        loop = asyncio.get_running_loop()
+        phase_deadline = self._phase_deadline(self.config.timeouts.initial_answer_seconds, deadline)
+        quorum = min(self.config.timeouts.broadcast_quorum or len(agents), len(agents))
+
+        with call_deadline(phase_deadline):
+            tasks = {asyncio.ensure_future(self._query_agent(agent, user_query, budgets.for_answer(agent.name), history)): agent for agent in agents}
+        pending = set(tasks)
+        answered = 0
+
+        print(f"Broadcasting to {len(agents)} agents (quorum {quorum})...")
+        try:
+            while pending and answered < quorum:
+                remaining = phase_deadline - loop.time()
+                if remaining <= 0:
+                    break
+                done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    agent_name = tasks[task].name
+                    if task.exception() is not None:
+                        print(f"xx Agent {agent_name} failed: {task.exception()}")
+                        yield self._failed_response(agent_name)
+                    else:
+                        response = task.result()
+                        if response.confidence > 0:
+                            answered += 1
+                        yield response
+
+            for task in pending:
+                agent_name = tasks[task].name
+                if answered >= quorum:
+                    print(f"-- Agent {agent_name} cut off, quorum reached")
+                    QUORUM_CUTOFFS.inc(agent=agent_name)
+                    yield self._failed_response(agent_name, QUORUM_CUTOFF_ANSWER)
+                else:
+                    print(f"xx Agent {agent_name} missed the broadcast deadline")
+                    AGENT_TIMEOUTS.inc(agent=agent_name, stage="broadcast")
+                    yield self._failed_response(agent_name)
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def broadcast_query(self, user_query: str, deadline: Optional[float] = None, agents: Optional[List[BaseAgent]] = None, budgets: Optional[BudgetProfile] = None,
+                              history: Optional[List[Dict[str, str]]] = None) -> List[AgentResponse]:
+        agents = self.agents if agents is None else agents
+        results = {r.name: r async for r in self._iter_broadcast(user_query, deadline, agents, budgets, history)}
+        return [results[agent.name] for agent in agents]
+
+    async def _iter_critiques(self, responses: List[AgentResponse], deadline: Optional[float] = None, agents: Optional[List[BaseAgent]] = None, budgets: Optional[BudgetProfile] = None) -> AsyncIterator[Tuple[str, str]]:
+        """
+        Yields (agent name, critique) pairs in completion order within the discussion deadline.
+        Critics get token-bounded digests of the other agents' answers (built once, shared),
+        never their own.
+        """
+        agents = self.agents if agents is None else agents
+        budget = (budgets or self.config.budgets.profile()).critique
+        loop = asyncio.get_running_loop()
+        digests = build_digests(responses, self.config.cross_agent_discussion.digest_token_budget)
+        phase_deadline = self._phase_deadline(self.config.timeouts.discussion_answer_seconds, deadline)
+        tasks = {}
+        idle = []
+        # Start every critic before the first yield: a consumer that stops early then
+        # still reaches the finally below, which cancels them
+        with call_deadline(phase_deadline):
+            for agent in agents:
+                others = [d for d in digests if d["name"] != agent.name]
+                if others:
+                    tasks[asyncio.ensure_future(self._critique_agent(agent, others, budget))] = agent
+                else:
+                    idle.append(agent)
+        pending = set(tasks)
+
         print("Running critique round...")
-        critiques = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        clean_critiques = []
-        for c in critiques:
-            if isinstance(c, Exception):
-                clean_critiques.append("Critique failed.")
-            else:
-                clean_critiques.append(c)
-        return clean_critiques
+        try:
+            for agent in idle:
+                yield agent.name, "No other answers to critique."
+            while pending:
+                remaining = phase_deadline - loop.time()
+                if remaining <= 0:
+                    break
+                done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        yield tasks[task].name, "Critique failed."
+                    else:
+                        yield tasks[task].name, task.result()
+
+            for task in pending:
+                AGENT_TIMEOUTS.inc(agent=tasks[task].name, stage="critique")
+                yield tasks[task].name, "Critique timed out."
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def run_critique_round(self, responses: List[AgentResponse], deadline: Optional[float] = None, agents: Optional[List[BaseAgent]] = None, budgets: Optional[BudgetProfile] = None) -> List[str]:
+        agents = self.agents if agents is None else agents
+        critiques = {name: c async for name, c in self._iter_critiques(responses, deadline, agents, budgets)}
+        return [critiques[agent.name] for agent in agents]
+
+    async def synthesize_within(self, user_query: str, responses: List[AgentResponse], critiques: List[str], deadline: Optional[float] = None, budget: Optional[PhaseBudget] = None) -> Dict[str, Any]:
+        """Runs the Combiner with whatever is left of the orchestration budget."""
+        if deadline is None:
+            return await self.combiner.synthesize(user_query, responses, critiques, budget)
+
+        remaining = deadline - asyncio.get_running_loop().time()
+        try:
+            if remaining <= 0:
+                raise asyncio.TimeoutError()
+            with call_deadline(deadline):
+                return await asyncio.wait_for(self.combiner.synthesize(user_query, responses, critiques, budget), timeout=remaining)
+        except asyncio.TimeoutError:
+            print("xx Synthesis exceeded the orchestration budget, using heuristic fallback")
+            AGENT_TIMEOUTS.inc(agent="Combiner", stage="synthesize")
+            return self.combiner.fallback_result(responses)
 
     def validate_and_sanitize(self, user_query: str) -> str:
         """
         Step 1: Sanitize Input (PII Removal)
         """
-        return self.sanitizer.sanitize(user_query)
+        with STAGE_SECONDS.time(stage="sanitize"):
+            return self.sanitizer.sanitize(user_query)
+
+    def sanitize_history(self, history: Optional[List[Dict[str, str]]]) -> Optional[List[Dict[str, str]]]:
+        """Applies the same PII redaction as the query to conversation history bound for agents."""
+        if not history:
+            return None
+        with STAGE_SECONDS.time(stage="sanitize"):
+            return [{"role": m["role"], "content": self.sanitizer.sanitize(m["content"], source="history")} for m in history]
+
+    async def process_query(self, user_query: str, profile: Optional[str] = None, history: Optional[List[Dict[str, str]]] = None) -> Dict[str, Any]:
+        """
+        `profile` names a budgets profile (e.g. "fast"); None uses the configured default.
+        `history` is the conversation context passed to every agent (see src.context).
+        """
+        return await self._pinned()._process_query(user_query, profile, history)
+
+    async def _process_query(self, user_query: str, profile: Optional[str] = None, history: Optional[List[Dict[str, str]]] = None) -> Dict[str, Any]:
+        budgets = self.config.budgets.profile(profile)
+        with STAGE_SECONDS.time(stage="total"):
+            # total_orchestration_seconds is a hard budget shared by all three stages
+            deadline = asyncio.get_running_loop().time() + self.config.timeouts.total_orchestration_seconds
+
+            # 0. Sanitize
+            clean_query = self.validate_and_sanitize(user_query)
+            clean_history = self.sanitize_history(history)
+            agents = self.router.select(clean_query, self.agents)
+
+            # 1. Broadcast
+            with STAGE_SECONDS.time(stage="broadcast"):
+                responses = await self.broadcast_query(clean_query, deadline=deadline, agents=agents, budgets=budgets, history=clean_history)
+
+            # 2. Critique
+            with STAGE_SECONDS.time(stage="critique"):
+                critiques = await self.run_critique_round(responses, deadline=deadline, agents=agents, budgets=budgets)
+
+            # 3. Synthesize
+            print("Synthesizing final answer...")
+            # Pass user_query to synthesize
+            with STAGE_SECONDS.time(stage="synthesize"):
+                final_result = await self.synthesize_within(clean_query, responses, critiques, deadline=deadline, budget=budgets.synthesis)
+            self.router.record_synthesis(responses, final_result["final_answer"])
+
+            return self._scrub_result(final_result)
+
+    async def process_many(self, queries: Sequence[str], concurrency: Optional[int] = None, profile: Optional[str] = None) -> AsyncIterator[Tuple[int, Any]]:
+        """
+        Runs many queries on one event loop and yields (index, result) in completion order;
+        a query that raised yields its exception instead of a result.
+
+        Every agent and Combiner call of every query goes through the same per-vendor slots
+        (`registry.slot`), so throughput is set by the vendor limits, not by the query order.
+        `concurrency` caps queries in flight (default: twice the per-vendor limit, enough to
+        keep each vendor busy while other queries critique or synthesize). Keep it modest:
+        time spent queueing for a slot counts against each query's orchestration deadline.
+        """
+        concurrency = concurrency or 2 * self.config.http.max_in_flight_per_vendor
+        pending = iter(enumerate(queries))
+        finished: "asyncio.Queue[Tuple[int, Any]]" = asyncio.Queue()
+
+        async def worker():
+            # Workers share one iterator, so each query is taken exactly once
+            for index, query in pending:
+                try:
+                    result = await self.process_query(query, profile=profile)
+                except Exception as e:
+                    result = e
+                await finished.put((index, result))
+
+        workers = [asyncio.ensure_future(worker()) for _ in range(min(concurrency, len(queries)))]
+        try:
+            for _ in range(len(queries)):
+                yield await finished.get()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    def _scrub_result(self, result: Dict[str, Any], audit: bool = True) -> Dict[str, Any]:
+        """Applies output redaction to the final answer when `redact_agent_output` is on."""
+        if not self.config.sanitization.redact_agent_output:
+            return result
+        return {**result, "final_answer": self.sanitizer.sanitize(result["final_answer"], source="synthesis", audit=audit)}
+
+    async def process_query_stream(self, user_query: str, profile: Optional[str] = None, history: Optional[List[Dict[str, str]]] = None) -> AsyncIterator[OrchestrationEvent]:
+        """
+        Same pipeline as `process_query`, but yields typed events as soon as they are available:
+        one AgentAnsweredEvent per agent (completion order), one CritiqueEvent per critic,
+        SynthesisTokenEvents while the Combiner streams, and a closing FinalResultEvent.
+        """
+        events = self._pinned()._process_query_stream(user_query, profile, history)
+        try:
+            async for event in events:
+                yield event
+        finally:
+            await events.aclose()
+
+    async def _process_query_stream(self, user_query: str, profile: Optional[str] = None, history: Optional[List[Dict[str, str]]] = None) -> AsyncIterator[OrchestrationEvent]:
+        budgets = self.config.budgets.profile(profile)
+        stream_start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.config.timeouts.total_orchestration_seconds
 
-    async def process_query(self, user_query: str) -> Dict[str, Any]:
-        # 0. Sanitize
         clean_query = self.validate_and_sanitize(user_query)
-        
-        # 1. Broadcast
-        responses = await self.broadcast_query(clean_query)
-        
-        # 2. Critique
-        critiques = await self.run_critique_round(responses)
-        
-        # 3. Synthesize
+        clean_history = self.sanitize_history(history)
+        agents = self.router.select(clean_query, self.agents)
+
+        # Stage timings include time the consumer spends between events
+        results: Dict[str, AgentResponse] = {}
+        with STAGE_SECONDS.time(stage="broadcast"):
+            async for response in self._iter_broadcast(clean_query, deadline, agents, budgets, clean_history):
+                results[response.name] = response
+                yield AgentAnsweredEvent(response=response)
+        responses = [results[agent.name] for agent in agents]
+
+        critiques: Dict[str, str] = {}
+        with STAGE_SECONDS.time(stage="critique"):
+            async for name, critique in self._iter_critiques(responses, deadline, agents, budgets):
+                critiques[name] = critique
+                yield CritiqueEvent(name=name, critique=critique)
+        ordered_critiques = [critiques[agent.name] for agent in agents]
+
         print("Synthesizing final answer...")
-        # Pass user_query to synthesize
-        final_result = await self.combiner.synthesize(user_query, responses, critiques)
-        
-        return final_result
+        synthesis = self.combiner.synthesize_stream(clean_query, responses, ordered_critiques, budgets.synthesis)
+        redactor = self.sanitizer.stream("synthesis") if self.config.sanitization.redact_agent_output else None
+        synthesis_start = time.perf_counter()
+        try:
+            while True:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError()
+                with call_deadline(deadline):
+                    event = await asyncio.wait_for(synthesis.__anext__(), timeout=remaining)
+                if isinstance(event, SynthesisTokenEvent) and redactor is not None:
+                    # Held-back text is released by later chunks or by flush() below
+                    token = redactor.feed(event.token)
+                    if token:
+                        yield SynthesisTokenEvent(token=token)
+                    continue
+                if isinstance(event, FinalResultEvent):
+                    if redactor is not None:
+                        tail = redactor.flush()
+                        if tail:
+                            yield SynthesisTokenEvent(token=tail)
+                    self.router.record_synthesis(responses, event.result["final_answer"])
+                    yield FinalResultEvent(result=self._scrub_result(event.result, audit=False))
+                    break
+                yield event
+        except StopAsyncIteration:
+            pass
+        except asyncio.TimeoutError:
+            print("xx Synthesis exceeded the orchestration budget, using heuristic fallback")
+            AGENT_TIMEOUTS.inc(agent="Combiner", stage="synthesize")
+            yield FinalResultEvent(result=self._scrub_result(self.combiner.fallback_result(responses)))
+        finally:
+            await synthesis.aclose()
+            now = time.perf_counter()
+            STAGE_SECONDS.observe(now - synthesis_start, stage="synthesize")
+            STAGE_SECONDS.observe(now - stream_start, stage="total")
@@ -0,0 +1,252 @@
+import asyncio
+import random
+import sys
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Deque, Dict, Optional, TypeVar
+from src.config import ResilienceConfig
+from src.clients import registry
+from src.metrics import metrics
+
+T = TypeVar("T")
+
+RETRIES = metrics.counter(
+    "orchestrator_retries_total", "Retried LLM calls after a 429, 5xx, timeout or connection error.", ("vendor",))
+HEDGES = metrics.counter(
+    "orchestrator_hedged_requests_total",
+    "Duplicate requests for slow calls, by which copy won (or 'skipped': the vendor had no free slot).", ("vendor", "winner"))
+BREAKER_STATE = metrics.gauge(
+    "orchestrator_circuit_state", "Circuit breaker state per vendor (0 closed, 1 half-open, 2 open).", ("vendor",))
+BREAKER_REJECTIONS = metrics.counter(
+    "orchestrator_circuit_rejections_total", "Calls failed fast because the vendor's circuit was open.", ("vendor",))
+
+# Cancellations this close to the caller's deadline count as the call timing out
+DEADLINE_SLACK_SECONDS = 0.05
+
+# Loop time by which the caller needs the result of calls made in this context (see `deadline`)
+_deadline: ContextVar[Optional[float]] = ContextVar("resilience_deadline", default=None)
+
+@contextmanager
+def deadline(loop_time: Optional[float]):
+    """
+    Marks calls started inside the block (including tasks created in it) as due by
+    `loop_time`. A call the caller cancels at its deadline counts as a failure towards
+    the vendor's circuit breaker, like a timeout: phase deadlines are shorter than the
+    HTTP timeout, so a hung vendor would otherwise never open its circuit.
+    """
+    token = _deadline.set(loop_time)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+class HedgeSkipped(Exception):
+    """The duplicate request was not sent: the vendor (or the global cap) had no free slot."""
+
+class CircuitOpenError(Exception):
+    def __init__(self, vendor: str, retry_in: float):
+        super().__init__(f"{vendor} circuit open; next trial in {retry_in:.1f}s")
+        self.vendor = vendor
+        self.retry_in = retry_in
+
+def is_retryable(exc: BaseException) -> bool:
+    """429s, 5xx, timeouts and connection errors are worth another attempt; 4xx client errors are not."""
+    if isinstance(exc, (asyncio.TimeoutError, ConnectionError)):
+        return True
+    # Only look at openai if something already imported it (it is loaded lazily)
+    openai = sys.modules.get("openai")
+    if openai is not None and isinstance(exc, openai.APIConnectionError):  # includes APITimeoutError
+        return True
+    # OpenAI-style `status_code`, google.api_core-style integer `code`
+    status = getattr(exc, "status_code", None)
+    if not isinstance(status, int):
+        status = getattr(exc, "code", None)
+    return isinstance(status, int) and (status == 429 or status >= 500)
+
+def retry_after(exc: BaseException) -> Optional[float]:
+    """Seconds from a Retry-After header, when the provider sent one."""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    value = headers.get("retry-after") if headers is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+class CircuitBreaker:
+    """
+    Opens after `threshold` consecutive failed calls; while open every call fails fast.
+    After `reset_seconds` a single trial call is let through (half-open): success closes
+    the circuit, failure opens it again.
+    """
+    CLOSED, HALF_OPEN, OPEN = 0, 1, 2
+
+    def __init__(self, vendor: str, threshold: int, reset_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.vendor = vendor
+        self.threshold = threshold
+        self.reset_seconds = reset_seconds
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+
+    def _set_state(self, state: int):
+        self.state = state
+        BREAKER_STATE.set(state, vendor=self.vendor)
+
+    def before_call(self):
+        if self.state == self.OPEN:
+            waited = self.clock() - self.opened_at
+            if waited < self.reset_seconds:
+                BREAKER_REJECTIONS.inc(vendor=self.vendor)
+                raise CircuitOpenError(self.vendor, self.reset_seconds - waited)
+            self._set_state(self.HALF_OPEN)
+        if self.state == self.HALF_OPEN:
+            if self.trial_in_flight:
+                BREAKER_REJECTIONS.inc(vendor=self.vendor)
+                raise CircuitOpenError(self.vendor, 0.0)
+            self.trial_in_flight = True
+
+    def record_success(self):
+        self.failures = 0
+        self.trial_in_flight = False
+        if self.state != self.CLOSED:
+            print(f"Circuit for {self.vendor} closed")
+            self._set_state(self.CLOSED)
+
+    def record_failure(self):
+        self.failures += 1
+        self.trial_in_flight = False
+        if self.state == self.HALF_OPEN or self.failures >= self.threshold:
+            if self.state != self.OPEN:
+                print(f"xx Circuit for {self.vendor} opened after {self.failures} failures")
+            self.opened_at = self.clock()
+            self._set_state(self.OPEN)
+
+    def release(self):
+        """A call ended without a verdict (cancelled or a non-retryable error)."""
+        self.trial_in_flight = False
+
+class Resilience:
+    """
+    Per-vendor retry, hedging and circuit breaking around one LLM call.
+    `call(vendor, fn)` runs `fn()` (a fresh coroutine per attempt):
+    - retryable errors are retried up to `max_retries` times with full-jitter
+      exponential backoff (or the provider's Retry-After, if longer)
+    - once an attempt outlives the vendor's `hedge_percentile` latency, one duplicate
+      is launched and whichever answers first wins; the duplicate takes its own
+      `registry` slot and is skipped when none is free, so hedging never exceeds the
+      per-vendor or global in-flight caps
+    - calls that still fail, or that are cancelled at the caller's `deadline`, count
+      towards the vendor's circuit breaker
+    """
+
+    def __init__(self, config: Optional[ResilienceConfig] = None, rng: Optional[random.Random] = None):
+        self.config = config or ResilienceConfig()
+        self.rng = rng or random.Random()
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.latencies: Dict[str, Deque[float]] = {}
+
+    def configure(self, config: ResilienceConfig):
+        self.config = config
+        for breaker in self.breakers.values():
+            breaker.threshold = config.breaker_failure_threshold
+            breaker.reset_seconds = config.breaker_reset_seconds
+
+    def breaker(self, vendor: str) -> CircuitBreaker:
+        if vendor not in self.breakers:
+            self.breakers[vendor] = CircuitBreaker(vendor, self.config.breaker_failure_threshold, self.config.breaker_reset_seconds)
+        return self.breakers[vendor]
+
+    def backoff(self, attempt: int, exc: BaseException) -> float:
+        cap = min(self.config.backoff_max_seconds, self.config.backoff_base_seconds * 2 ** attempt)
+        delay = self.rng.uniform(0, cap)
+        hinted = retry_after(exc)
+        if hinted is not None:
+            delay = max(delay, min(hinted, self.config.backoff_max_seconds))
+        return delay
+
+    def hedge_delay(self, vendor: str) -> Optional[float]:
+        samples = self.latencies.get(vendor)
+        if self.config.hedge_percentile is None or not samples or len(samples) < self.config.hedge_min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(self.config.hedge_percentile * len(ordered)))]
+
+    def _record_latency(self, vendor: str, seconds: float):
+        if vendor not in self.latencies:
+            self.latencies[vendor] = deque(maxlen=self.config.latency_window)
+        self.latencies[vendor].append(seconds)
+
+    async def _hedge(self, vendor: str, fn: Callable[[], Awaitable[T]]) -> T:
+        async with registry.try_slot(vendor) as acquired:
+            if not acquired:
+                raise HedgeSkipped()
+            return await fn()
+
+    async def _attempt(self, vendor: str, fn: Callable[[], Awaitable[T]], hedge: bool) -> T:
+        delay = self.hedge_delay(vendor) if hedge else None
+        start = time.perf_counter()
+        primary = asyncio.ensure_future(fn())
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            hedged = not done
+            if hedged:
+                tasks.add(asyncio.ensure_future(self._hedge(vendor, fn)))
+            error: Optional[BaseException] = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if isinstance(task.exception(), HedgeSkipped):
+                        HEDGES.inc(vendor=vendor, winner="skipped")
+                        hedged = False
+                        continue
+                    if task.exception() is None:
+                        if hedged:
+                            HEDGES.inc(vendor=vendor, winner="primary" if task is primary else "hedge")
+                        self._record_latency(vendor, time.perf_counter() - start)
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def call(self, vendor: str, fn: Callable[[], Awaitable[T]], hedge: bool = True) -> T:
+        breaker = self.breaker(vendor)
+        breaker.before_call()
+        attempt = 0
+        try:
+            while True:
+                try:
+                    result = await self._attempt(vendor, fn, hedge)
+                except Exception as e:
+                    if not is_retryable(e):
+                        breaker.release()
+                        raise
+                    if attempt >= self.config.max_retries or breaker.state == breaker.OPEN:
+                        breaker.record_failure()
+                        raise
+                    delay = self.backoff(attempt, e)
+                    attempt += 1
+                    RETRIES.inc(vendor=vendor)
+                    print(f"Retrying {vendor} in {delay:.2f}s (attempt {attempt + 1}) after: {e}")
+                    await asyncio.sleep(delay)
+                    continue
+                breaker.record_success()
+                return result
+        except asyncio.CancelledError:
+            due = _deadline.get()
+            if due is not None and asyncio.get_running_loop().time() >= due - DEADLINE_SLACK_SECONDS:
+                # Still running when the caller's deadline hit: the vendor is hanging
+                breaker.record_failure()
+            else:
+                breaker.release()
+            raise
+
+resilience = Resilience()
@@ -0,0 +1,151 @@
+import random
+import re
+from collections import deque
+from typing import Deque, Dict, List, Optional
+from src.config import RoutingConfig, AgentConfig
+from src.agents.base import BaseAgent, AgentResponse
+
+_WORD = re.compile(r"[a-zA-Z]{4,}")
+_HARD_CUES = ("compare", "why", "explain", "analy", "trade-off", "tradeoff", "step by step",
+              "design", "prove", "debug", "evaluate", "pros and cons", "versus", " vs ")
+
+def query_complexity(query: str) -> float:
+    """Cheap 0..1 difficulty estimate from length, number of questions and reasoning cues."""
+    text = query.lower()
+    length = min(len(text.split()) / 40, 1.0)
+    questions = min(text.count("?") / 3, 1.0)
+    cues = min(sum(cue in text for cue in _HARD_CUES) / 2, 1.0)
+    return round(0.5 * length + 0.2 * questions + 0.3 * cues, 3)
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+class AgentStats:
+    """Rolling window of one agent's recent calls."""
+
+    def __init__(self, window: int):
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.failures: Deque[bool] = deque(maxlen=window)
+        self.confidences: Deque[float] = deque(maxlen=window)
+        self.survived: Deque[bool] = deque(maxlen=window)
+
+    @property
+    def samples(self) -> int:
+        return len(self.failures)
+
+    def latency(self, q: float) -> Optional[float]:
+        return _percentile(list(self.latencies), q) if self.latencies else None
+
+    @property
+    def failure_rate(self) -> float:
+        return sum(self.failures) / len(self.failures) if self.failures else 0.0
+
+    @property
+    def mean_confidence(self) -> float:
+        return sum(self.confidences) / len(self.confidences) if self.confidences else 1.0
+
+    @property
+    def survival_rate(self) -> float:
+        return sum(self.survived) / len(self.survived) if self.survived else 1.0
+
+    @property
+    def score(self) -> float:
+        # Unknown agents score optimistically so they get tried
+        return self.mean_confidence * self.survival_rate * (1.0 - self.failure_rate)
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        return {
+            "samples": self.samples,
+            "p50": self.latency(0.5),
+            "p95": self.latency(0.95),
+            "failure_rate": round(self.failure_rate, 3),
+            "mean_confidence": round(self.mean_confidence, 3),
+            "survival_rate": round(self.survival_rate, 3),
+            "score": round(self.score, 3),
+        }
+
+class AgentRouter:
+    """
+    Picks which agents to fan out to for a query, from rolling per-agent statistics:
+    latency percentiles, failure rate, mean confidence and how often an agent's answer
+    survives into the synthesis. Easy queries get `min_agents`, hard ones up to
+    `max_agents`, within the latency and cost budgets; with probability
+    `exploration_rate` one pick is swapped for a random other agent to keep stats fresh.
+    """
+
+    def __init__(self, config: RoutingConfig, agent_configs: List[AgentConfig], rng: Optional[random.Random] = None):
+        self.config = config
+        self.costs = {a.name: a.cost for a in agent_configs}
+        self.stats: Dict[str, AgentStats] = {}
+        self.rng = rng or random.Random()
+
+    def configure(self, config: RoutingConfig, agent_configs: List[AgentConfig]):
+        """Applies reloaded settings; collected statistics are kept."""
+        self.config = config
+        self.costs = {a.name: a.cost for a in agent_configs}
+
+    def _stats(self, name: str) -> AgentStats:
+        if name not in self.stats:
+            self.stats[name] = AgentStats(self.config.window)
+        return self.stats[name]
+
+    def select(self, query: str, agents: List[BaseAgent]) -> List[BaseAgent]:
+        if not self.config.enabled or len(agents) <= self.config.min_agents:
+            return list(agents)
+
+        span = self.config.max_agents - self.config.min_agents
+        k = min(len(agents), self.config.min_agents + round(query_complexity(query) * span))
+
+        def within_latency(agent: BaseAgent) -> bool:
+            stats = self._stats(agent.name)
+            p95 = stats.latency(0.95)
+            return stats.samples < self.config.min_samples or p95 is None or p95 <= self.config.latency_budget_seconds
+
+        ranked = sorted(agents, key=lambda a: self._stats(a.name).score, reverse=True)
+        chosen: List[BaseAgent] = []
+        cost = 0.0
+        for agent in [a for a in ranked if within_latency(a)] + [a for a in ranked if not within_latency(a)]:
+            if len(chosen) >= k:
+                break
+            agent_cost = self.costs.get(agent.name, 1.0)
+            if len(chosen) >= self.config.min_agents and cost + agent_cost > self.config.cost_budget:
+                continue
+            chosen.append(agent)
+            cost += agent_cost
+
+        rest = [a for a in agents if a not in chosen]
+        if rest and self.rng.random() < self.config.exploration_rate:
+            chosen[-1] = self.rng.choice(rest)
+
+        # Keep the configured agent order for display and critiques
+        return [a for a in agents if a in chosen]
+
+    def record_answer(self, name: str, latency: float, response: AgentResponse):
+        stats = self._stats(name)
+        stats.latencies.append(latency)
+        stats.failures.append(response.confidence <= 0)
+        if response.confidence > 0:
+            stats.confidences.append(response.confidence)
+
+    def record_failure(self, name: str, latency: float):
+        stats = self._stats(name)
+        stats.latencies.append(latency)
+        stats.failures.append(True)
+
+    def record_cancelled(self, name: str, latency: float):
+        """Cut off once the quorum answered: slow, but not a failure. Latency is a lower bound."""
+        self._stats(name).latencies.append(latency)
+
+    def record_synthesis(self, responses: List[AgentResponse], final_answer: str):
+        """An answer "survives" when enough of its content words reappear in the final answer."""
+        final_words = {w.lower() for w in _WORD.findall(final_answer)}
+        for r in responses:
+            if r.confidence <= 0:
+                continue
+            words = {w.lower() for w in _WORD.findall(r.answer)}
+            overlap = len(words & final_words) / len(words) if words else 0.0
+            self._stats(r.name).survived.append(overlap >= self.config.survival_overlap)
+
+    def summary(self) -> Dict[str, Dict[str, Optional[float]]]:
+        return {name: stats.summary() for name, stats in self.stats.items()}
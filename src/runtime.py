@@ -0,0 +1,101 @@
+import asyncio
+import concurrent.futures
+import queue
+import threading
+from typing import Any, AsyncIterator, Coroutine, Iterator, Optional, TypeVar
+from src.clients import registry
+
+T = TypeVar("T")
+
+_DONE = object()
+
+class OrchestratorRuntime:
+    """
+    One long-lived event loop on a daemon thread, shared by every request of the process.
+    Synchronous callers (Streamlit reruns) hand coroutines to it instead of calling
+    asyncio.run per message, so loop-bound state (pooled HTTP clients, vendor slots,
+    resilience latency windows) survives across turns and background tasks can
+    outlive the rerun that started them.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run_loop, name="orchestrator-loop", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.call_soon(self._ready.set)
+        self.loop.run_forever()
+
+    @property
+    def running(self) -> bool:
+        return self._thread.is_alive() and not self.loop.is_closed()
+
+    def submit(self, coro: Coroutine[Any, Any, T]) -> "concurrent.futures.Future[T]":
+        """Schedules `coro` on the runtime loop; the returned future can be polled, awaited on with result(), or cancelled."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Coroutine[Any, Any, T], timeout: Optional[float] = None) -> T:
+        """Blocks the calling thread until `coro` finishes on the runtime loop."""
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            # Timed out, or the caller was interrupted (e.g. a Streamlit rerun)
+            future.cancel()
+            raise
+
+    def stream(self, events: AsyncIterator[T]) -> Iterator[T]:
+        """
+        Iterates an async iterator on the runtime loop and hands its items to the calling
+        thread as they arrive. Closing the generator (or leaving a `with closing(...)`
+        block early) cancels the producer on the loop.
+        """
+        items: "queue.Queue" = queue.Queue()
+
+        async def pump():
+            try:
+                async for item in events:
+                    items.put(item)
+            except BaseException as e:
+                items.put(e)
+                if isinstance(e, asyncio.CancelledError):
+                    raise
+            finally:
+                items.put(_DONE)
+
+        future = self.submit(pump())
+        try:
+            while True:
+                item = items.get()
+                if item is _DONE:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            future.cancel()
+
+    def close(self, timeout: float = 5.0):
+        """Cancels outstanding work, closes pooled clients owned by the loop and stops the thread."""
+        if not self.running:
+            return
+
+        async def shutdown():
+            tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await registry.aclose()
+
+        try:
+            self.submit(shutdown()).result(timeout)
+        except Exception as e:
+            print(f"Runtime shutdown did not finish cleanly: {e}")
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout)
+        if not self._thread.is_alive():
+            self.loop.close()
@@ -1,31 +1,210 @@
+import logging
 import re
-from typing import Optional
+import time
+from collections import Counter, deque
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Pattern, Tuple
+from pydantic import BaseModel
 from src.config import SanitizationConfig
 
+logger = logging.getLogger(__name__)
+
+# Capitalized words that commonly follow "I am" / "I'm" without being a name
+# ("I'm Sorry", "I am Not Sure"). Those cues only redact a word outside this set.
+SELF_INTRO_STOPWORDS = (
+    "Able", "About", "Afraid", "Again", "All", "Almost", "Also", "Always", "Angry", "Asking", "Available", "Away",
+    "Back", "Being", "Better", "Bored", "Busy", "Certain", "Coming", "Confused", "Curious", "Doing", "Done", "Down",
+    "Excited", "Feeling", "Fine", "From", "Getting", "Glad", "Going", "Good", "Happy", "Having", "Here", "Home",
+    "Hungry", "Interested", "Just", "Late", "Learning", "Looking", "Lost", "New", "Not", "Now", "Okay", "Only",
+    "Out", "Over", "Planning", "Pretty", "Ready", "Really", "Right", "Sad", "Still", "Sick", "So", "Sorry", "Stuck",
+    "Sure", "Thinking", "Tired", "Totally", "Trying", "Unable", "Unsure", "Using", "Very", "Well", "Working",
+    "Worried", "Writing", "Wrong",
+)
+
+# Category -> (pattern, replacement). Order matters: at a given position the first
+# category that matches wins, so more specific patterns come first.
+# Every pattern is length-bounded so the streaming mode knows how much text to hold back.
+PII_PATTERNS: Dict[str, Tuple[str, str]] = {
+    "email": (r"[a-zA-Z0-9._%+-]{1,64}@[a-zA-Z0-9.-]{1,120}\.[a-zA-Z]{2,24}", "[EMAIL REDACTED]"),
+    "gps": (r"[-+]?(?:90(?:\.0{3,8})?|[1-8]?\d\.\d{3,8})\s{0,2},\s{0,2}[-+]?(?:180(?:\.0{3,8})?|(?:1[0-7]\d|[1-9]?\d)\.\d{3,8})", "[GPS REDACTED]"),
+    "id_number": (r"\b(?:\d{3}-\d{2}-\d{4}|(?:\d{4}[ -]?){3}\d{4}|[A-Z]{1,2}\d{6,9})\b", "[ID REDACTED]"),
+    "phone": (r"(?:\+\d{1,3}[\s.-]?)?\b\(?\d{3}\)?[\s.-]?\d{3}[-.]?\d{4}\b", "[PHONE REDACTED]"),
+    # Only names introduced by a cue are redacted; the cue itself is kept.
+    "name": (r"\b(?:(?:[Mm]y name is|Mr\.?|Mrs\.?|Ms\.?|Dr\.?)\s{1,3}|(?:I am|I'm)\s{1,3}(?!(?:"
+             + "|".join(SELF_INTRO_STOPWORDS)
+             + r")\b))(?P<name_value>[A-Z][a-z]{1,20}(?:\s[A-Z][a-z]{1,20}){0,2})", "[NAME REDACTED]"),
+}
+
+# Upper bound on the length of any single match (see the bounded quantifiers above)
+MAX_MATCH_LENGTH = 256
+
+# Every match of the patterns above contains one of these: an "@", a digit, or a name cue.
+# Scanning for triggers is far cheaper than trying the full alternation at every position,
+# so the full pattern only runs in small windows around each trigger.
+# A window opens TRIGGER_LOOKBEHIND characters before its trigger (the longest email local
+# part; the same for every trigger so windows open in order) and closes at the furthest a
+# match can reach after it:
+#   "@"   -> an email (120 + 24 char domain)
+#   digit -> GPS / ID / phone, all under 32 chars (digits inside an email fall in its "@" window)
+#   cue   -> a name following the cue
+TRIGGER_PATTERN = re.compile(r"[@\d]|[Mm]y name is|I am|I'm|M[rs]|Mrs|Dr")
+TRIGGER_LOOKBEHIND = 65
+TRIGGER_REACH = {"@": 147, "digit": 32, "cue": 80}
+
+def _reach(trigger: "re.Match") -> int:
+    first = trigger.group()[0]
+    if first == "@":
+        return TRIGGER_REACH["@"]
+    return TRIGGER_REACH["digit"] if first.isdigit() else TRIGGER_REACH["cue"]
+
+@lru_cache(maxsize=None)
+def compile_patterns(categories: Tuple[str, ...]) -> Pattern:
+    """Compiles the selected categories into one alternation (once per process per category set)."""
+    return re.compile("|".join(f"(?P<{name}>{PII_PATTERNS[name][0]})" for name in categories))
+
+def iter_matches(pattern: Pattern, text: str, start: int = 0) -> Iterator["re.Match"]:
+    """
+    Yields the same matches as `pattern.finditer(text, start)`, but only runs the pattern
+    inside windows around trigger positions (merged when they overlap).
+    """
+    position = start
+    window_start = window_end = None
+    for trigger in TRIGGER_PATTERN.finditer(text, start):
+        lo = max(start, trigger.start() - TRIGGER_LOOKBEHIND)
+        hi = trigger.start() + _reach(trigger) + 1  # +1 so a trailing \b sees the next character
+        if window_end is not None and lo <= window_end:
+            window_end = max(window_end, hi)
+            continue
+        if window_end is not None:
+            for match in pattern.finditer(text, max(window_start, position), window_end):
+                position = match.end()
+                yield match
+        window_start, window_end = lo, hi
+    if window_end is not None:
+        for match in pattern.finditer(text, max(window_start, position), window_end):
+            yield match
+
+class RedactionRecord(BaseModel):
+    """Audit entry for one redaction decision. Never contains the redacted text itself."""
+    timestamp: float
+    source: str
+    counts: Dict[str, int]
+    chars: int
+
 class Sanitizer:
     def __init__(self, config: SanitizationConfig):
         self.config = config
-        # Simple regex patterns for demo purposes
-        self.email_pattern = r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}'
-        self.phone_pattern = r'\b\d{3}[-.]?\d{3}[-.]?\d{4}\b'
+        self.categories = tuple(c for c in PII_PATTERNS if c in config.categories)
+        self.pattern = compile_patterns(self.categories)
+        self.audit_log: "deque[RedactionRecord]" = deque(maxlen=config.audit_log_size)
 
-    def sanitize(self, text: str) -> str:
+    def sanitize(self, text: str, source: str = "query", audit: bool = True) -> str:
         """
-        Redacts PII from the text if enabled in config.
+        Redacts PII from the text if enabled in config, in a single pass over all categories.
+        Each redaction is recorded in `audit_log` (counts per category, never the text).
         """
         if not self.config.redact_user_pii:
             return text
 
-        redacted_text = text
-        
-        # Redact Emails
-        redacted_text = re.sub(self.email_pattern, "[EMAIL REDACTED]", redacted_text)
-        
-        # Redact Phone Numbers (US format)
-        redacted_text = re.sub(self.phone_pattern, "[PHONE REDACTED]", redacted_text)
-        
-        if redacted_text != text:
-            print(f"🔒 PII Redacted from query.")
-            
+        counts: Counter = Counter()
+        redacted_text = self._redact(text, counts)
+        if audit:
+            self._audit(source, counts, len(text))
         return redacted_text
 
+    def stream(self, source: str = "stream") -> "RedactionStream":
+        """Returns a chunked redactor for streamed text (see RedactionStream)."""
+        return RedactionStream(self, source)
+
+    def _redact(self, text: str, counts: Counter, start: int = 0) -> str:
+        """Redacts text[start:]; characters before `start` only serve as context for \\b."""
+        out: List[str] = []
+        position = start
+        for match in iter_matches(self.pattern, text, start):
+            out.append(text[position:match.start()])
+            out.append(self._replace(match, counts))
+            position = match.end()
+        if not out:
+            return text[start:]
+        out.append(text[position:])
+        return "".join(out)
+
+    def _replace(self, match: "re.Match", counts: Counter) -> str:
+        category = match.lastgroup
+        counts[category] += 1
+        replacement = PII_PATTERNS[category][1]
+        if category == "name":
+            # Keep the cue ("My name is", "Dr.") and replace only the name itself
+            return match.group(0)[:match.start("name_value") - match.start()] + replacement
+        return replacement
+
+    def _audit(self, source: str, counts: Counter, chars: int):
+        if not counts:
+            return
+        record = RedactionRecord(timestamp=time.time(), source=source, counts=dict(counts), chars=chars)
+        self.audit_log.append(record)
+        logger.info("PII redacted from %s: %s", source, record.counts)
+
+class RedactionStream:
+    """
+    Incremental redactor. `feed` returns the part of the stream that is safe to emit;
+    up to MAX_MATCH_LENGTH characters are held back so a match split across chunk
+    boundaries is still redacted as a whole. Call `flush` at the end of the stream.
+    """
+
+    def __init__(self, sanitizer: Sanitizer, source: str):
+        self.sanitizer = sanitizer
+        self.source = source
+        # The buffer starts with one already-emitted character (once there is one),
+        # kept so word boundaries at the start of the pending text match whole-text behaviour
+        self._buffer = ""
+        self._context = 0
+        self._counts: Counter = Counter()
+        self._chars = 0
+
+    def feed(self, chunk: str) -> str:
+        if not self.sanitizer.config.redact_user_pii:
+            return chunk
+        self._buffer += chunk
+        self._chars += len(chunk)
+        cut = len(self._buffer) - MAX_MATCH_LENGTH
+        if cut <= self._context:
+            return ""
+
+        out: List[str] = []
+        position = self._context
+        for match in iter_matches(self.sanitizer.pattern, self._buffer, self._context):
+            if match.start() >= cut:
+                break
+            if match.end() > cut:
+                # Straddles the emit boundary: hold it back whole until more text arrives
+                cut = match.start()
+                break
+            out.append(self._buffer[position:match.start()])
+            out.append(self.sanitizer._replace(match, self._counts))
+            position = match.end()
+        out.append(self._buffer[position:cut])
+        if cut > 0:
+            self._buffer = self._buffer[cut - 1:]
+            self._context = 1
+        return "".join(out)
+
+    def flush(self) -> str:
+        if not self.sanitizer.config.redact_user_pii:
+            return ""
+        tail = self.sanitizer._redact(self._buffer, self._counts, self._context)
+        self._buffer = ""
+        self._context = 0
+        self.sanitizer._audit(self.source, self._counts, self._chars)
+        self._counts = Counter()
+        return tail
+
+    def redact_all(self, chunks: Iterable[str]) -> Iterable[str]:
+        """Convenience generator: yields the redacted stream for an iterable of chunks."""
+        for chunk in chunks:
+            out = self.feed(chunk)
+            if out:
+                yield out
+        tail = self.flush()
+        if tail:
+            yield tail
@@ -0,0 +1,290 @@
+"""
+Standalone orchestration service: MultiAgentOrchestrator behind a plain ASGI app,
+so orchestration can scale out separately from the Streamlit UI.
+
+    python -m src.service --workers 4 --port 8080 [--real]
+    ORCHESTRATOR_URL=http://127.0.0.1:8080 streamlit run app.py
+
+    POST /v1/query          {"query": "...", "profile": "fast", "history": [...]}  -> orchestration result (JSON)
+    POST /v1/query/stream   same body -> server-sent events, one per OrchestrationEvent
+                            ("event: agent_answer|critique|synthesis_token|final|error")
+    GET  /healthz           process is up
+    GET  /readyz            orchestrator built and not shutting down (503 otherwise)
+    GET  /metrics           this worker's Prometheus metrics
+
+"history" (optional) is the conversation context for follow-ups, as chat messages
+({"role": "system"|"user"|"assistant", "content": "..."}); see src.context.
+
+When ORCHESTRATOR_API_TOKEN is set, /v1 routes require "Authorization: Bearer <token>".
+Workers are separate processes, so each holds its own orchestrator, in-memory cache
+tier, router statistics and metrics; the disk cache is shared.
+"""
+import argparse
+import asyncio
+import hmac
+import json
+import os
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+from src.config import load_config
+from src.orchestrator import MultiAgentOrchestrator
+from src.clients import registry
+from src.resilience import resilience
+from src.metrics import metrics
+from src.startup import startup
+
+try:
+    import uvicorn
+except ImportError:
+    uvicorn = None
+
+Scope = Dict[str, Any]
+Receive = Callable[[], Awaitable[Dict[str, Any]]]
+Send = Callable[[Dict[str, Any]], Awaitable[None]]
+
+HTTP_REQUESTS = metrics.counter(
+    "orchestrator_http_requests_total", "Requests served by the orchestration service.", ("route", "status"))
+IN_FLIGHT = metrics.gauge(
+    "orchestrator_http_in_flight", "Orchestration requests currently being processed by this worker.")
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+HISTORY_ROLES = ("system", "user", "assistant")
+
+def _sse(event: str, data: str) -> bytes:
+    return f"event: {event}\ndata: {data}\n\n".encode("utf-8")
+
+class OrchestrationService:
+    """ASGI application; the orchestrator is built at lifespan startup (or on the first request)."""
+
+    ROUTES = {
+        "/healthz": ("GET", "_healthz"),
+        "/readyz": ("GET", "_readyz"),
+        "/metrics": ("GET", "_metrics"),
+        "/v1/query": ("POST", "_query"),
+        "/v1/query/stream": ("POST", "_query_stream"),
+    }
+
+    def __init__(self, config_path: Optional[str] = None, use_real_agents: Optional[bool] = None):
+        self.config_path = config_path or os.getenv("ORCHESTRATOR_CONFIG", "orchestrator_config.yaml")
+        self.use_real_agents = use_real_agents if use_real_agents is not None else os.getenv("ORCHESTRATOR_REAL_AGENTS") == "1"
+        self.api_token = os.getenv("ORCHESTRATOR_API_TOKEN")
+        self.orchestrator: Optional[MultiAgentOrchestrator] = None
+        self.draining = False
+        self.in_flight = 0
+
+    def startup(self):
+        if self.orchestrator is None:
+            with startup.stage("orchestrator"):
+                self.orchestrator = MultiAgentOrchestrator(load_config(self.config_path), use_real_agents=self.use_real_agents)
+            self.orchestrator.watch_config(self.config_path)
+
+    async def shutdown(self):
+        self.draining = True
+        if self.orchestrator is not None:
+            self.orchestrator.stop_watching_config()
+        await registry.aclose()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif scope["type"] == "http":
+            await self._http(scope, receive, send)
+
+    async def _lifespan(self, receive: Receive, send: Send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                try:
+                    self.startup()
+                except Exception as e:
+                    await send({"type": "lifespan.startup.failed", "message": str(e)})
+                    return
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.shutdown()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _http(self, scope: Scope, receive: Receive, send: Send):
+        path = scope["path"].rstrip("/") or "/"
+        route = self.ROUTES.get(path)
+        status = 500
+        try:
+            if route is None:
+                raise HTTPError(404, "Not found")
+            method, handler = route
+            if scope["method"] != method:
+                raise HTTPError(405, f"Use {method}")
+            if path.startswith("/v1/"):
+                self._authorize(scope)
+            status = await getattr(self, handler)(scope, receive, send)
+        except HTTPError as e:
+            status = e.status
+            await self._send_json(send, e.status, {"error": e.message})
+        except Exception as e:
+            print(f"xx Service error on {path}: {e}")
+            await self._send_json(send, 500, {"error": "Internal error"})
+        finally:
+            HTTP_REQUESTS.inc(route=path if route else "other", status=str(status))
+
+    def _authorize(self, scope: Scope):
+        if not self.api_token:
+            return
+        headers = dict(scope.get("headers") or [])
+        supplied = headers.get(b"authorization", b"").decode("latin-1")
+        if not hmac.compare_digest(supplied, f"Bearer {self.api_token}"):
+            raise HTTPError(401, "Missing or invalid bearer token")
+
+    async def _send_json(self, send: Send, status: int, payload: Any, headers: Optional[List[Tuple[bytes, bytes]]] = None):
+        body = json.dumps(payload, default=str).encode("utf-8")
+        await send({"type": "http.response.start", "status": status, "headers": [
+            (b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())] + (headers or [])})
+        await send({"type": "http.response.body", "body": body})
+
+    async def _read_json(self, receive: Receive) -> Dict[str, Any]:
+        limit = self.orchestrator.config.service.max_body_bytes
+        chunks, size = [], 0
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                raise HTTPError(400, "Client disconnected")
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > limit:
+                raise HTTPError(413, f"Body larger than {limit} bytes")
+            chunks.append(chunk)
+            if not message.get("more_body"):
+                break
+        try:
+            payload = json.loads(b"".join(chunks) or b"{}")
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            raise HTTPError(400, "Body must be JSON")
+        if not isinstance(payload, dict):
+            raise HTTPError(400, "Body must be a JSON object")
+        return payload
+
+    async def _query_args(self, receive: Receive) -> Tuple[str, Optional[str], Optional[List[Dict[str, str]]]]:
+        self.startup()
+        if self.draining:
+            raise HTTPError(503, "Shutting down")
+        payload = await self._read_json(receive)
+        query, profile = payload.get("query"), payload.get("profile")
+        if not isinstance(query, str) or not query.strip():
+            raise HTTPError(400, "'query' must be a non-empty string")
+        if len(query) > self.orchestrator.config.service.max_query_chars:
+            raise HTTPError(413, "Query too long")
+        if profile is not None and not isinstance(profile, str):
+            raise HTTPError(400, "'profile' must be a string")
+        history = payload.get("history")
+        if history is not None and not (isinstance(history, list) and all(
+                isinstance(m, dict) and m.get("role") in HISTORY_ROLES and isinstance(m.get("content"), str) for m in history)):
+            raise HTTPError(400, "'history' must be a list of {role, content} messages")
+        return query, profile, history
+
+    def _track(self, delta: int):
+        self.in_flight += delta
+        IN_FLIGHT.set(self.in_flight)
+
+    # --- Handlers (return the status code they sent) ---
+
+    async def _healthz(self, scope: Scope, receive: Receive, send: Send) -> int:
+        await self._send_json(send, 200, {"status": "ok"})
+        return 200
+
+    async def _readyz(self, scope: Scope, receive: Receive, send: Send) -> int:
+        ready = self.orchestrator is not None and not self.draining
+        open_circuits = sorted(v for v, b in resilience.breakers.items() if b.state == b.OPEN)
+        status = 200 if ready else 503
+        await self._send_json(send, status, {"ready": ready, "in_flight": self.in_flight, "open_circuits": open_circuits})
+        return status
+
+    async def _metrics(self, scope: Scope, receive: Receive, send: Send) -> int:
+        body = metrics.render().encode("utf-8")
+        await send({"type": "http.response.start", "status": 200, "headers": [
+            (b"content-type", b"text/plain; version=0.0.4; charset=utf-8"), (b"content-length", str(len(body)).encode())]})
+        await send({"type": "http.response.body", "body": body})
+        return 200
+
+    async def _query(self, scope: Scope, receive: Receive, send: Send) -> int:
+        query, profile, history = await self._query_args(receive)
+        self._track(1)
+        try:
+            result = await self.orchestrator.process_query(query, profile=profile, history=history)
+        finally:
+            self._track(-1)
+        await self._send_json(send, 200, result)
+        return 200
+
+    async def _query_stream(self, scope: Scope, receive: Receive, send: Send) -> int:
+        query, profile, history = await self._query_args(receive)
+        await send({"type": "http.response.start", "status": 200, "headers": [
+            (b"content-type", b"text/event-stream"), (b"cache-control", b"no-cache"), (b"x-accel-buffering", b"no")]})
+        self._track(1)
+        producer = asyncio.ensure_future(self._pump(self.orchestrator.process_query_stream(query, profile=profile, history=history), send))
+        # A client that goes away cancels its orchestration instead of leaving it running
+        watcher = asyncio.ensure_future(self._wait_disconnect(receive))
+        try:
+            done, _ = await asyncio.wait({producer, watcher}, return_when=asyncio.FIRST_COMPLETED)
+            if producer in done:
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+        finally:
+            for task in (producer, watcher):
+                task.cancel()
+            await asyncio.gather(producer, watcher, return_exceptions=True)
+            self._track(-1)
+        return 200
+
+    async def _wait_disconnect(self, receive: Receive):
+        while (await receive())["type"] != "http.disconnect":
+            pass
+
+    async def _pump(self, events: AsyncIterator, send: Send):
+        keepalive = self.orchestrator.config.service.sse_keepalive_seconds
+        next_event = asyncio.ensure_future(events.__anext__())
+        try:
+            while True:
+                done, _ = await asyncio.wait({next_event}, timeout=keepalive)
+                if not done:
+                    await send({"type": "http.response.body", "body": b": keepalive\n\n", "more_body": True})
+                    continue
+                try:
+                    event = next_event.result()
+                except StopAsyncIteration:
+                    break
+                await send({"type": "http.response.body", "body": _sse(event.type, event.model_dump_json()), "more_body": True})
+                next_event = asyncio.ensure_future(events.__anext__())
+        except Exception as e:
+            print(f"xx Streamed orchestration failed: {e}")
+            await send({"type": "http.response.body", "body": _sse("error", json.dumps({"error": str(e)})), "more_body": True})
+        finally:
+            next_event.cancel()
+            await asyncio.gather(next_event, return_exceptions=True)
+            await events.aclose()
+
+app = OrchestrationService()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--config", default=os.getenv("ORCHESTRATOR_CONFIG", "orchestrator_config.yaml"))
+    parser.add_argument("--host")
+    parser.add_argument("--port", type=int)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--real", action="store_true", help="use RealAgents (default: simulated)")
+    args = parser.parse_args()
+    if uvicorn is None:
+        raise SystemExit("uvicorn is required to run the service: pip install uvicorn")
+
+    service = load_config(args.config).service
+    # Worker processes import `app` afresh and read their settings from the environment
+    os.environ["ORCHESTRATOR_CONFIG"] = args.config
+    if args.real:
+        os.environ["ORCHESTRATOR_REAL_AGENTS"] = "1"
+    uvicorn.run("src.service:app", host=args.host or service.host, port=args.port or service.port,
+                workers=args.workers or service.workers, lifespan="on", timeout_graceful_shutdown=30)
+
+if __name__ == "__main__":
+    main()
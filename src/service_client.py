@@ -0,0 +1,61 @@
+import json
+from typing import Any, Dict, Iterator, List, Optional
+import requests
+from src.events import OrchestrationEvent, AgentAnsweredEvent, CritiqueEvent, SynthesisTokenEvent, FinalResultEvent
+
+EVENT_TYPES = {cls.model_fields["type"].default: cls
+               for cls in (AgentAnsweredEvent, CritiqueEvent, SynthesisTokenEvent, FinalResultEvent)}
+
+class ServiceError(Exception):
+    pass
+
+class ServiceClient:
+    """Blocking client for src.service, for callers without an event loop (the Streamlit app)."""
+
+    def __init__(self, base_url: str, api_token: Optional[str] = None, timeout: float = 120.0):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+        if api_token:
+            self.session.headers["Authorization"] = f"Bearer {api_token}"
+
+    def ready(self) -> bool:
+        try:
+            return self.session.get(f"{self.base_url}/readyz", timeout=5).status_code == 200
+        except requests.RequestException:
+            return False
+
+    def query(self, query: str, profile: Optional[str] = None, history: Optional[List[Dict[str, str]]] = None) -> Dict[str, Any]:
+        response = self.session.post(f"{self.base_url}/v1/query", json={"query": query, "profile": profile, "history": history},
+                                     timeout=self.timeout)
+        if response.status_code != 200:
+            raise ServiceError(f"Orchestration service returned {response.status_code}: {response.text[:200]}")
+        return response.json()
+
+    def stream(self, query: str, profile: Optional[str] = None, history: Optional[List[Dict[str, str]]] = None) -> Iterator[OrchestrationEvent]:
+        """
+        Yields the same typed events as MultiAgentOrchestrator.process_query_stream.
+        Closing the generator closes the connection, which cancels the orchestration server-side.
+        """
+        response = self.session.post(f"{self.base_url}/v1/query/stream", json={"query": query, "profile": profile, "history": history},
+                                     stream=True, timeout=self.timeout)
+        try:
+            if response.status_code != 200:
+                raise ServiceError(f"Orchestration service returned {response.status_code}: {response.text[:200]}")
+            event_type, data = None, []
+            for line in response.iter_lines(decode_unicode=True):
+                if line is None:
+                    continue
+                if line.startswith("event:"):
+                    event_type = line[6:].strip()
+                elif line.startswith("data:"):
+                    data.append(line[5:].strip())
+                elif not line and event_type:
+                    payload = json.loads("\n".join(data))
+                    if event_type == "error":
+                        raise ServiceError(payload.get("error", "Orchestration failed"))
+                    if event_type in EVENT_TYPES:
+                        yield EVENT_TYPES[event_type](**payload)
+                    event_type, data = None, []
+        finally:
+            response.close()
@@ -0,0 +1,57 @@
+import importlib
+import threading
+import time
+from contextlib import contextmanager
+from types import ModuleType
+from typing import Dict, List, Optional
+from src.metrics import metrics
+
+STARTUP_SECONDS = metrics.gauge(
+    "orchestrator_startup_seconds", "Time spent in one-time startup stages (lazy SDK imports, DB init, orchestrator build).", ("stage",))
+
+class StartupProfile:
+    """Wall time of one-time initialization stages, in the order they ran."""
+
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, seconds: float):
+        with self._lock:
+            self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+            STARTUP_SECONDS.set(self.stages[stage], stage=stage)
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def report(self) -> List[Dict[str, object]]:
+        with self._lock:
+            return [{"stage": name, "seconds": round(seconds, 4)} for name, seconds in self.stages.items()]
+
+startup = StartupProfile()
+
+_sdks: Dict[str, Optional[ModuleType]] = {}
+_sdk_lock = threading.Lock()
+
+def load_sdk(name: str) -> Optional[ModuleType]:
+    """
+    Imports a vendor SDK the first time something needs it, so simulated runs and
+    agents that are never called do not pay for it. Returns None when the SDK is not
+    installed. The import is timed as the "import <name>" startup stage.
+    """
+    if name in _sdks:
+        return _sdks[name]
+    with _sdk_lock:
+        if name not in _sdks:
+            with startup.stage(f"import {name}"):
+                try:
+                    _sdks[name] = importlib.import_module(name)
+                except ImportError:
+                    print(f"Warning: {name} SDK not installed.")
+                    _sdks[name] = None
+        return _sdks[name]
@@ -0,0 +1,49 @@
+import asyncio
+import concurrent.futures
+import os
+import tempfile
+import time
+from src import database
+from src.async_database import AsyncStore
+
+async def run_ordered_writes(store, session_id):
+    # Hold the writer so the queue fills and the remaining writes wait for room
+    blocker = asyncio.ensure_future(store._write(time.sleep, 0.2))
+    await asyncio.sleep(0.05)
+    writes = [asyncio.ensure_future(store.save_message(session_id, "user", f"message {i}")) for i in range(20)]
+    await asyncio.sleep(0.05)
+    print(f"\nQueued while the writer is busy: {store.pending()} (max_pending {store.max_pending})")
+    assert store.pending() == store.max_pending
+    assert not any(write.done() for write in writes)
+    ids = await asyncio.gather(*writes)
+    await blocker
+    assert ids == sorted(ids), ids
+    assert store.pending() == 0
+
+def run_async_store_test():
+    print("--- Async Store Test: Ordered, Bounded Writes ---")
+    with tempfile.TemporaryDirectory() as workdir:
+        database.DB_NAME = os.path.join(workdir, "users.db")
+        database.init_db()
+        database.create_user("store@example.com", "pw")
+        user_id = database.verify_user("store@example.com", "pw")["id"]
+        session_id = database.create_session(user_id, "Ordered")
+
+        store = AsyncStore(max_pending=2)
+        asyncio.run(run_ordered_writes(store, session_id))
+        contents = [m["content"] for m in database.get_session_messages(session_id)]
+        print(f"Committed in submission order: {contents[0]} ... {contents[-1]}")
+        assert contents == [f"message {i}" for i in range(20)]
+
+        # close() finishes queued writes before stopping the writer
+        for i in range(5):
+            store._submit((database.save_message, (session_id, "user", f"late {i}"), concurrent.futures.Future()))
+        store.close()
+        assert not store._thread.is_alive()
+        assert [m["content"] for m in database.get_session_messages(session_id)][-5:] == [f"late {i}" for i in range(5)]
+        database.close_connections()
+    database.session_lists.invalidate()
+    print("\n--- Async Store Test Complete ---")
+
+if __name__ == "__main__":
+    run_async_store_test()
@@ -0,0 +1,80 @@
+import asyncio
+import json
+import os
+import tempfile
+import time
+from src.config import load_config, HttpConfig
+from src.orchestrator import MultiAgentOrchestrator
+from src.agents.simulated import SimulatedAgent
+from src.clients import ClientRegistry
+from src.batch import run_batch, completed_ids, load_queries
+
+def make_orchestrator():
+    config = load_config("orchestrator_config.yaml")
+    config.routing.enabled = False
+    config.cache.enabled = False
+    config.timeouts.broadcast_quorum = None
+    orchestrator = MultiAgentOrchestrator(config)
+    orchestrator.agents = [
+        SimulatedAgent(a.name, a.vendor, a.template, latency=lambda: 0.05, critique_latency=lambda: 0.01)
+        for a in config.agents
+    ]
+    return orchestrator
+
+async def run_batch_test():
+    print("--- Batch Test: process_many, NDJSON output & resume ---")
+
+    workdir = tempfile.mkdtemp()
+    input_path = os.path.join(workdir, "questions.txt")
+    output_path = os.path.join(workdir, "results.ndjson")
+    with open(input_path, "w") as f:
+        f.write("\n".join(f"Question number {i}?" for i in range(16)) + "\n")
+    items = load_queries(input_path)
+    assert len(items) == 16 and items[0]["id"] == "1"
+
+    # Queries overlap: 10 queries x ~0.06s each would take ~0.6s one after another
+    orchestrator = make_orchestrator()
+    start = time.perf_counter()
+    summary = await run_batch(orchestrator, items[:10], output_path, concurrency=8)
+    elapsed = time.perf_counter() - start
+    print(f"\n10 queries in {elapsed:.2f}s: {summary}")
+    assert summary["ok"] == 10 and summary["failed"] == 0
+    assert elapsed < 10 * 0.06 / 2
+
+    # Simulate a crash in the middle of writing a record
+    with open(output_path, "a") as f:
+        f.write('{"id": "11", "query": "Question num')
+    assert completed_ids(output_path) == {str(i) for i in range(1, 11)}
+
+    summary = await run_batch(orchestrator, items, output_path, concurrency=8)
+    print(f"Resumed: {summary}")
+    assert summary["skipped"] == 10 and summary["ran"] == 6
+    with open(output_path) as f:
+        lines = f.read().splitlines()
+    records = []
+    for line in lines:
+        try:
+            records.append(json.loads(line))
+        except json.JSONDecodeError:
+            pass
+    assert len(records) == 16
+    assert {r["id"] for r in records} == {item["id"] for item in items}
+    assert all(r["status"] == "ok" and r["result"]["final_answer"] for r in records)
+
+    # Per-vendor pacing: 10 calls at 20/s take at least ~0.45s
+    registry = ClientRegistry(HttpConfig(vendor_rate_limits={"OpenAI": 20}))
+
+    async def call():
+        async with registry.slot("OpenAI"):
+            pass
+
+    start = time.perf_counter()
+    await asyncio.gather(*(call() for _ in range(10)))
+    paced = time.perf_counter() - start
+    print(f"10 paced calls took {paced:.2f}s")
+    assert paced >= 0.4
+
+    print("\n--- Batch Test Complete ---")
+
+if __name__ == "__main__":
+    asyncio.run(run_batch_test())
@@ -0,0 +1,143 @@
+import asyncio
+import os
+import sqlite3
+import tempfile
+import time
+from src import cache as cache_module
+from src.cache import ResponseCache, make_key
+from src.config import CacheConfig, load_config
+from src.orchestrator import MultiAgentOrchestrator
+
+class FakeClock:
+    def __init__(self):
+        self.now = time.time()
+
+    def time(self):
+        return self.now
+
+def run_ttl_test(path):
+    clock = FakeClock()
+    cache_module.time = clock
+    try:
+        cache = ResponseCache(CacheConfig(ttl_seconds=60), path=path)
+        cache.set("k", {"answer": 1})
+        clock.now += 59
+        assert cache.get("k") == {"answer": 1}
+        clock.now += 2
+        assert cache.get("k") is None
+        # Expired on disk as well, not only in memory
+        assert ResponseCache(CacheConfig(ttl_seconds=60), path=path).get("k") is None
+    finally:
+        cache_module.time = time
+    print("\nTTL: entry served for its lifetime, then a miss in both tiers")
+
+def run_lru_test():
+    cache = ResponseCache(CacheConfig(max_memory_entries=2, disk=False))
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # a is now the most recently used
+    cache.set("c", 3)
+    assert cache.get("b") is None and cache.get("a") == 1 and cache.get("c") == 3
+    print(f"LRU: least recently used entry evicted, stats {cache.stats()}")
+
+def run_disk_test(path):
+    first = ResponseCache(CacheConfig(), path=path)
+    first.set("disk", ["kept"])
+    second = ResponseCache(CacheConfig(), path=path)
+    assert second.get("disk") == ["kept"] and second.disk_hits == 1
+    print("Disk tier: a new instance (another worker) reads what the first one stored")
+
+def run_bypass_test():
+    cache = ResponseCache(CacheConfig(disk=False, bypass_agents=["Perplexity"]))
+    assert cache.enabled_for("ChatGPT") and not cache.enabled_for("Perplexity")
+    assert not ResponseCache(CacheConfig(enabled=False)).enabled_for("ChatGPT")
+    assert make_key("query", "A", "t", "m", "What is X?") == make_key("query", "A", "t", "m", "  what is   x? ")
+
+def run_locked_test(path):
+    cache = ResponseCache(CacheConfig(), path=path)
+    other = sqlite3.connect(path, isolation_level=None)
+    other.execute("BEGIN EXCLUSIVE")
+    try:
+        start = time.perf_counter()
+        cache.set("locked", "still served from memory")  # must not raise; WAL readers are not blocked
+        assert cache.get("locked") == "still served from memory"
+        assert cache.get("never-stored") is None
+        elapsed = time.perf_counter() - start
+    finally:
+        other.execute("ROLLBACK")
+        other.close()
+    print(f"Locked disk tier: {cache.disk_errors} errors turned into misses in {elapsed:.2f}s")
+    assert cache.disk_errors == 1
+
+async def run_off_loop_test(path):
+    """A disk write stuck behind another worker's lock waits on a thread, not on the event loop."""
+    cache = ResponseCache(CacheConfig(), path=path)
+    other = sqlite3.connect(path, isolation_level=None)
+    other.execute("BEGIN EXCLUSIVE")
+    ticks = 0
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+    running = asyncio.ensure_future(ticker())
+    try:
+        await cache.aset("locked", "kept in memory")
+        assert await cache.aget("locked") == "kept in memory"
+    finally:
+        running.cancel()
+        other.execute("ROLLBACK")
+        other.close()
+    print(f"Event loop ticked {ticks} times while a locked disk write waited")
+    assert cache.disk_errors == 1 and ticks >= 10
+
+async def run_synthesis_key_test():
+    """The synthesis (and its cache key) sees the sanitized query, never the raw PII."""
+    config = load_config("orchestrator_config.yaml")
+    config.cache.disk = False
+    orchestrator = MultiAgentOrchestrator(config)
+    for agent in orchestrator.agents:
+        agent.latency = lambda: 0.01
+    seen = []
+    synthesize = orchestrator.combiner.synthesize
+    async def recording(user_query, *args, **kwargs):
+        seen.append(user_query)
+        return await synthesize(user_query, *args, **kwargs)
+    orchestrator.combiner.synthesize = recording
+    await orchestrator.process_query("Mail ada@example.com about tides")
+    assert seen and "ada@example.com" not in seen[0]
+
+async def run_agent_key_test():
+    """Case and whitespace variants of a question share the agent's cache entry."""
+    config = load_config("orchestrator_config.yaml")
+    config.cache.disk = False
+    orchestrator = MultiAgentOrchestrator(config)
+    agent = orchestrator.agents[0]
+    agent.latency = lambda: 0.01
+    budget = config.budgets.profile().for_answer(agent.name)
+    for query in ["What is X?", "  what is x? ", "WHAT   IS X?"]:
+        await orchestrator._query_agent(agent, query, budget)
+    stats = orchestrator.cache.stats()
+    print(f"Agent cache over 3 variants of one question: {stats['misses']} miss, {stats['hits']} hits")
+    assert stats["misses"] == 1 and stats["hits"] == 2
+
+    # A different budget or conversation is still a different entry
+    await orchestrator._query_agent(agent, "what is x?", config.budgets.profile("fast").for_answer(agent.name))
+    await orchestrator._query_agent(agent, "what is x?", budget, history=[{"role": "user", "content": "Earlier question"}])
+    assert orchestrator.cache.stats()["misses"] == 3
+
+def run_cache_test():
+    print("--- Cache Test: Two-tier Response Cache ---")
+    with tempfile.TemporaryDirectory() as workdir:
+        run_ttl_test(os.path.join(workdir, "ttl.db"))
+        run_lru_test()
+        run_disk_test(os.path.join(workdir, "disk.db"))
+        run_bypass_test()
+        run_locked_test(os.path.join(workdir, "locked.db"))
+        asyncio.run(run_off_loop_test(os.path.join(workdir, "off_loop.db")))
+    asyncio.run(run_agent_key_test())
+    asyncio.run(run_synthesis_key_test())
+    print("\n--- Cache Test Complete ---")
+
+if __name__ == "__main__":
+    run_cache_test()
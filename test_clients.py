@@ -0,0 +1,75 @@
+import asyncio
+import time
+from src.clients import SYNC_ACTIVE, SYNC_QUEUED, ClientRegistry
+from src.config import HttpConfig
+
+class PeakCounter:
+    """Tracks how many calls hold a slot at once, overall and per vendor."""
+    def __init__(self):
+        self.now = {}
+        self.peak = {}
+
+    async def call(self, registry, vendor):
+        async with registry.slot(vendor):
+            for key in (vendor, "all"):
+                self.now[key] = self.now.get(key, 0) + 1
+                self.peak[key] = max(self.peak.get(key, 0), self.now[key])
+            await asyncio.sleep(0.02)
+            for key in (vendor, "all"):
+                self.now[key] -= 1
+
+def run_per_loop_test():
+    registry = ClientRegistry()
+    async def same_loop():
+        first = registry.get_openai_client("test-key", "http://127.0.0.1:9/v1")
+        assert registry.get_openai_client("test-key", "http://127.0.0.1:9/v1") is first
+        assert registry.get_openai_client("other-key", "http://127.0.0.1:9/v1") is not first
+        return first
+    first = asyncio.run(same_loop())
+    second = asyncio.run(same_loop())
+    # Each loop gets its own client: an async HTTP pool cannot be used from another loop
+    assert first is not second
+    print("\nPer-loop clients: shared within a loop, separate across loops")
+
+async def run_slot_caps_test():
+    registry = ClientRegistry(HttpConfig(max_in_flight=5, max_in_flight_per_vendor=4, vendor_limits={"Capped": 2}))
+    counter = PeakCounter()
+    calls = [counter.call(registry, vendor) for vendor in ("Capped", "Roomy", "Other") for _ in range(6)]
+    await asyncio.gather(*calls)
+    print(f"Slot peaks with 18 calls: {counter.peak}")
+    assert counter.peak["Capped"] == 2
+    assert counter.peak["Roomy"] <= 4 and counter.peak["Other"] <= 4
+    assert counter.peak["all"] == 5
+
+async def run_sync_gauge_test():
+    registry = ClientRegistry(HttpConfig(sync_sdk_workers=1))
+    def fail():
+        time.sleep(0.05)
+        raise ValueError("SDK error")
+    calls = [asyncio.ensure_future(registry.run_sync("Gauged", fail)) for _ in range(3)]
+    await asyncio.sleep(0.01)
+    assert SYNC_ACTIVE.value(vendor="Gauged") == 1 and SYNC_QUEUED.value(vendor="Gauged") == 2
+    results = await asyncio.gather(*calls, return_exceptions=True)
+    assert all(isinstance(r, ValueError) for r in results)
+    assert SYNC_ACTIVE.value(vendor="Gauged") == 0 and SYNC_QUEUED.value(vendor="Gauged") == 0
+
+    # Cancelled calls, both running and still queued, give their gauge entries back too
+    calls = [asyncio.ensure_future(registry.run_sync("Gauged", time.sleep, 0.05)) for _ in range(3)]
+    await asyncio.sleep(0.01)
+    for call in calls:
+        call.cancel()
+    await asyncio.gather(*calls, return_exceptions=True)
+    await asyncio.sleep(0.1)
+    print(f"Sync pool gauges after failures and cancellations: "
+          f"queued {SYNC_QUEUED.value(vendor='Gauged')}, active {SYNC_ACTIVE.value(vendor='Gauged')}")
+    assert SYNC_ACTIVE.value(vendor="Gauged") == 0 and SYNC_QUEUED.value(vendor="Gauged") == 0
+
+def run_clients_test():
+    print("--- Clients Test: Shared Clients and Concurrency Caps ---")
+    run_per_loop_test()
+    asyncio.run(run_slot_caps_test())
+    asyncio.run(run_sync_gauge_test())
+    print("\n--- Clients Test Complete ---")
+
+if __name__ == "__main__":
+    run_clients_test()
@@ -0,0 +1,51 @@
+import os
+import sqlite3
+import tempfile
+import threading
+from src import database
+
+def run_connection_pool_test():
+    print("--- Connection Pool Test: Connections Outlive Rerun Threads ---")
+    with tempfile.TemporaryDirectory() as workdir:
+        database.DB_NAME = os.path.join(workdir, "users.db")
+        database.init_db()
+        database.close_connections()
+
+        opened = []
+        connect = sqlite3.connect
+        database.sqlite3.connect = lambda *args, **kwargs: opened.append(1) or connect(*args, **kwargs)
+        seen = set()
+        def rerun():
+            # Each Streamlit rerun runs on a new thread
+            seen.add(id(database.get_connection()))
+            database.get_user_sessions_page(1)
+        try:
+            for _ in range(20):
+                thread = threading.Thread(target=rerun)
+                thread.start()
+                thread.join()
+
+            # Threads running at the same time never share a connection
+            barrier = threading.Barrier(4)
+            held = []
+            def concurrent_rerun():
+                held.append(database.get_connection())
+                barrier.wait()
+            threads = [threading.Thread(target=concurrent_rerun) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            database.sqlite3.connect = connect
+        print(f"\n20 sequential reruns: {len(seen)} connection; 4 concurrent ones: {len({id(c) for c in held})} connections, "
+              f"{len(opened)} opened in total")
+        assert len(seen) == 1
+        assert len({id(c) for c in held}) == 4 and len(opened) == 4
+        assert database.get_connection().execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        del held
+        database.close_connections()
+    print("\n--- Connection Pool Test Complete ---")
+
+if __name__ == "__main__":
+    run_connection_pool_test()
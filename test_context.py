@@ -0,0 +1,98 @@
+import asyncio
+import os
+import tempfile
+from src import database
+from src.config import load_config, ContextConfig
+from src.context import ContextManager, SessionContext, message_tokens
+from src.digest import estimate_tokens
+from src.orchestrator import MultiAgentOrchestrator
+from src.agents.simulated import SimulatedAgent
+
+class RecordingAgent(SimulatedAgent):
+    """Simulated agent that remembers the history it was given."""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.histories = []
+
+    async def query(self, user_query, history=None, budget=None):
+        self.histories.append(history)
+        return await super().query(user_query, history=history, budget=budget)
+
+def run_window_test():
+    config = ContextConfig(window_tokens=200, summary_tokens=120, turn_summary_tokens=30)
+    contexts = ContextManager(config)
+    folded = []
+    original_fold = contexts.fold
+    contexts.fold = lambda summary, messages: folded.append(len(messages)) or original_fold(summary, messages)
+
+    context = None
+    for i in range(30):
+        question = f"Follow-up {i}: how does the tidal force of the moon change with distance? Explain step by step."
+        answer = f"Turn {i}. The tidal force falls off with the cube of the distance. " * 5
+        context = contexts.add_turn(context, question, answer)
+        assert sum(message_tokens(m) for m in context.window) <= config.window_tokens or len(context.window) == 2
+        assert estimate_tokens(context.summary) <= config.summary_tokens
+
+    history = contexts.history(context)
+    print(f"\n30 turns -> {len(history)} messages, summary {estimate_tokens(context.summary)} tokens, {len(folded)} fold steps")
+    assert context.turns == 30
+    assert history[0]["role"] == "system" and "Follow-up 0" in history[0]["content"]
+    assert history[-1]["content"].startswith("Turn 29")
+    # One step per turn, each over only the turns that just left the window
+    assert len(folded) <= 30 and max(folded) <= 4
+    assert contexts.history(SessionContext()) is None
+
+def run_storage_test():
+    with tempfile.TemporaryDirectory() as workdir:
+        database.DB_NAME = os.path.join(workdir, "users.db")
+        database.init_db()
+        database.create_user("context@example.com", "pw")
+        user_id = database.verify_user("context@example.com", "pw")["id"]
+        contexts = ContextManager(ContextConfig())
+
+        # A session from before contexts were stored is seeded from its messages
+        session_id = database.create_session(user_id, "Tides")
+        database.save_turn(session_id, "What causes tides?", "Mostly the moon's gravity.")
+        seeded = contexts.load(session_id)
+        assert [m["role"] for m in seeded.window] == ["user", "assistant"] and seeded.turns == 1
+
+        updated = contexts.add_turn(seeded, "And the sun?", "It adds about half as much.")
+        database.save_turn(session_id, "And the sun?", "It adds about half as much.", context=updated.model_dump())
+        assert contexts.load(session_id) == updated
+        print(f"Stored context: {updated.turns} turns, {len(updated.window)} messages in the window")
+
+        database.delete_session(session_id)
+        assert database.get_session_context(session_id) is None
+        database.close_connections()
+    database.session_lists.invalidate()
+
+async def run_orchestrator_test():
+    config = load_config("orchestrator_config.yaml")
+    config.routing.enabled = False
+    config.cache.enabled = False
+    config.sanitization.redact_user_pii = True
+    orchestrator = MultiAgentOrchestrator(config)
+    orchestrator.agents = [RecordingAgent(a.name, a.vendor, a.template, latency=lambda: 0.01) for a in orchestrator.agents]
+
+    history = [{"role": "user", "content": "My email is jane.doe@example.com, what causes tides?"},
+               {"role": "assistant", "content": "Mostly the moon's gravity."}]
+    result = await orchestrator.process_query("And the sun?", history=history)
+    assert result["final_answer"]
+    sent = [agent.histories[-1] for agent in orchestrator.agents]
+    print(f"History passed to {sum(1 for h in sent if h)} of {len(sent)} agents: {sent[0][0]['content']}")
+    assert all(h == sent[0] and len(h) == 2 for h in sent)
+    assert "jane.doe@example.com" not in sent[0][0]["content"]
+
+    async for _ in orchestrator.process_query_stream("And the sun?", history=history):
+        pass
+    assert all(agent.histories[-1] == sent[0] for agent in orchestrator.agents)
+
+def run_context_test():
+    print("--- Context Test: Rolling Summary + Recent Window ---")
+    run_window_test()
+    run_storage_test()
+    asyncio.run(run_orchestrator_test())
+    print("\n--- Context Test Complete ---")
+
+if __name__ == "__main__":
+    run_context_test()
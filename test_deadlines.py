@@ -0,0 +1,71 @@
+import asyncio
+import time
+from src.config import load_config
+from src.metrics import AGENT_TIMEOUTS
+from src.orchestrator import MultiAgentOrchestrator
+
+FAST, SLOW = 0.05, 5.0
+
+def build(slow_agents=2, **timeouts):
+    """Orchestrator whose first `slow_agents` agents take SLOW seconds and the rest FAST."""
+    config = load_config("orchestrator_config.yaml")
+    config.routing.enabled = False
+    config.cache.enabled = False
+    for name, value in timeouts.items():
+        setattr(config.timeouts, name, value)
+    orchestrator = MultiAgentOrchestrator(config)
+    for i, agent in enumerate(orchestrator.agents):
+        agent.latency = (lambda: SLOW) if i < slow_agents else (lambda: FAST)
+        agent.critique_latency = lambda: FAST
+    return orchestrator
+
+def late(orchestrator, responses, slow_agents=2):
+    slow = {agent.name for agent in orchestrator.agents[:slow_agents]}
+    return [r for r in responses if r.name in slow]
+
+async def run_quorum_test():
+    orchestrator = build(broadcast_quorum=6)
+    start = time.perf_counter()
+    responses = await orchestrator.broadcast_query("How do tides work?")
+    elapsed = time.perf_counter() - start
+    print(f"\nQuorum 6 of {len(responses)}: returned after {elapsed:.2f}s")
+    assert elapsed < 1.0
+    assert len(responses) == len(orchestrator.agents)
+    assert all(r.confidence == 0.0 for r in late(orchestrator, responses))
+    assert sum(r.confidence > 0 for r in responses) == 6
+
+async def run_phase_deadline_test():
+    orchestrator = build(broadcast_quorum=None, initial_answer_seconds=1)
+    timeouts = sum(AGENT_TIMEOUTS.values.values())
+    start = time.perf_counter()
+    responses = await orchestrator.broadcast_query("How do tides work?")
+    elapsed = time.perf_counter() - start
+    print(f"No quorum, 1s phase deadline: returned after {elapsed:.2f}s")
+    assert 1.0 <= elapsed < 2.0
+    assert all(r.confidence == 0.0 and r.answer == "[Timeout/Error]" for r in late(orchestrator, responses))
+    assert sum(AGENT_TIMEOUTS.values.values()) == timeouts + 2
+
+async def run_total_budget_test():
+    orchestrator = build(slow_agents=0, broadcast_quorum=None, total_orchestration_seconds=1)
+    async def stalled_synthesis(*args, **kwargs):
+        await asyncio.sleep(SLOW)
+        return {"final_answer": "too late"}
+    orchestrator.combiner.synthesize = stalled_synthesis
+    timeouts = AGENT_TIMEOUTS.value(agent="Combiner", stage="synthesize")
+    start = time.perf_counter()
+    result = await orchestrator.process_query("How do tides work?")
+    elapsed = time.perf_counter() - start
+    print(f"1s total budget with a stalled synthesis: {result['final_answer'][:40]}... after {elapsed:.2f}s")
+    assert 1.0 <= elapsed < 2.0
+    assert result["final_answer"].startswith("[Fallback Synthesis]")
+    assert AGENT_TIMEOUTS.value(agent="Combiner", stage="synthesize") == timeouts + 1
+
+def run_deadlines_test():
+    print("--- Deadlines Test: Quorum, Phase Deadline & Total Budget ---")
+    asyncio.run(run_quorum_test())
+    asyncio.run(run_phase_deadline_test())
+    asyncio.run(run_total_budget_test())
+    print("\n--- Deadlines Test Complete ---")
+
+if __name__ == "__main__":
+    run_deadlines_test()
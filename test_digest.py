@@ -0,0 +1,79 @@
+import asyncio
+import json
+from src.agents.base import AgentResponse
+from src.agents.simulated import SimulatedAgent
+from src.config import load_config
+from src.digest import build_digests, estimate_tokens
+from src.orchestrator import MultiAgentOrchestrator
+
+ANSWER = "Tides rise and fall twice a day because of the moon. The sun adds a smaller pull. " * 30
+RATIONALE = "Gravity pulls the oceans toward the moon and the sun. " * 5
+
+class RecordingCritic(SimulatedAgent):
+    """Simulated agent that remembers which answers it was asked to critique."""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.critiqued = []
+
+    async def critique(self, other_responses, budget=None):
+        self.critiqued = [d["name"] for d in other_responses]
+        return await super().critique(other_responses, budget)
+
+def responses(n):
+    return [AgentResponse(name=f"Agent{i}", answer=ANSWER, rationale=RATIONALE, confidence=0.5 + i / 100, sources=[])
+            for i in range(n)]
+
+def run_budget_test():
+    budget = 1200
+    for n in (1, 3, 8, 40):
+        digests = build_digests(responses(n), budget)
+        used = estimate_tokens(json.dumps(digests))
+        print(f"{n:>2} answers -> {len(digests):>2} digests, {used} tokens (budget {budget})")
+        assert used <= budget
+    # Too many answers for the floor: the most confident ones are kept, in their original order
+    names = [d["name"] for d in build_digests(responses(40), budget)]
+    assert len(names) < 40 and names == sorted(names, key=lambda name: int(name[5:]))
+    assert "Agent39" in names and "Agent0" not in names
+    assert build_digests([r.model_copy(update={"confidence": 0.0}) for r in responses(3)], budget) == []
+
+async def run_own_answer_test():
+    config = load_config("orchestrator_config.yaml")
+    config.routing.enabled = False
+    config.cache.enabled = False
+    orchestrator = MultiAgentOrchestrator(config)
+    critics = [RecordingCritic(a.name, a.vendor, a.template, latency=lambda: 0.01, critique_latency=lambda: 0.01)
+               for a in orchestrator.agents]
+    answers = [AgentResponse(name=a.name, answer=ANSWER, rationale=RATIONALE, confidence=0.8, sources=[]) for a in critics]
+    await orchestrator.run_critique_round(answers, agents=critics)
+    for critic in critics:
+        assert critic.name not in critic.critiqued and len(critic.critiqued) == len(critics) - 1
+    print(f"Each of {len(critics)} critics saw the {len(critics) - 1} other answers, never its own")
+
+async def run_early_stop_test():
+    """A consumer that stops after the first event leaves no critique running."""
+    config = load_config("orchestrator_config.yaml")
+    config.routing.enabled = False
+    config.cache.enabled = False
+    orchestrator = MultiAgentOrchestrator(config)
+    critics = [RecordingCritic(a.name, a.vendor, a.template, latency=lambda: 0.01, critique_latency=lambda: 5)
+               for a in orchestrator.agents]
+    # Only the middle critic answered, so it has nothing to critique and is reported first
+    idle = critics[len(critics) // 2]
+    answers = [AgentResponse(name=idle.name, answer=ANSWER, rationale=RATIONALE, confidence=0.8, sources=[])]
+    events = orchestrator._iter_critiques(answers, agents=critics)
+    name, critique = await events.__anext__()
+    assert name == idle.name and critique == "No other answers to critique."
+    await events.aclose()
+    left = asyncio.all_tasks() - {asyncio.current_task()}
+    print(f"Stopped after the first event: {len(left)} critique tasks left running")
+    assert not left
+
+def run_digest_test():
+    print("--- Digest Test: Token-bounded Critique Input ---\n")
+    run_budget_test()
+    asyncio.run(run_own_answer_test())
+    asyncio.run(run_early_stop_test())
+    print("\n--- Digest Test Complete ---")
+
+if __name__ == "__main__":
+    run_digest_test()
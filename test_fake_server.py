@@ -0,0 +1,72 @@
+import asyncio
+import os
+from benchmarks.fake_llm_server import FakeLLMServer
+from src.config import load_config
+from src.orchestrator import MultiAgentOrchestrator
+from src.events import SynthesisTokenEvent, FinalResultEvent
+from src.metrics import TOKENS
+
+async def run_fake_server_test():
+    print("--- Fake Server Test: RealAgent Path Offline ---")
+
+    server = FakeLLMServer(port=0, latency=lambda: 0.05, token_delay=0.0).start()
+    os.environ.setdefault("OPENROUTER_API_KEY", "fake-key")
+    config = load_config("orchestrator_config.yaml")
+    config.http.base_url = server.base_url
+    config.cache.enabled = False
+    config.routing.enabled = False
+    try:
+        orchestrator = MultiAgentOrchestrator(config, use_real_agents=True)
+        print(f"\nEndpoint: {orchestrator.agents[0].base_url}")
+        assert all(agent.base_url == server.base_url for agent in orchestrator.agents)
+
+        result = await orchestrator.process_query("How do vaccines train the immune system?")
+        print(f"Final: {result['final_answer'][:60]}...")
+        assert result["final_answer"].startswith("Synthesized answer from the fake server")
+        assert TOKENS.value(agent="ChatGPT", type="completion") > 0
+
+        # Streaming synthesis over SSE, with the usage chunk
+        before = TOKENS.value(agent="Combiner", type="completion")
+        events = [e async for e in orchestrator.process_query_stream("Why is the sky blue?")]
+        tokens = [e for e in events if isinstance(e, SynthesisTokenEvent)]
+        assert tokens and isinstance(events[-1], FinalResultEvent)
+        assert TOKENS.value(agent="Combiner", type="completion") > before
+        print(f"Streamed {len(tokens)} synthesis chunks.")
+
+        # Budgets reach the API as max_tokens; a cut-off synthesis is still parsed
+        config.budgets.profiles["fast"].synthesis.max_tokens = 50
+        fast = await orchestrator.process_query("How do vaccines train the immune system?", profile="fast")
+        assert 0 < len(fast["final_answer"]) < len(result["final_answer"])
+        print(f"Fast mode answer: {len(fast['final_answer'])} chars vs {len(result['final_answer'])}")
+
+        # Answers and syntheses cut off at max_tokens are used but never cached
+        cached_config = config.model_copy(deep=True)
+        cached_config.cache.enabled, cached_config.cache.disk = True, False
+        cached_config.budgets.profiles["fast"].answer.max_tokens = 20
+        cached = MultiAgentOrchestrator(cached_config, use_real_agents=True)
+        truncated = await cached.process_query("How do vaccines train the immune system?", profile="fast")
+        kinds = [key.split(":")[0] for key in cached.cache._memory]
+        assert truncated["final_answer"] and not any(r["complete"] for r in truncated["agents"] if r["confidence"] > 0)
+        assert "query" not in kinds and "synthesis" not in kinds
+        full = await cached.process_query("How do vaccines train the immune system?")
+        kinds = [key.split(":")[0] for key in cached.cache._memory]
+        assert all(r["complete"] for r in full["agents"] if r["confidence"] > 0) and "query" in kinds and "synthesis" in kinds
+        print(f"Truncated turn cached nothing; full turn cached {len(kinds)} entries")
+
+        # Truncated JSON content: the partial answer is recovered instead of the raw text
+        server.malformed_rate = 1.0
+        response = await orchestrator.agents[0].query("Anything")
+        assert response.answer.startswith("A plausible answer") and "{" not in response.answer
+        print(f"Malformed JSON recovered: {response.answer[:40]}... (confidence {response.confidence})")
+
+        # Blank completions (content filter, max_tokens before any text) are failures
+        for blank in (None, "", "  \n"):
+            assert orchestrator.agents[0]._parse_json_response(blank).confidence == 0.0
+        print(f"Server outcomes: {dict(server.outcomes)}")
+    finally:
+        server.stop()
+
+    print("\n--- Fake Server Test Complete ---")
+
+if __name__ == "__main__":
+    asyncio.run(run_fake_server_test())
@@ -0,0 +1,63 @@
+import json
+from src.json_stream import StreamingJSONParser, parse_tolerant
+
+def run_json_stream_test():
+    print("--- JSON Stream Test: Incremental & Tolerant Parsing ---")
+
+    payload = {"confidence": 0.82, "rationale": "Uses \"quotes\", café and\nnewlines.",
+               "answer": "Leaves change colour because chlorophyll breaks down. " * 8,
+               "sources": ["Botany 101", {"url": "https://example.com/a]b"}]}
+    text = "Here you go:\n```json\n" + json.dumps(payload) + "\n```"
+
+    # Any chunking gives the same result; fields appear as soon as they are decoded
+    for size in (1, 5, 64):
+        parser = StreamingJSONParser()
+        first_seen = {}
+        for i in range(0, len(text), size):
+            for key in parser.feed(text[i:i + size]):
+                first_seen.setdefault(key, i)
+        assert parser.values == payload and parser.done, size
+    print(f"\nFirst offsets per field: {first_seen}")
+    assert first_seen["confidence"] < first_seen["answer"]
+
+    parser = StreamingJSONParser()
+    parser.feed(json.dumps(payload)[:120])
+    print(f"Partial: {parser.values}")
+    assert parser.values["confidence"] == 0.82 and "answer" not in parser.complete
+
+    # Recovery from broken output
+    truncated = parse_tolerant(json.dumps(payload)[:200])
+    assert truncated["rationale"] == payload["rationale"] and truncated["answer"]
+    sloppy = parse_tolerant("{answer: 'It depends', confidence: 0.4, rationale: \"a\nb\" \"sources\": [],}")
+    assert sloppy == {"answer": "It depends", "confidence": 0.4, "rationale": "a\nb", "sources": []}
+    assert parse_tolerant("Just prose, no JSON at all.") is None
+    print(f"Recovered: {sloppy}")
+
+    # An escaped backslash ending a string inside a list does not escape the closing quote
+    windows = '{"sources": ["C:\\\\dir\\\\"], "answer": "x", "confidence": 0.9}'
+    for size in (1, 3, len(windows)):
+        parser = StreamingJSONParser()
+        for i in range(0, len(windows), size):
+            parser.feed(windows[i:i + size])
+        assert parser.values == json.loads(windows) and parser.done, size
+
+    # An escaped emoji is one character, not two lone surrogates (which sqlite refuses)
+    emoji = json.dumps({"answer": "Done \U0001F600!", "confidence": 0.9})
+    assert "\\ud83d\\ude00" in emoji
+    for size in (1, 4, len(emoji)):
+        parser = StreamingJSONParser()
+        for i in range(0, len(emoji), size):
+            parser.feed(emoji[i:i + size])
+        assert parser.values["answer"] == "Done \U0001F600!", size
+    recovered = parse_tolerant(emoji[:emoji.index("!")])
+    assert recovered["answer"] == "Done \U0001F600"
+    recovered["answer"].encode("utf-8")
+    parser = StreamingJSONParser()
+    parser.feed('{"answer": "half \\ud83d pair"}')
+    assert parser.values["answer"] == "half \ufffd pair"
+    print("Escaped backslashes and surrogate pairs decode as json.loads does.")
+
+    print("\n--- JSON Stream Test Complete ---")
+
+if __name__ == "__main__":
+    run_json_stream_test()
@@ -0,0 +1,48 @@
+import os
+import tempfile
+from src import database
+
+def load_all(session_id, limit):
+    """Follows the "Load older messages" cursor back to the start of the thread."""
+    pages, cursor = [], None
+    while True:
+        messages, cursor = database.get_session_messages_page(session_id, limit=limit, before=cursor)
+        pages.append([m["content"] for m in messages])
+        if cursor is None:
+            return pages
+
+def run_message_paging_test():
+    print("--- Message Paging Test: Keyset Cursor over a Thread ---")
+    with tempfile.TemporaryDirectory() as workdir:
+        database.DB_NAME = os.path.join(workdir, "users.db")
+        database.init_db()
+        database.create_user("paging@example.com", "pw")
+        user_id = database.verify_user("paging@example.com", "pw")["id"]
+        session_id = database.create_session(user_id, "Long thread")
+        # Saved within the same second: the id breaks created_at ties
+        for i in range(7):
+            database.save_message(session_id, "user" if i % 2 == 0 else "assistant", f"message {i}")
+
+        # The newest page comes first, each page is oldest first, and the cursor
+        # is None once the start of the thread is reached
+        pages = load_all(session_id, limit=3)
+        print(f"\nPages of 3: {pages}")
+        assert pages == [["message 4", "message 5", "message 6"],
+                         ["message 1", "message 2", "message 3"],
+                         ["message 0"]]
+
+        # A thread that is an exact multiple of the page size ends without an empty page
+        assert load_all(session_id, limit=7) == [[f"message {i}" for i in range(7)]]
+        messages, cursor = database.get_session_messages_page(session_id, limit=6)
+        assert cursor is not None
+        assert database.get_session_messages_page(session_id, limit=6, before=cursor) == (
+            [{"id": messages[0]["id"] - 1, "role": "user", "content": "message 0"}], None)
+
+        empty = database.create_session(user_id, "Empty")
+        assert database.get_session_messages_page(empty) == ([], None)
+        database.close_connections()
+    database.session_lists.invalidate()
+    print("\n--- Message Paging Test Complete ---")
+
+if __name__ == "__main__":
+    run_message_paging_test()
@@ -0,0 +1,53 @@
+import asyncio
+from src.config import load_config
+from src.orchestrator import MultiAgentOrchestrator, QUORUM_CUTOFF_ANSWER
+from src.metrics import MetricsRegistry, STAGE_SECONDS, AGENT_SECONDS, AGENT_TIMEOUTS, QUORUM_CUTOFFS, agent_summary
+
+async def run_metrics_test():
+    print("--- Metrics Test: Registry & Orchestration Instrumentation ---")
+
+    registry = MetricsRegistry()
+    calls = registry.counter("test_calls_total", "Calls.", ("agent",))
+    latency = registry.histogram("test_latency_seconds", "Latency.", ("agent",), buckets=(0.1, 1.0))
+    calls.inc(agent="a")
+    calls.inc(2, agent="a")
+    for value in (0.05, 0.5, 0.5, 5.0):
+        latency.observe(value, agent="a")
+    text = registry.render()
+    print(f"\n{text}")
+    assert 'test_calls_total{agent="a"} 3' in text
+    assert 'test_latency_seconds_bucket{agent="a",le="1"} 3' in text
+    assert 'test_latency_seconds_bucket{agent="a",le="+Inf"} 4' in text
+    assert 'test_latency_seconds_count{agent="a"} 4' in text
+    assert 0.1 <= latency.quantile(0.5, agent="a") <= 1.0
+
+    config = load_config("orchestrator_config.yaml")
+    config.routing.enabled = False
+    config.cache.enabled = False
+    config.timeouts.broadcast_quorum = None  # wait for every agent
+    orchestrator = MultiAgentOrchestrator(config)
+    before = STAGE_SECONDS.series.get(("total",))
+    before = before.count if before else 0
+    await orchestrator.process_query("How do vaccines train the immune system?")
+    assert STAGE_SECONDS.series[("total",)].count == before + 1
+    for agent in orchestrator.agents:
+        assert (agent.name, "query") in AGENT_SECONDS.series
+    print(f"Agents instrumented: {[row['agent'] for row in agent_summary()]}")
+
+    # Agents the quorum made unnecessary are cut-offs, not timeouts
+    config.timeouts.broadcast_quorum = len(orchestrator.agents) - 2
+    for i, agent in enumerate(orchestrator.agents):
+        agent.latency = (lambda: 0.01) if i >= 2 else (lambda: 2.0)
+    timeouts, cutoffs = sum(AGENT_TIMEOUTS.values.values()), sum(QUORUM_CUTOFFS.values.values())
+    responses = await orchestrator.broadcast_query("How do vaccines train the immune system?")
+    late = [r for r in responses if r.name in {a.name for a in orchestrator.agents[:2]}]
+    print(f"Quorum cut-offs: {[r.answer for r in late]}")
+    assert all(r.answer == QUORUM_CUTOFF_ANSWER and r.confidence == 0.0 for r in late)
+    assert sum(QUORUM_CUTOFFS.values.values()) == cutoffs + 2
+    assert sum(AGENT_TIMEOUTS.values.values()) == timeouts
+    assert "quorum cut-offs" in agent_summary()[0]
+
+    print("\n--- Metrics Test Complete ---")
+
+if __name__ == "__main__":
+    asyncio.run(run_metrics_test())
@@ -0,0 +1,64 @@
+import json
+import os
+import sqlite3
+import tempfile
+from src import database
+
+AGENTS = [
+    {"name": "ChatGPT", "answer": "Mostly the moon.", "rationale": "Gravity", "confidence": 0.9, "sources": ["NOAA"]},
+    {"name": "Claude", "answer": "The moon and the sun.", "rationale": "Both pull", "confidence": 0.8, "sources": []},
+]
+
+def build_v0_database(path):
+    """The schema before any migration, with per-agent answers inline in messages.details."""
+    conn = sqlite3.connect(path)
+    with conn:
+        c = conn.cursor()
+        database._create_tables(c)
+        c.execute("INSERT INTO users (email, password_hash) VALUES ('old@example.com', 'x')")
+        c.execute("INSERT INTO sessions (user_id, title) VALUES (1, 'Tides')")
+        c.execute("INSERT INTO messages (session_id, role, content) VALUES (1, 'user', 'What causes tides?')")
+        details = {"final_answer": "Mostly the moon.", "combined_confidence": 0.85, "agents": AGENTS}
+        c.execute("INSERT INTO messages (session_id, role, content, details) VALUES (1, 'assistant', 'Mostly the moon.', ?)",
+                  (json.dumps(details),))
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == 0
+    conn.close()
+
+def snapshot():
+    conn = database.get_connection()
+    return (conn.execute("SELECT * FROM agent_answers ORDER BY id").fetchall(),
+            conn.execute("SELECT id, details FROM messages ORDER BY id").fetchall())
+
+def run_migrations_test():
+    print("--- Migrations Test: v0 Database with Inline Agent Details ---")
+    with tempfile.TemporaryDirectory() as workdir:
+        database.DB_NAME = os.path.join(workdir, "users.db")
+        build_v0_database(database.DB_NAME)
+
+        database.init_db()
+        version = database.get_connection().execute("PRAGMA user_version").fetchone()[0]
+        assert version == len(database.MIGRATIONS)
+        first = snapshot()
+        database.init_db()
+        # Re-running the data step itself finds nothing left to move
+        with database.transaction() as c:
+            database._move_agent_details(c)
+        assert snapshot() == first
+        print(f"\nMigrated to version {version}; a second run changed nothing")
+
+        rows, messages = first
+        assert len(rows) == len(AGENTS)
+        details = json.loads(messages[1][1])
+        assert "agents" not in details and details["agent_count"] == len(AGENTS)
+        print(f"Slimmed details: {details}")
+
+        # Threads load without agent answers; they are fetched per message on demand
+        thread = database.get_session_messages(1)
+        assert "agents" not in thread[1]["details"]
+        assert database.get_message_agents(thread[1]["id"]) == AGENTS
+        assert database.get_message_agents(thread[0]["id"]) == []
+        database.close_connections()
+    print("\n--- Migrations Test Complete ---")
+
+if __name__ == "__main__":
+    run_migrations_test()
@@ -0,0 +1,95 @@
+import asyncio
+import os
+import tempfile
+import time
+import yaml
+from src.clients import registry
+from src.config import load_config, config_digest, ConfigWatcher
+from src.orchestrator import MultiAgentOrchestrator
+
+def write_config(path, raw):
+    with open(path, "w") as f:
+        yaml.safe_dump(raw, f, sort_keys=False)
+
+async def run_reload_test():
+    print("--- Reload Test: Config Cache & Hot Reload ---")
+
+    # Compiled configs are cached; every caller still gets its own copy
+    start = time.perf_counter()
+    first = load_config("orchestrator_config.yaml")
+    second = load_config("orchestrator_config.yaml")
+    print(f"\nTwo loads took {(time.perf_counter() - start) * 1000:.1f}ms")
+    assert first == second and first is not second
+    first.timeouts.initial_answer_seconds = 999
+    assert load_config("orchestrator_config.yaml").timeouts.initial_answer_seconds != 999
+
+    with open("orchestrator_config.yaml") as f:
+        raw = yaml.safe_load(f)
+    raw["routing"]["enabled"] = False
+    raw["cache"]["enabled"] = False
+    raw["timeouts"]["broadcast_quorum"] = None
+    path = os.path.join(tempfile.mkdtemp(), "config.yaml")
+    write_config(path, raw)
+
+    orchestrator = MultiAgentOrchestrator(load_config(path))
+    watcher = ConfigWatcher(path, orchestrator.reload)
+    agents_before = {a.name: a for a in orchestrator.agents}
+    cache_before, combiner_before = orchestrator.cache, orchestrator.combiner
+
+    # Touching the file without changing it is not a reload
+    os.utime(path, None)
+    assert not watcher.check()
+
+    # Start a request, then drop an agent and change a template while it is in flight
+    in_flight = asyncio.ensure_future(orchestrator.process_query("How do tides work?"))
+    await asyncio.sleep(0.1)
+    raw["agents"] = [a for a in raw["agents"] if a["name"] != "Grok"]
+    raw["agents"][0]["template"] += "\nAlways answer in French."
+    raw["timeouts"]["initial_answer_seconds"] = 20
+    write_config(path, raw)
+    assert watcher.check()
+    assert orchestrator.config_version == 2
+    assert orchestrator.config.timeouts.initial_answer_seconds == 20
+
+    old_result = await in_flight
+    assert "Grok" in [a["name"] for a in old_result["agents"]], "in-flight request finished on the old agents"
+    new_result = await orchestrator.process_query("How do tides work?")
+    assert "Grok" not in [a["name"] for a in new_result["agents"]]
+
+    # Warm state survives: unchanged agents, the cache and the Combiner are the same objects
+    agents_after = {a.name: a for a in orchestrator.agents}
+    assert agents_after["Claude"] is agents_before["Claude"]
+    assert agents_after["ChatGPT"] is not agents_before["ChatGPT"]
+    assert orchestrator.cache is cache_before and orchestrator.combiner is combiner_before
+
+    # A broken file is reported and ignored
+    digest = config_digest(path)
+    with open(path, "w") as f:
+        f.write("agents: [unterminated")
+    assert not watcher.check()
+    assert orchestrator.config_version == 2 and watcher.digest == digest
+
+    await run_http_reload_test()
+    print("\n--- Reload Test Complete ---")
+
+async def run_http_reload_test():
+    """`http` changes reach the running loop: new vendor caps, and agents on the new endpoint."""
+    os.environ.setdefault("OPENROUTER_API_KEY", "fake-key")
+    config = load_config("orchestrator_config.yaml")
+    orchestrator = MultiAgentOrchestrator(config, use_real_agents=True)
+    async with registry.slot("OpenAI"):
+        pass
+    state = registry._state()
+    assert registry._vendor_limit(state, "OpenAI")._value == config.http.max_in_flight_per_vendor
+
+    new = config.model_copy(deep=True)
+    new.http.vendor_limits = {"OpenAI": 1}
+    new.http.base_url = "http://127.0.0.1:9/v1"
+    orchestrator.reload(new)
+    assert registry._vendor_limit(registry._state(), "OpenAI")._value == 1
+    endpoints = {agent.base_url for agent in orchestrator.agents} | {orchestrator.combiner.base_url}
+    print(f"After an http reload: OpenAI cap 1, endpoints {endpoints}")
+    assert endpoints == {registry.base_url} == {"http://127.0.0.1:9/v1"}
+
+if __name__ == "__main__":
+    asyncio.run(run_reload_test())
@@ -0,0 +1,142 @@
+import asyncio
+import time
+from src.config import ResilienceConfig
+from src.clients import registry
+from src.resilience import Resilience, CircuitBreaker, CircuitOpenError, deadline, HEDGES
+
+class StatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+async def run_hung_vendor_test():
+    """Phase deadlines are shorter than the HTTP timeout: a vendor that hangs must still open its circuit."""
+    layer = Resilience(ResilienceConfig(breaker_failure_threshold=2, breaker_reset_seconds=30))
+    loop = asyncio.get_running_loop()
+    async def hang():
+        await asyncio.sleep(3600)
+
+    async def call_until(due: float, cancel_after: float):
+        with deadline(due):
+            task = asyncio.ensure_future(layer.call("Hung", hang))
+        await asyncio.wait({task}, timeout=cancel_after)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    # Cancelled early (e.g. the broadcast quorum was reached): no verdict on the vendor
+    await call_until(loop.time() + 10, 0.02)
+    assert layer.breaker("Hung").failures == 0
+    # Cancelled at the phase deadline: counts like a timeout
+    for _ in range(2):
+        await call_until(loop.time() + 0.05, 0.05)
+    breaker = layer.breaker("Hung")
+    print(f"Hung vendor after 2 deadline cancellations: state {breaker.state}, failures {breaker.failures}")
+    assert breaker.state == CircuitBreaker.OPEN
+
+async def run_hedge_slot_test():
+    """A hedge takes its own in-flight slot, and is skipped when the vendor has none free."""
+    layer = Resilience(ResilienceConfig(hedge_min_samples=5))
+    registry.config.vendor_limits.update({"Capped": 1, "Roomy": 2})
+    try:
+        for vendor in ("Capped", "Roomy"):
+            running, peak = 0, 0
+            async def tracked(seconds):
+                nonlocal running, peak
+                running += 1
+                peak = max(peak, running)
+                try:
+                    await asyncio.sleep(seconds)
+                finally:
+                    running -= 1
+            for _ in range(5):
+                async with registry.slot(vendor):
+                    await layer.call(vendor, lambda: tracked(0.01))
+            attempts = []
+            async def slow_first():
+                attempts.append(1)
+                await tracked(0.3 if len(attempts) == 1 else 0.01)
+            skipped = HEDGES.value(vendor=vendor, winner="skipped")
+            async with registry.slot(vendor):
+                await layer.call(vendor, slow_first)
+            print(f"{vendor}: {len(attempts)} requests sent, at most {peak} at once")
+            if vendor == "Capped":
+                assert peak == 1 and len(attempts) == 1 and HEDGES.value(vendor=vendor, winner="skipped") == skipped + 1
+            else:
+                assert peak == 2 and len(attempts) == 2
+    finally:
+        for vendor in ("Capped", "Roomy"):
+            registry.config.vendor_limits.pop(vendor, None)
+
+async def run_resilience_test():
+    print("--- Resilience Test: Retries, Hedging & Circuit Breakers ---")
+
+    config = ResilienceConfig(max_retries=2, backoff_base_seconds=0.01, hedge_min_samples=5,
+                              breaker_failure_threshold=2, breaker_reset_seconds=0.2)
+    layer = Resilience(config)
+
+    # Two 429s, then success
+    calls = []
+    async def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise StatusError(429)
+        return "ok"
+    assert await layer.call("Flaky", flaky) == "ok" and len(calls) == 3
+    print(f"\nRetried 429s: {len(calls)} attempts")
+
+    # Client errors are not retried and do not trip the breaker
+    calls.clear()
+    async def bad_request():
+        calls.append(1)
+        raise StatusError(400)
+    try:
+        await layer.call("Strict", bad_request)
+    except StatusError:
+        pass
+    assert len(calls) == 1 and layer.breaker("Strict").state == CircuitBreaker.CLOSED
+
+    # A vendor that keeps failing opens its circuit and then fails fast
+    async def down():
+        raise StatusError(503)
+    for _ in range(config.breaker_failure_threshold):
+        try:
+            await layer.call("Down", down)
+        except StatusError:
+            pass
+    start = time.perf_counter()
+    try:
+        await layer.call("Down", down)
+        raise AssertionError("expected an open circuit")
+    except CircuitOpenError as e:
+        print(f"Failed fast in {time.perf_counter() - start:.4f}s: {e}")
+
+    # After the reset window one trial call closes it again
+    await asyncio.sleep(config.breaker_reset_seconds)
+    async def recovered():
+        return "back"
+    assert await layer.call("Down", recovered) == "back"
+    assert layer.breaker("Down").state == CircuitBreaker.CLOSED
+
+    # A call slower than the vendor's p95 gets a duplicate; the fast copy wins
+    async def quick():
+        await asyncio.sleep(0.01)
+        return "quick"
+    for _ in range(config.hedge_min_samples):
+        await layer.call("Hedged", quick)
+    attempts = []
+    async def slow_then_fast():
+        attempts.append(1)
+        await asyncio.sleep(1.0 if len(attempts) == 1 else 0.01)
+        return f"copy {len(attempts)}"
+    start = time.perf_counter()
+    result = await layer.call("Hedged", slow_then_fast)
+    elapsed = time.perf_counter() - start
+    print(f"Hedged call returned {result!r} in {elapsed:.3f}s")
+    assert result == "copy 2" and elapsed < 0.5
+
+    await run_hung_vendor_test()
+    await run_hedge_slot_test()
+    print("\n--- Resilience Test Complete ---")
+
+if __name__ == "__main__":
+    asyncio.run(run_resilience_test())
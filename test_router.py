@@ -0,0 +1,38 @@
+import random
+from src.config import load_config
+from src.orchestrator import MultiAgentOrchestrator
+from src.agents.base import AgentResponse
+from src.router import AgentRouter
+
+def run_router_test():
+    print("--- Router Test: Adaptive Agent Selection ---")
+    
+    config = load_config("orchestrator_config.yaml")
+    config.routing.enabled = True
+    config.routing.exploration_rate = 0.0
+    agents = MultiAgentOrchestrator(config).agents
+    router = AgentRouter(config.routing, config.agents, rng=random.Random(0))
+
+    easy = router.select("hi", agents)
+    hard = router.select("Compare and explain why TCP versus UDP trade-offs matter for games? "
+                         "What about QUIC? Evaluate the pros and cons step by step for mobile networks "
+                         "and design considerations for lossy links with high jitter.", agents)
+    print(f"\nEasy query -> {[a.name for a in easy]}")
+    print(f"Hard query -> {[a.name for a in hard]}")
+    assert len(easy) == config.routing.min_agents
+    assert len(hard) > len(easy)
+
+    # An agent that keeps failing drops out of the selection
+    flaky = easy[0].name
+    for _ in range(config.routing.min_samples):
+        router.record_failure(flaky, 1.0)
+        for agent in agents:
+            if agent.name != flaky:
+                router.record_answer(agent.name, 1.0, AgentResponse(name=agent.name, answer="ok", rationale="", confidence=0.9, sources=[]))
+    assert flaky not in [a.name for a in router.select("hi", agents)]
+    print(f"{flaky} dropped after {config.routing.min_samples} failures.")
+
+    print("\n--- Router Test Complete ---")
+
+if __name__ == "__main__":
+    run_router_test()
@@ -0,0 +1,72 @@
+import asyncio
+import time
+from contextlib import closing
+from src.config import load_config
+from src.orchestrator import MultiAgentOrchestrator
+from src.runtime import OrchestratorRuntime
+from src.clients import registry
+
+def run_runtime_test():
+    print("--- Runtime Test: Persistent Background Event Loop ---")
+
+    config = load_config("orchestrator_config.yaml")
+    config.routing.enabled = False
+    config.cache.enabled = False
+    orchestrator = MultiAgentOrchestrator(config)
+    runtime = OrchestratorRuntime()
+
+    # Two "turns" run on the same loop, so loop-bound client state is created once
+    loops = set()
+
+    async def turn(query):
+        loops.add(asyncio.get_running_loop())
+        return await orchestrator.process_query(query)
+
+    first = runtime.run(turn("What is the capital of France?"))
+    second = runtime.run(turn("And of Spain?"))
+    assert first["final_answer"] and second["final_answer"]
+    assert loops == {runtime.loop}
+    # Vendor slots (and pooled HTTP clients) were created once, for the runtime loop
+    assert runtime.loop in registry._states
+
+    # Streaming: events arrive on the calling thread in order, ending with the final result
+    events = [e.type for e in runtime.stream(orchestrator.process_query_stream("How do tides work?"))]
+    print(f"\nStreamed {len(events)} events, last: {events[-1]}")
+    assert events[0] == "agent_answer" and events[-1] == "final"
+
+    # Abandoning a stream (a Streamlit rerun) cancels the producer on the loop
+    state = {"cancelled": False}
+
+    async def slow_events():
+        try:
+            for i in range(100):
+                yield i
+                await asyncio.sleep(0.05)
+        except asyncio.CancelledError:
+            state["cancelled"] = True
+            raise
+
+    with closing(runtime.stream(slow_events())) as items:
+        for item in items:
+            if item == 2:
+                break
+    deadline = time.time() + 2
+    while not state["cancelled"] and time.time() < deadline:
+        time.sleep(0.01)
+    assert state["cancelled"]
+
+    # Errors raised on the loop surface in the caller
+    async def boom():
+        raise ValueError("boom")
+    try:
+        runtime.run(boom())
+        raise AssertionError("expected ValueError")
+    except ValueError:
+        pass
+
+    runtime.close()
+    assert not runtime.running
+    print("\n--- Runtime Test Complete ---")
+
+if __name__ == "__main__":
+    run_runtime_test()
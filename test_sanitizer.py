@@ -0,0 +1,47 @@
+from src.config import load_config
+from src.orchestrator import MultiAgentOrchestrator
+from src.sanitizer import Sanitizer
+
+def run_sanitizer_test():
+    print("--- Sanitizer Test: Single-pass & Streaming Redaction ---")
+    
+    config = load_config("orchestrator_config.yaml")
+    sanitizer = Sanitizer(config.sanitization)
+    
+    text = ("My name is Ada Lovelace, mail ada@example.com or call 555-123-4567. "
+            "I'm at 51.5072, -0.1276 and my SSN is 123-45-6789.")
+    redacted = sanitizer.sanitize(text)
+    print(f"\nRedacted: {redacted}")
+    for leaked in ["Ada Lovelace", "ada@example.com", "555-123-4567", "51.5072", "123-45-6789"]:
+        assert leaked not in redacted, leaked
+    print(f"Audit: {sanitizer.audit_log[-1].counts}")
+
+    # Streaming with tiny chunks must match whole-string redaction, even when a match
+    # is split across chunk boundaries
+    long_text = text * 20
+    stream = sanitizer.stream()
+    streamed = "".join(stream.redact_all(long_text[i:i + 7] for i in range(0, len(long_text), 7)))
+    assert streamed == sanitizer.sanitize(long_text)
+    print("Streaming output matches whole-string redaction.")
+
+    # "I am" / "I'm" only introduce a name, not a capitalized adjective or verb
+    for phrase in ["I'm Tired of waiting", "I am Sure it works", "I'm Not Sure", "I'm Looking for help"]:
+        assert sanitizer.sanitize(phrase) == phrase, phrase
+    assert sanitizer.sanitize("I'm Grace Hopper") == "I'm [NAME REDACTED]"
+    print("Self-introduction cue leaves 'I'm Tired' and 'I am Sure' alone.")
+
+    # Redactions in conversation history are audited like the query's
+    config.routing.enabled = False
+    orchestrator = MultiAgentOrchestrator(config)
+    before = len(orchestrator.sanitizer.audit_log)
+    history = orchestrator.sanitize_history([{"role": "user", "content": "Reach me at ada@example.com"},
+                                             {"role": "assistant", "content": "Noted."}])
+    assert history[0]["content"] == "Reach me at [EMAIL REDACTED]"
+    records = list(orchestrator.sanitizer.audit_log)[before:]
+    assert [(r.source, r.counts) for r in records] == [("history", {"email": 1})]
+    print(f"History audit: {records[0].source} {records[0].counts}")
+
+    print("\n--- Sanitizer Test Complete ---")
+
+if __name__ == "__main__":
+    run_sanitizer_test()
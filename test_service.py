@@ -0,0 +1,109 @@
+import asyncio
+import json
+import socket
+import threading
+import time
+from src.config import load_config
+from src.orchestrator import MultiAgentOrchestrator
+from src.service import OrchestrationService
+from src.service_client import ServiceClient
+
+try:
+    import uvicorn
+except ImportError:
+    uvicorn = None
+
+async def call(app, method, path, body=b"", headers=None):
+    """Drives one ASGI request; returns (status, headers, body)."""
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    sent = []
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        await asyncio.sleep(3600)  # the client stays connected
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": method, "path": path, "headers": headers or []}
+    await app(scope, receive, send)
+    start = next(m for m in sent if m["type"] == "http.response.start")
+    return start["status"], dict(start["headers"]), b"".join(m.get("body", b"") for m in sent if m["type"] == "http.response.body")
+
+def make_service():
+    config = load_config("orchestrator_config.yaml")
+    config.routing.enabled = False
+    config.cache.enabled = False
+    service = OrchestrationService()
+    service.orchestrator = MultiAgentOrchestrator(config)
+    return service
+
+async def run_asgi_test():
+    service = make_service()
+
+    status, _, body = await call(service, "GET", "/healthz")
+    assert status == 200 and json.loads(body) == {"status": "ok"}
+    status, _, body = await call(service, "GET", "/readyz")
+    assert status == 200 and json.loads(body)["ready"]
+
+    status, _, body = await call(service, "POST", "/v1/query", json.dumps({"query": "How do tides work?"}).encode())
+    result = json.loads(body)
+    print(f"\nJSON endpoint: {status}, confidence {result['combined_confidence']}")
+    assert status == 200 and result["final_answer"]
+
+    status, headers, body = await call(service, "POST", "/v1/query/stream", json.dumps({"query": "How do tides work?"}).encode())
+    events = [line[7:] for line in body.decode().splitlines() if line.startswith("event: ")]
+    print(f"SSE endpoint: {status}, {len(events)} events, last {events[-1]}")
+    assert status == 200 and headers[b"content-type"] == b"text/event-stream"
+    assert events[0] == "agent_answer" and events[-1] == "final"
+
+    assert (await call(service, "POST", "/v1/query", b"not json"))[0] == 400
+    assert (await call(service, "POST", "/v1/query", b'{"query": ""}'))[0] == 400
+    assert (await call(service, "POST", "/v1/query", b'{"query": "hi", "history": [{"role": "tool"}]}'))[0] == 400
+    history = [{"role": "user", "content": "What causes tides?"}, {"role": "assistant", "content": "The moon."}]
+    status, _, body = await call(service, "POST", "/v1/query", json.dumps({"query": "And the sun?", "history": history}).encode())
+    assert status == 200 and json.loads(body)["final_answer"]
+    assert (await call(service, "GET", "/v1/query"))[0] == 405
+    assert (await call(service, "GET", "/nope"))[0] == 404
+
+    service.api_token = "secret"
+    assert (await call(service, "POST", "/v1/query", b'{"query": "hi"}'))[0] == 401
+    assert (await call(service, "GET", "/healthz"))[0] == 200
+    service.api_token = None
+
+    await service.shutdown()
+    assert (await call(service, "GET", "/readyz"))[0] == 503
+
+def run_client_test():
+    """The thin client against a real server, when uvicorn is installed."""
+    if uvicorn is None:
+        print("uvicorn not installed, skipping the client round trip")
+        return
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(make_service(), host="127.0.0.1", port=port, log_level="warning", lifespan="on"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    client = ServiceClient(f"http://127.0.0.1:{port}")
+    deadline = time.time() + 10
+    while not client.ready() and time.time() < deadline:
+        time.sleep(0.05)
+    try:
+        types = [event.type for event in client.stream("Why is the sky blue?")]
+        print(f"Client stream: {types[:2]} ... {types[-1]}")
+        assert types[-1] == "final"
+        assert client.query("Why is the sky blue?", profile="fast")["final_answer"]
+    finally:
+        server.should_exit = True
+        thread.join(10)
+
+def run_service_test():
+    print("--- Service Test: ASGI Orchestration API ---")
+    asyncio.run(run_asgi_test())
+    run_client_test()
+    print("\n--- Service Test Complete ---")
+
+if __name__ == "__main__":
+    run_service_test()
@@ -0,0 +1,54 @@
+import os
+import tempfile
+from src import database
+from src.database import session_lists
+
+def count_queries():
+    """Counts statements run on this thread's connection from here on."""
+    counter = {"n": 0}
+    database.get_connection().set_trace_callback(lambda _: counter.__setitem__("n", counter["n"] + 1))
+    return counter
+
+def run_session_cache_test():
+    print("--- Session Cache Test: Write-through Sidebar List ---")
+    with tempfile.TemporaryDirectory() as workdir:
+        database.DB_NAME = os.path.join(workdir, "users.db")
+        database.init_db()
+        database.create_user("cache@example.com", "pw")
+        user_id = database.verify_user("cache@example.com", "pw")["id"]
+        ids = [database.create_session(user_id, f"Chat {i}") for i in range(5)]
+
+        sessions, cursor = session_lists.page(user_id, limit=3)
+        assert [s["id"] for s in sessions] == ids[::-1][:3] and cursor is not None
+
+        counter = count_queries()
+        for _ in range(50):
+            session_lists.page(user_id, limit=3)
+        print(f"\n50 reruns after the first load: {counter['n']} queries, {session_lists.hits} hits")
+        assert counter["n"] == 0
+
+        new_id = database.create_session(user_id, "Fresh")
+        database.update_session_title(ids[4], "Renamed")
+        database.save_turn(ids[3], "q", "a", title="Titled by turn")
+        database.delete_session(ids[2])
+        counter["n"] = 0
+        sessions, cursor = session_lists.page(user_id, limit=3)
+        assert counter["n"] == 0
+        assert [s["title"] for s in sessions] == ["Fresh", "Renamed", "Titled by turn"]
+
+        sessions, cursor = session_lists.load_more(user_id, limit=3)
+        assert [s["id"] for s in sessions] == [new_id, ids[4], ids[3], ids[1], ids[0]] and cursor is None
+
+        # The cache agrees with sqlite once it is dropped
+        session_lists.invalidate(user_id)
+        fresh, _ = database.get_user_sessions_page(user_id, limit=10)
+        assert [(s["id"], s["title"]) for s in fresh] == [(s["id"], s["title"]) for s in sessions]
+        print(f"Write-through list matches sqlite: {[s['title'] for s in fresh]}")
+
+        database.get_connection().set_trace_callback(None)
+        database.close_connections()
+    session_lists.invalidate()
+    print("\n--- Session Cache Test Complete ---")
+
+if __name__ == "__main__":
+    run_session_cache_test()
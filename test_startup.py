@@ -0,0 +1,34 @@
+import subprocess
+import sys
+from src.startup import StartupProfile, load_sdk, startup
+
+def run_startup_test():
+    print("--- Startup Test: Lazy SDK Imports & Startup Profile ---")
+
+    # Simulated mode must not pay for the vendor SDKs or the RealAgent module
+    script = ("import sys\n"
+              "from src.config import load_config\n"
+              "from src.orchestrator import MultiAgentOrchestrator\n"
+              "MultiAgentOrchestrator(load_config())\n"
+              "print(sorted(m for m in ('openai', 'google.generativeai', 'httpx', 'src.agents.real') if m in sys.modules))")
+    proc = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+    loaded = proc.stdout.strip().splitlines()[-1]
+    print(f"\nLoaded in simulated mode: {loaded}")
+    assert loaded == "[]"
+
+    # SDKs load once, on first use, and show up in the startup profile
+    assert load_sdk("json") is load_sdk("json") is sys.modules["json"]
+    assert load_sdk("not_a_real_sdk") is None
+    stages = [row["stage"] for row in startup.report()]
+    assert "import json" in stages and "import not_a_real_sdk" in stages
+
+    profile = StartupProfile()
+    with profile.stage("init_db"):
+        pass
+    profile.record("init_db", 0.5)
+    assert profile.report()[0]["stage"] == "init_db" and profile.report()[0]["seconds"] >= 0.5
+
+    print("\n--- Startup Test Complete ---")
+
+if __name__ == "__main__":
+    run_startup_test()
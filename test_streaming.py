@@ -0,0 +1,33 @@
+import asyncio
+from src.config import load_config
+from src.orchestrator import MultiAgentOrchestrator
+
+async def run_streaming_test():
+    print("--- Streaming Orchestration Test ---")
+    
+    config = load_config("orchestrator_config.yaml")
+    config.routing.enabled = False  # every agent should report
+    orchestrator = MultiAgentOrchestrator(config)
+    
+    user_query = "Why do leaves change colour in autumn?"
+    print(f"\nUser Query: {user_query}\n")
+    
+    events = []
+    async for event in orchestrator.process_query_stream(user_query):
+        events.append(event)
+        if event.type == "agent_answer":
+            print(f"[agent] {event.response.name}: {event.response.confidence}")
+        elif event.type == "critique":
+            print(f"[critique] {event.name}")
+        elif event.type == "final":
+            print(f"[final] {event.result['final_answer'][:80]}...")
+
+    # Every agent reports exactly once, and the stream always ends with the final result
+    answered = [e.response.name for e in events if e.type == "agent_answer"]
+    assert sorted(answered) == sorted(a.name for a in orchestrator.agents)
+    assert events[-1].type == "final"
+
+    print("\n--- Streaming Test Complete ---")
+
+if __name__ == "__main__":
+    asyncio.run(run_streaming_test())